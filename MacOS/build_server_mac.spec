@@ -35,6 +35,15 @@ a = Analysis(
         'pystray',
         'cloudflared_manager',
         'server',
+        'zip_stream',
+        'asgi_server',
+        'file_listing',
+        'search_index',
+        'sqlite3',
+        'delta_sync',
+        'chunk_store',
+        'wire_codec',
+        'archive_cache',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,263 @@
+"""
+블록 단위 델타 전송 (rsync 방식)
+받는 쪽이 가진 이전 파일의 블록 서명(약한 롤링 체크섬 + 강한 해시)을 보내면
+보내는 쪽은 새 파일을 훑으며 같은 블록은 번호로, 바뀐 부분만 원본 바이트로 보냅니다.
+받는 쪽은 이전 파일 + 델타로 임시 파일을 만들고 전체 sha256을 확인한 뒤 교체합니다.
+
+서버(/api/delta/*)와 클라이언트가 함께 사용합니다.
+
+서명: 'WDS1' + 블록 크기(4) + 파일 크기(8) + 블록마다 [adler32(4) + blake2b-128(16)]
+델타: 'C' + 시작 블록(8) + 블록 수(4)  → 이전 파일의 블록 복사
+      'L' + 길이(4) + 바이트           → 새 내용
+      'E' + 전체 크기(8) + sha256(32)   → 끝 (받는 쪽 검증용)
+"""
+import hashlib
+import struct
+import zlib
+
+SIGNATURE_MAGIC = b'WDS1'
+SIGNATURE_HEADER = struct.Struct('>4sIQ')
+SIGNATURE_RECORD = struct.Struct('>I16s')
+OP_COPY = struct.Struct('>cQI')
+OP_LITERAL = struct.Struct('>cI')
+OP_END = struct.Struct('>cQ32s')
+
+# 블록 크기: 파일 크기의 제곱근 근처의 2의 거듭제곱 (서명 크기와 바뀐 블록당 재전송량의 균형)
+BLOCK_MIN = 16 * 1024
+BLOCK_MAX = 1024 * 1024
+
+READ_SIZE = 4 * 1024 * 1024
+LITERAL_MAX = 1024 * 1024  # 새 내용은 이 크기 단위로 끊어서 보냄
+COPY_RUN_MAX = 64 * 1024 * 1024  # 연속 복사도 이 단위로 끊어서 보냄 (터널 유휴 타임아웃 방지)
+OUTPUT_FLUSH = 64 * 1024
+
+# 바이트 단위 롤링 검색은 파이썬 루프라 느리므로,
+# 연속으로 이만큼 못 찾으면 블록 경계 비교만 하고 ROLL_RETRY 블록마다 한 번씩만 다시 검색
+ROLL_MAX_MISSES = 8
+ROLL_RETRY = 64
+
+ADLER_MOD = 65521
+
+
+class DeltaError(Exception):
+    """서명/델타 형식 오류 또는 복원 결과 불일치"""
+
+
+def block_size_for(size):
+    """파일 크기에 맞는 블록 크기"""
+    block = BLOCK_MIN
+    while block < BLOCK_MAX and block * block < size:
+        block *= 2
+    return block
+
+
+def _strong(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def iter_signature(f, block_size):
+    """열린 파일의 블록 서명을 조금씩 생성 (큰 파일도 첫 바이트가 바로 나감)"""
+    f.seek(0, 2)
+    size = f.tell()
+    f.seek(0)
+    yield SIGNATURE_HEADER.pack(SIGNATURE_MAGIC, block_size, size)
+    out = []
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        out.append(SIGNATURE_RECORD.pack(zlib.adler32(block), _strong(block)))
+        if len(out) * SIGNATURE_RECORD.size >= OUTPUT_FLUSH:
+            yield b''.join(out)
+            out = []
+    if out:
+        yield b''.join(out)
+
+
+def parse_signature(data):
+    """서명 바이트 → (블록 크기, 파일 크기, {약한 체크섬: [(블록 번호, 강한 해시), ...]})"""
+    if len(data) < SIGNATURE_HEADER.size:
+        raise DeltaError("서명이 너무 짧습니다")
+    magic, block_size, size = SIGNATURE_HEADER.unpack_from(data)
+    if magic != SIGNATURE_MAGIC or not BLOCK_MIN <= block_size <= BLOCK_MAX:
+        raise DeltaError("알 수 없는 서명 형식입니다")
+    count = -(-size // block_size)
+    if len(data) != SIGNATURE_HEADER.size + count * SIGNATURE_RECORD.size:
+        raise DeltaError("서명 길이가 파일 크기와 맞지 않습니다")
+    table = {}
+    for index, (weak, strong) in enumerate(SIGNATURE_RECORD.iter_unpack(data[SIGNATURE_HEADER.size:])):
+        table.setdefault(weak, []).append((index, strong))
+    return block_size, size, table
+
+
+def _find(table, weak, window):
+    """같은 블록의 번호 (없으면 None). 강한 해시는 약한 체크섬이 맞을 때만 계산"""
+    candidates = table.get(weak)
+    if not candidates:
+        return None
+    strong = _strong(window)
+    for index, candidate in candidates:
+        if candidate == strong:
+            return index
+    return None
+
+
+def iter_delta(f, signature, on_progress=None):
+    """새 파일(f)을 서명과 비교해 델타 생성
+
+    signature는 parse_signature 결과. on_progress(읽은 바이트)는 파일을 읽을 때마다 호출
+    """
+    block_size, _, table = signature
+    sha = hashlib.sha256()
+    total = 0
+    buf = b''
+    pos = 0  # 다음 비교 위치
+    lit = 0  # 아직 보내지 않은 새 내용의 시작
+    eof = False
+    run_start = run_count = 0
+    misses = 0
+    out = []
+    out_size = 0
+
+    while True:
+        # 롤링 검색에 필요한 만큼 (블록 두 개) 버퍼 유지
+        while not eof and len(buf) - pos < 2 * block_size:
+            data = f.read(max(READ_SIZE, 2 * block_size))
+            if not data:
+                eof = True
+                break
+            sha.update(data)
+            total += len(data)
+            buf = buf[lit:] + data
+            pos -= lit
+            lit = 0
+            if on_progress is not None:
+                on_progress(total)
+
+        n = min(block_size, len(buf) - pos)
+        if n <= 0:
+            break
+
+        # 1) 현재 위치에서 블록 비교 (zlib으로 계산하므로 빠름)
+        match_at = pos
+        window = buf[pos:pos + n]
+        weak = zlib.adler32(window)
+        index = _find(table, weak, window)
+
+        # 2) 못 찾으면 한 바이트씩 밀면서 검색 (삽입/삭제로 밀린 블록 찾기)
+        if index is None and n == block_size and (misses < ROLL_MAX_MISSES or misses % ROLL_RETRY == 0):
+            a = weak & 0xffff
+            b = weak >> 16
+            limit = min(pos + block_size, len(buf) - block_size)
+            p = pos
+            while p < limit:
+                x_out = buf[p]
+                x_in = buf[p + block_size]
+                a = (a - x_out + x_in) % ADLER_MOD
+                b = (b - block_size * x_out + a - 1) % ADLER_MOD
+                p += 1
+                candidates = table.get((b << 16) | a)
+                if candidates:
+                    index = _find(table, (b << 16) | a, buf[p:p + block_size])
+                    if index is not None:
+                        match_at = p
+                        break
+
+        if index is None:
+            misses += 1
+            pos += n
+            if pos - lit >= LITERAL_MAX or (eof and pos >= len(buf)):
+                if run_count:
+                    out.append(OP_COPY.pack(b'C', run_start, run_count))
+                    run_count = 0
+                out.append(OP_LITERAL.pack(b'L', pos - lit))
+                out.append(buf[lit:pos])
+                out_size += pos - lit
+                lit = pos
+        else:
+            misses = 0
+            if match_at > lit:
+                if run_count:
+                    out.append(OP_COPY.pack(b'C', run_start, run_count))
+                    run_count = 0
+                out.append(OP_LITERAL.pack(b'L', match_at - lit))
+                out.append(buf[lit:match_at])
+                out_size += match_at - lit
+            if run_count and index == run_start + run_count and run_count * block_size < COPY_RUN_MAX:
+                run_count += 1
+            else:
+                if run_count:
+                    out.append(OP_COPY.pack(b'C', run_start, run_count))
+                    # 긴 복사 구간은 바로 내보냄 (받는 쪽 진행률/연결 유지)
+                    out_size += max(OP_COPY.size, run_count * block_size)
+                run_start, run_count = index, 1
+            pos = lit = match_at + (block_size if match_at != pos else n)
+
+        if out_size >= OUTPUT_FLUSH:
+            yield b''.join(out)
+            out = []
+            out_size = 0
+
+    if run_count:
+        out.append(OP_COPY.pack(b'C', run_start, run_count))
+    if pos > lit:
+        out.append(OP_LITERAL.pack(b'L', pos - lit))
+        out.append(buf[lit:pos])
+    out.append(OP_END.pack(b'E', total, sha.digest()))
+    yield b''.join(out)
+
+
+def _read_exact(read, size):
+    parts = []
+    while size > 0:
+        data = read(size)
+        if not data:
+            raise DeltaError("델타가 중간에 끊겼습니다")
+        parts.append(data)
+        size -= len(data)
+    return b''.join(parts)
+
+
+def apply_delta(read, basis, out, block_size, on_progress=None):
+    """이전 파일(basis) + 델타(read 함수로 읽음) → out에 새 파일 기록
+
+    끝 레코드의 크기/sha256과 다르면 DeltaError. 결과 통계 {'size', 'copied', 'literal'}
+    """
+    sha = hashlib.sha256()
+    written = copied = literal = 0
+    basis.seek(0, 2)
+    basis_size = basis.tell()
+    while True:
+        op = _read_exact(read, 1)
+        if op == b'C':
+            _, start, count = OP_COPY.unpack(op + _read_exact(read, OP_COPY.size - 1))
+            offset = start * block_size
+            if offset >= basis_size:
+                raise DeltaError("이전 파일에 없는 블록입니다")
+            basis.seek(offset)
+            remaining = min(count * block_size, basis_size - offset)
+            while remaining > 0:
+                data = basis.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise DeltaError("이전 파일을 읽는 중 끝에 도달했습니다")
+                out.write(data)
+                sha.update(data)
+                remaining -= len(data)
+                written += len(data)
+                copied += len(data)
+        elif op == b'L':
+            _, length = OP_LITERAL.unpack(op + _read_exact(read, OP_LITERAL.size - 1))
+            data = _read_exact(read, length)
+            out.write(data)
+            sha.update(data)
+            written += length
+            literal += length
+        elif op == b'E':
+            _, size, digest = OP_END.unpack(op + _read_exact(read, OP_END.size - 1))
+            if size != written or digest != sha.digest():
+                raise DeltaError("복원한 파일이 원본과 다릅니다")
+            return {'size': written, 'copied': copied, 'literal': literal}
+        else:
+            raise DeltaError("알 수 없는 델타 명령입니다")
+        if on_progress is not None:
+            on_progress(written)
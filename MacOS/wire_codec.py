@@ -0,0 +1,156 @@
+"""
+전송 구간 압축 (zstd, 없으면 gzip)
+서버와 클라이언트가 함께 사용합니다.
+
+- 다운로드: 클라이언트가 X-Woori-Encoding 요청 헤더로 풀 수 있는 방식을 알리면
+  서버는 요청한 구간(Range)의 원본 바이트를 압축해서 보냄.
+  Content-Range/ETag/이어받기 위치는 모두 원본 기준이므로 이어받기/분할 받기가 그대로 동작
+- /api/* JSON: 표준 Accept-Encoding/Content-Encoding
+- 업로드 본문: Content-Encoding + X-Uncompressed-Length (원본 크기)
+
+zstd는 zstandard 패키지가 있어야 합니다 (pip install zstandard).
+"""
+import mimetypes
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ENCODING_HEADER = 'X-Woori-Encoding'
+LENGTH_HEADER = 'X-Uncompressed-Length'
+
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 1  # 압축률보다 속도 (터널보다 느려지지 않도록)
+
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_MAX_RATIO = 0.9  # 앞부분 표본이 이보다 덜 줄어들면 압축하지 않음
+STREAM_FLUSH = 256 * 1024  # 이만큼 압축할 때마다 내보냄 (받는 쪽이 바로 풀어 쓸 수 있도록)
+
+# 이미 압축된 형식 (MIME 대분류/종류, 확장자)
+COMPRESSED_MAJOR_TYPES = ('image/', 'video/', 'audio/')
+UNCOMPRESSED_MEDIA = ('image/svg+xml', 'image/bmp', 'image/x-ms-bmp', 'image/tiff', 'audio/x-wav', 'audio/wav')
+COMPRESSED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar', '.lz4', '.br', '.cab', '.jar', '.apk',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.hwpx', '.epub', '.pdf', '.msi', '.dmg', '.iso',
+    '.woff', '.woff2', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.mp3', '.mp4', '.mkv', '.mov',
+    '.avi', '.m4a', '.ogg', '.flac', '.whl', '.nupkg',
+}
+
+
+def available():
+    """이 쪽에서 압축/해제할 수 있는 방식 (선호 순)"""
+    return ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+
+
+def choose(header):
+    """상대가 보낸 목록(Accept-Encoding 형식)에서 쓸 방식 선택 (없으면 None)"""
+    offered = set()
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        offered.add(name.strip().lower())
+    for name in available():
+        if name in offered:
+            return name
+    return None
+
+
+def is_compressible_name(name):
+    """파일 이름/MIME 종류로 압축할 만한지 (이미 압축된 형식이면 False)"""
+    lower = name.lower()
+    ext = lower[lower.rfind('.'):] if '.' in lower else ''
+    if ext in COMPRESSED_EXTENSIONS:
+        return False
+    mimetype = mimetypes.guess_type(lower)[0] or ''
+    if mimetype.startswith(COMPRESSED_MAJOR_TYPES) and mimetype not in UNCOMPRESSED_MEDIA:
+        return False
+    return True
+
+
+def looks_compressible(sample):
+    """앞부분 표본을 빠르게 압축해 보고 줄어드는지 확인"""
+    if not sample:
+        return False
+    sample = sample[:SAMPLE_SIZE]
+    return len(zlib.compress(sample, 1)) < len(sample) * SAMPLE_MAX_RATIO
+
+
+def compressor(encoding):
+    """스트림 압축기: compress(data), flush() (끝)"""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    if encoding == 'gzip':
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    raise ValueError(f"지원하지 않는 압축 방식: {encoding}")
+
+
+def compress(data, encoding):
+    c = compressor(encoding)
+    return c.compress(data) + c.flush()
+
+
+def iter_compressed(chunks, encoding):
+    """원본 조각들 → 압축 조각들 (STREAM_FLUSH마다 중간 flush)"""
+    c = compressor(encoding)
+    sync = zstandard.COMPRESSOBJ_FLUSH_BLOCK if encoding == 'zstd' else zlib.Z_SYNC_FLUSH
+    pending = 0
+    for data in chunks:
+        out = c.compress(data)
+        pending += len(data)
+        if pending >= STREAM_FLUSH:
+            out += c.flush(sync)
+            pending = 0
+        if out:
+            yield out
+    yield c.flush()
+
+
+def iter_decompressed(chunks, encoding):
+    """압축 조각들 → 원본 조각들. 스트림이 끝나지 않은 채 끊기면 EOFError"""
+    if encoding == 'zstd':
+        d = zstandard.ZstdDecompressor().decompressobj()
+    elif encoding == 'gzip':
+        d = zlib.decompressobj(31)
+    else:
+        raise ValueError(f"지원하지 않는 압축 방식: {encoding}")
+    for data in chunks:
+        out = d.decompress(data)
+        if out:
+            yield out
+    if not getattr(d, 'eof', True):  # 오래된 zstandard는 eof가 없음
+        raise EOFError("압축 스트림이 중간에 끊겼습니다")
+
+
+class DecodingReader:
+    """압축된 요청 본문을 원본 바이트로 읽는 파일 객체 (read(n)만 지원)"""
+    def __init__(self, raw, encoding):
+        if encoding == 'zstd':
+            if zstandard is None:
+                raise ValueError("zstd를 풀 수 없습니다 (zstandard 없음)")
+            self._reader = zstandard.ZstdDecompressor().stream_reader(raw)
+            self._zlib = None
+        elif encoding == 'gzip':
+            self._reader = None
+            self._zlib = zlib.decompressobj(31)
+            self._raw = raw
+            self._tail = b''
+        else:
+            raise ValueError(f"지원하지 않는 압축 방식: {encoding}")
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = 1 << 30
+        if self._reader is not None:
+            return self._reader.read(size)
+        while not self._zlib.eof:
+            data = self._tail or self._raw.read(64 * 1024)
+            if not data:
+                return b''
+            out = self._zlib.decompress(data, size)
+            self._tail = self._zlib.unconsumed_tail
+            if out:
+                return out
+        return b''
@@ -0,0 +1,198 @@
+"""
+ZIP 스트리밍 압축 해제
+받는 중인 ZIP 바이트를 로컬 헤더부터 차례로 해석해 파일을 바로 대상 폴더에 씁니다.
+(.zip을 디스크에 저장했다가 다시 푸는 단계가 없음)
+
+서버의 zip_stream이 만드는 형식을 전제로 합니다.
+- 비압축(STORED) 항목은 로컬 헤더(또는 ZIP64 extra)에 크기가 있음
+- DEFLATE 항목은 압축 스트림이 스스로 끝나므로 크기 없이도 데이터 끝을 알 수 있음
+- 데이터 디스크립터의 CRC/크기로 항목마다 검증
+해석할 수 없으면 ZipExtractError (호출한 쪽에서 .zip으로 받아서 풀기로 전환)
+"""
+import os
+import struct
+import zlib
+
+SIG_LOCAL_HEADER = 0x04034b50
+SIG_DATA_DESCRIPTOR = 0x08074b50
+SIG_CENTRAL_DIR = 0x02014b50
+SIG_ZIP64_END = 0x06064b50
+SIG_END = 0x06054b50
+
+LOCAL_HEADER = struct.Struct('<IHHHIIIIHH')
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+ZIP64_LIMIT = 0xFFFFFFFF
+
+
+class ZipExtractError(Exception):
+    """스트리밍으로 풀 수 없는 ZIP (형식 오류, 크기를 알 수 없는 항목, CRC 불일치)"""
+
+
+class ZipStreamExtractor:
+    """feed()로 ZIP 바이트를 순서대로 넣으면 항목을 dest_dir 아래에 바로 기록"""
+    def __init__(self, dest_dir):
+        self.dest_dir = os.path.abspath(dest_dir)
+        self.fed = 0
+        self.file_count = 0
+        self.finished = False  # 중앙 디렉터리까지 도달
+        self._buf = bytearray()
+        self._state = 'header'
+        self._entry = None
+        self._out = None
+
+    def feed(self, data):
+        if self.finished:
+            return
+        self.fed += len(data)
+        self._buf += data
+        while self._step():
+            pass
+
+    def close(self):
+        """끝까지 받았는지 확인 (중앙 디렉터리 전에 끝나면 ZipExtractError)"""
+        self.abort()
+        if not self.finished:
+            raise ZipExtractError("ZIP이 중간에 끊겼습니다")
+
+    def abort(self):
+        """쓰던 파일 닫기 (받다 만 항목은 그대로 남음)"""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def _step(self):
+        """버퍼에서 처리할 수 있는 만큼 진행 (더 받아야 하면 False)"""
+        if self._state == 'header':
+            return self._read_header()
+        if self._state == 'data':
+            return self._read_data()
+        if self._state == 'descriptor':
+            return self._read_descriptor()
+        return False
+
+    def _read_header(self):
+        if len(self._buf) < 4:
+            return False
+        sig = struct.unpack_from('<I', self._buf)[0]
+        if sig in (SIG_CENTRAL_DIR, SIG_ZIP64_END, SIG_END):
+            # 항목은 모두 받았음 (중앙 디렉터리는 로컬 헤더와 같은 정보라 쓰지 않음)
+            self.finished = True
+            self._state = 'done'
+            self._buf.clear()
+            return False
+        if sig != SIG_LOCAL_HEADER:
+            raise ZipExtractError("로컬 파일 헤더가 아닙니다")
+        if len(self._buf) < LOCAL_HEADER.size:
+            return False
+        (_, _, flags, method, _, crc, csize, usize,
+         name_len, extra_len) = LOCAL_HEADER.unpack_from(self._buf)
+        end = LOCAL_HEADER.size + name_len + extra_len
+        if len(self._buf) < end:
+            return False
+        name_bytes = bytes(self._buf[LOCAL_HEADER.size:LOCAL_HEADER.size + name_len])
+        extra = bytes(self._buf[LOCAL_HEADER.size + name_len:end])
+        del self._buf[:end]
+
+        name = name_bytes.decode('utf-8' if flags & FLAG_UTF8 else 'cp437', 'replace')
+        zip64 = False
+        pos = 0
+        while pos + 4 <= len(extra):
+            tag, size = struct.unpack_from('<HH', extra, pos)
+            if tag == 0x0001:
+                zip64 = True
+                values = list(struct.unpack_from('<' + 'Q' * (size // 8), extra, pos + 4))
+                if usize == ZIP64_LIMIT and values:
+                    usize = values.pop(0)
+                if csize == ZIP64_LIMIT and values:
+                    csize = values.pop(0)
+            pos += 4 + size
+        if method not in (ZIP_STORED, ZIP_DEFLATED):
+            raise ZipExtractError(f"지원하지 않는 압축 방식: {method}")
+
+        self._entry = {
+            'name': name, 'flags': flags, 'method': method, 'zip64': zip64,
+            'crc': crc, 'remaining': csize, 'written': 0, 'compressed': 0, 'crc_now': 0,
+            'inflater': zlib.decompressobj(-15) if method == ZIP_DEFLATED else None
+        }
+        target = self._target_path(name)
+        if name.endswith('/'):
+            os.makedirs(target, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            self._out = open(target, 'wb')
+            self.file_count += 1
+        self._state = 'data'
+        return True
+
+    def _target_path(self, name):
+        parts = [p for p in name.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+        if not parts:
+            raise ZipExtractError(f"잘못된 항목 이름: {name!r}")
+        target = os.path.abspath(os.path.join(self.dest_dir, *parts))
+        if not target.startswith(self.dest_dir + os.sep):
+            raise ZipExtractError(f"대상 폴더 밖을 가리키는 항목: {name!r}")
+        return target
+
+    def _write(self, data):
+        entry = self._entry
+        entry['crc_now'] = zlib.crc32(data, entry['crc_now'])
+        entry['written'] += len(data)
+        if self._out is not None:
+            self._out.write(data)
+
+    def _read_data(self):
+        entry = self._entry
+        if entry['inflater'] is None:
+            take = min(entry['remaining'], len(self._buf))
+            if take:
+                self._write(bytes(self._buf[:take]))
+                del self._buf[:take]
+                entry['remaining'] -= take
+                entry['compressed'] += take
+            if entry['remaining'] > 0:
+                return False
+        else:
+            if not self._buf:
+                return False
+            inflater = entry['inflater']
+            data = bytes(self._buf)
+            self._buf.clear()
+            try:
+                self._write(inflater.decompress(data))
+            except zlib.error as e:
+                raise ZipExtractError(f"압축 데이터 오류: {e}")
+            entry['compressed'] += len(data) - len(inflater.unused_data)
+            if not inflater.eof:
+                return False
+            self._buf += inflater.unused_data
+        self.abort()
+        if entry['flags'] & FLAG_DATA_DESCRIPTOR:
+            self._state = 'descriptor'
+        else:
+            self._verify(entry['crc'], entry['compressed'], entry['written'])
+            self._state = 'header'
+        return True
+
+    def _read_descriptor(self):
+        entry = self._entry
+        size_format = 'QQ' if entry['zip64'] else 'II'
+        if len(self._buf) < 4:
+            return False
+        skip = 4 if struct.unpack_from('<I', self._buf)[0] == SIG_DATA_DESCRIPTOR else 0
+        record = struct.Struct('<I' + size_format)
+        if len(self._buf) < skip + record.size:
+            return False
+        crc, csize, usize = record.unpack_from(self._buf, skip)
+        del self._buf[:skip + record.size]
+        self._verify(crc, csize, usize)
+        self._state = 'header'
+        return True
+
+    def _verify(self, crc, csize, usize):
+        entry = self._entry
+        if (crc != entry['crc_now'] & 0xFFFFFFFF or usize != entry['written']
+                or csize != entry['compressed']):
+            raise ZipExtractError(f"항목 검증 실패 (CRC/크기 불일치): {entry['name']}")
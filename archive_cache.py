@@ -0,0 +1,191 @@
+"""
+폴더 ZIP 캐시 (디스크)
+같은 폴더를 여러 사람이 연달아 받을 때 ZIP을 매번 새로 만들지 않도록
+(폴더 경로, 매니페스트 지문(경로/크기/수정 시각), 압축 방식)별로 만든 아카이브를 보관합니다.
+
+- 디스크 예산을 넘으면 가장 오래 쓰지 않은 아카이브부터 삭제 (LRU)
+- 아직 없는 아카이브를 여러 요청이 동시에 받으면 만드는 작업은 하나만 돌고,
+  모든 요청은 만들어지는 파일을 따라 읽음 (처음 요청한 쪽도 완성을 기다리지 않음)
+- 만드는 작업은 별도 스레드에서 돌므로 받던 사람이 끊어도 끝까지 만들어 다음 요청에 씀
+- 색인은 메모리에만 있으므로 서버를 다시 시작하면 캐시 폴더를 비움
+"""
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+READ_SIZE = 1024 * 1024
+
+
+def archive_key(folder_path, fingerprint):
+    """폴더 경로 + 매니페스트 지문(압축 방식 포함) → 캐시 키"""
+    return hashlib.sha1(f"{folder_path}\0{fingerprint}".encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class CachedArchive:
+    """캐시된(또는 만드는 중인) 아카이브 하나"""
+    def __init__(self, key, path, reserve):
+        self.key = key
+        self.path = path
+        self.reserve = reserve  # 완성 전까지 예산에 잡아 두는 예상 크기
+        self.written = 0
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    @property
+    def size(self):
+        """완성된 크기 (만드는 중이면 None)"""
+        return self.written if self.done else None
+
+    def charged(self):
+        return self.written if self.done else max(self.reserve, self.written)
+
+    def iter_range(self, start=0, end=None):
+        """[start, end) 구간을 읽음. 아직 만드는 중이면 기록되는 대로 따라 읽음
+
+        만드는 작업이 실패하면 IOError (응답이 중간에 끊겨 클라이언트가 재시도)
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            pos = start
+            while end is None or pos < end:
+                with self.cond:
+                    while pos >= self.written and not self.done and self.error is None:
+                        self.cond.wait()
+                    if self.error is not None:
+                        raise IOError(f"폴더 ZIP 생성 실패: {self.error}")
+                    available = self.written if end is None else min(end, self.written)
+                if pos >= available:
+                    return
+                data = f.read(min(READ_SIZE, available - pos))
+                if not data:
+                    raise IOError("캐시된 ZIP 파일이 예상보다 짧습니다")
+                pos += len(data)
+                yield data
+
+
+class ArchiveCache:
+    """폴더 ZIP 디스크 캐시 (LRU, 동시 요청은 만드는 작업 하나로 합침)"""
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.entry_max = max_bytes // 2  # 이보다 큰 아카이브는 캐시하지 않고 바로 스트리밍
+        self._entries = OrderedDict()  # 키 → CachedArchive (앞쪽이 오래 안 쓴 것)
+        self._lock = threading.Lock()
+        self._trash = []  # 읽는 중이라 지우지 못한 파일 (Windows), 다음 정리 때 다시 시도
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'too_large': 0}
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def lookup(self, key):
+        """이미 있거나 만드는 중인 아카이브 (없으면 None)
+
+        확인만 하고 통계/LRU에는 반영하지 않음. 실제로 읽을 때 use()를 호출
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.error is not None:
+                return None
+            return entry
+
+    def use(self, entry):
+        """lookup()으로 찾은 아카이브를 읽기로 함 (적중 통계, 최근 사용 갱신)"""
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                self._entries.move_to_end(entry.key)
+            self._stats['hits' if entry.done else 'coalesced'] += 1
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.error is not None:
+            return None
+        self._entries.move_to_end(key)
+        self._stats['hits' if entry.done else 'coalesced'] += 1
+        return entry
+
+    def get(self, key, build, size_hint):
+        """키에 해당하는 아카이브 반환 (없으면 build()가 내놓는 조각으로 만들기 시작)
+
+        size_hint는 예상 크기. 캐시 한도를 넘으면 None (호출한 쪽에서 바로 스트리밍)
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            if size_hint > self.entry_max:
+                self._stats['too_large'] += 1
+                return None
+            self._stats['misses'] += 1
+            entry = CachedArchive(key, os.path.join(self.cache_dir, f"{key}.zip"), size_hint)
+            try:
+                out = open(entry.path, 'wb')
+            except OSError as e:
+                print(f"[오류] 폴더 ZIP 캐시 파일 생성 실패: {e}")
+                return None
+            self._entries[key] = entry
+            self._evict()
+        threading.Thread(target=self._build, args=(entry, build, out), daemon=True).start()
+        return entry
+
+    def _build(self, entry, build, out):
+        try:
+            with out:
+                for chunk in build():
+                    out.write(chunk)
+                    out.flush()  # 따라 읽는 요청이 바로 볼 수 있도록
+                    with entry.cond:
+                        entry.written += len(chunk)
+                        entry.cond.notify_all()
+            with entry.cond:
+                entry.done = True
+                entry.cond.notify_all()
+            print(f"[폴더 ZIP 캐시] 저장: {entry.key[:12]} ({entry.written:,} bytes)")
+            with self._lock:
+                self._evict()
+        except Exception as e:
+            print(f"[오류] 폴더 ZIP 캐시 생성 실패: {e}")
+            with entry.cond:
+                entry.error = e
+                entry.cond.notify_all()
+            with self._lock:
+                if self._entries.get(entry.key) is entry:
+                    del self._entries[entry.key]
+                self._discard(entry.path)
+
+    def _evict(self):
+        """예산을 넘으면 완성된 아카이브 중 오래 안 쓴 것부터 삭제 (self._lock 안에서 호출)"""
+        for path in self._trash[:]:
+            self._trash.remove(path)
+            self._discard(path)
+        used = sum(e.charged() for e in self._entries.values())
+        for key in list(self._entries):
+            if used <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if not entry.done:
+                continue  # 만드는 중인 것은 그대로
+            del self._entries[key]
+            used -= entry.charged()
+            self._stats['evictions'] += 1
+            self._discard(entry.path)
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            self._trash.append(path)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = sum(1 for e in self._entries.values() if e.done)
+            stats['building'] = sum(1 for e in self._entries.values() if not e.done)
+            stats['bytes'] = sum(e.charged() for e in self._entries.values())
+        lookups = stats['hits'] + stats['coalesced'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['coalesced']) / lookups, 4) if lookups else 0.0
+        stats['max_bytes'] = self.max_bytes
+        return stats
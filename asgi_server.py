@@ -0,0 +1,235 @@
+"""
+비동기(ASGI) 서버 모드
+Flask 앱(server.app)의 라우트를 그대로 쓰면서, 연결 대기/요청 본문 수신/응답 전송은 asyncio에서 처리합니다.
+Flask 처리와 파일 읽기만 제한된 스레드 풀에서 한 조각씩 실행하므로
+느리거나 대기 중인 연결이 OS 스레드를 붙잡지 않습니다.
+
+uvicorn이 설치되어 있어야 합니다 (pip install uvicorn).
+    python server.py --asgi
+    uvicorn --factory asgi_server:create_app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import contextvars
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# 요청 본문이 이 크기를 넘으면 임시 파일에 받음
+BODY_SPOOL_SIZE = 1024 * 1024
+# 요청 본문 최대 크기 (waitress의 max_request_body_size 기본값과 같음, 넘으면 413)
+# 로그인 확인은 본문을 다 받은 뒤 Flask에서 하므로 그 전에 임시 디스크가 차지 않도록 제한
+MAX_REQUEST_BODY = 1024 * 1024 * 1024
+# Flask 처리/파일 읽기용 스레드 수 (연결 수와 무관)
+WORKER_THREADS = 64
+
+
+class AsgiApp:
+    """WSGI 앱을 asyncio 이벤트 루프 위에서 실행하는 ASGI 어댑터
+
+    - 요청 본문은 비동기로 전부 받은 뒤 Flask에 넘김 (waitress와 같은 방식)
+    - 응답은 조각마다 스레드 풀에서 꺼내고, 전송은 이벤트 루프에서 기다림
+    - 한 응답의 모든 조각은 같은 contextvars 컨텍스트에서 실행 (stream_with_context 유지)
+    """
+    def __init__(self, wsgi_app, workers=WORKER_THREADS, max_body=MAX_REQUEST_BODY):
+        self.wsgi_app = wsgi_app
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asgi-worker')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return  # 웹소켓 등은 지원하지 않음
+
+        loop = asyncio.get_running_loop()
+        declared = self._declared_length(scope)
+        if declared is not None and declared > self.max_body:
+            await self._send_too_large(send)  # 본문을 받기 전에 거절
+            return
+        body, length = await self._read_body(receive, loop)
+        if body is None:
+            if length > self.max_body:
+                await self._send_too_large(send)  # Content-Length 없는 chunked 요청
+            return  # 본문을 받는 도중 연결이 끊김
+
+        context = contextvars.copy_context()
+        result = None
+        try:
+            environ = self._environ(scope, body, length)
+            started, result, iterator, first = await loop.run_in_executor(
+                self.executor, context.run, self._start, environ)
+            await send({
+                'type': 'http.response.start',
+                'status': int(started['status'].split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                            for name, value in started['headers']]
+            })
+
+            disconnected = asyncio.Event()
+            watcher = asyncio.ensure_future(self._watch_disconnect(receive, disconnected))
+            try:
+                chunk = first
+                while not disconnected.is_set():
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    chunk = await loop.run_in_executor(self.executor, context.run, next, iterator, None)
+                    if chunk is None:
+                        break
+                if not disconnected.is_set():
+                    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            finally:
+                watcher.cancel()
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, context.run, close)
+            body.close()
+
+    def _start(self, environ):
+        """(스레드) Flask 호출 → 상태/헤더, 응답 iterable, 첫 조각"""
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = status
+            started['headers'] = headers
+            return write
+
+        def write(data):
+            raise RuntimeError("start_response의 write()는 지원하지 않습니다")
+
+        result = self.wsgi_app(environ, start_response)
+        iterator = iter(result)
+        first = b''
+        while not started:
+            # start_response를 첫 조각에서 호출하는 앱
+            first = next(iterator, None)
+            if first is None:
+                first = b''
+                break
+        return started, result, iterator, first
+
+    async def _read_body(self, receive, loop):
+        """요청 본문을 비동기로 받아 둠 (큰 본문은 임시 파일, 디스크 쓰기는 스레드 풀)
+
+        연결이 끊기면 (None, 0), max_body를 넘으면 받기를 멈추고 (None, 받은 길이)
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_SIZE)
+        length = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None, 0
+            chunk = message.get('body', b'')
+            if chunk:
+                length += len(chunk)
+                if length > self.max_body:
+                    body.close()
+                    return None, length
+                if length > BODY_SPOOL_SIZE:
+                    await loop.run_in_executor(self.executor, body.write, chunk)
+                else:
+                    body.write(chunk)
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body, length
+
+    @staticmethod
+    def _declared_length(scope):
+        """요청 헤더의 Content-Length (없거나 잘못된 값이면 None)"""
+        for name, value in scope.get('headers', []):
+            if name.lower() == b'content-length':
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    async def _send_too_large(self, send):
+        """413 응답 (본문이 max_body를 넘음)"""
+        message = f"요청 본문이 너무 큽니다 (최대 {self.max_body:,} bytes)".encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'text/plain; charset=utf-8'),
+                        (b'content-length', str(len(message)).encode('latin-1')),
+                        (b'connection', b'close')]
+        })
+        await send({'type': 'http.response.body', 'body': message, 'more_body': False})
+
+    async def _watch_disconnect(self, receive, disconnected):
+        """응답 중 클라이언트 연결 끊김 감지"""
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+                return
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _environ(self, scope, body, length):
+        """ASGI scope → WSGI environ"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(length),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'wsgi.input_terminated': True,
+        }
+        for name, value in scope.get('headers', []):
+            key = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if key == 'CONTENT_LENGTH':
+                continue  # 실제로 받은 본문 길이 사용 (chunked 요청 포함)
+            if key != 'CONTENT_TYPE':
+                key = f"HTTP_{key}"
+            if key in environ:
+                separator = '; ' if key == 'HTTP_COOKIE' else ','
+                environ[key] = f"{environ[key]}{separator}{value}"
+            else:
+                environ[key] = value
+        return environ
+
+
+def create_app():
+    """server.app을 감싼 ASGI 앱 (uvicorn --factory 용)"""
+    import server
+    return AsgiApp(server.app)
+
+
+def serve(app, host='0.0.0.0', port=5000, workers=WORKER_THREADS):
+    """uvicorn으로 ASGI 모드 실행 (uvicorn이 없으면 False)"""
+    try:
+        import uvicorn
+    except ImportError:
+        print('[WARNING] uvicorn이 없어 ASGI 모드를 사용할 수 없습니다 (pip install uvicorn)')
+        return False
+    config = uvicorn.Config(AsgiApp(app, workers), host=host, port=port,
+                            log_level='warning', timeout_keep_alive=30)
+    uvicorn.Server(config).run()
+    return True
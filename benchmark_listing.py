@@ -0,0 +1,91 @@
+"""
+폴더 목록 성능 비교 (이전 listdir + stat 방식 vs scandir 엔진)
+    python benchmark_listing.py                  # 1k / 10k / 100k 항목 임시 폴더로 측정
+    python benchmark_listing.py --dir D:/Share   # 실제 폴더(SMB 등)로 측정
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from file_listing import scan_folder
+
+
+def legacy_list_files(folder_path):
+    """이전 server.list_files (항목마다 stat + isfile + isdir)"""
+    items = []
+    for item in os.listdir(folder_path):
+        item_path = os.path.join(folder_path, item)
+        try:
+            st = os.stat(item_path)
+            items.append({
+                'name': os.path.basename(item_path),
+                'path': item_path,
+                'size': st.st_size if os.path.isfile(item_path) else 0,
+                'is_dir': os.path.isdir(item_path),
+                'modified': st.st_mtime
+            })
+        except Exception:
+            continue
+    return sorted(items, key=lambda x: (not x['is_dir'], x['name'].lower()))
+
+
+def make_folder(root, count):
+    """파일 count개 (10개 중 1개는 하위 폴더) 생성"""
+    folder = os.path.join(root, f"entries_{count}")
+    os.makedirs(folder)
+    for i in range(count):
+        path = os.path.join(folder, f"Item_{i:06d}")
+        if i % 10 == 0:
+            os.mkdir(path)
+        else:
+            with open(path, 'wb') as f:
+                f.write(b'x' * (i % 512))
+    return folder
+
+
+def best_of(func, folder, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(folder)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(folder, repeat):
+    old = legacy_list_files(folder)
+    new = scan_folder(folder)
+    same = old == new
+    old_time = best_of(legacy_list_files, folder, repeat)
+    new_time = best_of(scan_folder, folder, repeat)
+    print(f"{len(new):>9,} | {old_time * 1000:>10.1f} ms | {new_time * 1000:>10.1f} ms | "
+          f"{old_time / new_time:>6.2f}x | {'일치' if same else '불일치'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="폴더 목록 성능 비교")
+    parser.add_argument('--dir', action='append', help="측정할 기존 폴더 (여러 번 지정 가능)")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="임시 폴더 항목 수 (쉼표 구분)")
+    parser.add_argument('--repeat', type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+    
+    print(f"{'항목 수':>9} | {'listdir+stat':>13} | {'scandir':>13} | {'배율':>7} | 결과")
+    print("-" * 62)
+    if args.dir:
+        for folder in args.dir:
+            run(folder, args.repeat)
+        return
+    
+    root = tempfile.mkdtemp(prefix='woori_listing_bench_')
+    try:
+        for count in (int(size) for size in args.sizes.split(',')):
+            run(make_folder(root, count), args.repeat)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,7 +16,8 @@ a = Analysis(
     hiddenimports=[
         'flask', 'werkzeug', 'jinja2', 'click', 'itsdangerous', 'markupsafe',
         'waitress', 'PIL', 'pystray', 'requests', 'urllib3', 'charset_normalizer',
-        'certifi', 'idna', 'cloudflared_manager', 'server'
+        'certifi', 'idna', 'cloudflared_manager', 'server', 'zip_stream', 'asgi_server',
+        'file_listing', 'search_index', 'sqlite3', 'delta_sync', 'chunk_store', 'wire_codec', 'archive_cache'
     ],
     hookspath=[],
     hooksconfig={},
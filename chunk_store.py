@@ -0,0 +1,207 @@
+"""
+내용 기준 청크 분할과 청크 색인 (업로드 중복 제거)
+파일을 내용으로 정한 경계(FastCDC 방식)에서 나누므로 앞부분에 내용이 끼어들어도
+뒤쪽 청크는 그대로 같은 해시가 됩니다.
+
+클라이언트는 청크 해시 목록을 먼저 보내고, 서버는 이미 가진 청크(다른 폴더의 같은 파일 등)는
+자기 디스크에서 복사하고 없는 청크만 요청합니다.
+서버의 청크 색인은 데이터를 따로 보관하지 않고 공유 폴더 안 파일의 (경로, 위치)를 가리킵니다.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'woori_chunk_index.db')
+
+CHUNK_MIN = 256 * 1024
+CHUNK_AVG = 1024 * 1024
+CHUNK_MAX = 4 * 1024 * 1024
+READ_SIZE = CHUNK_MAX
+
+# 경계 판정: 바이트마다 0/1을 정한 표로 바꾼 뒤 1이 연속으로 나오는 곳에서 자름
+# (평균 크기 전에는 22개, 이후에는 18개 → 청크 크기가 평균 근처에 모이도록 하는 FastCDC의 정규화)
+# 표는 서버와 클라이언트가 같아야 하므로 고정된 해시에서 만듦
+_BIT_TABLE = bytes(b'01'[hashlib.sha256(bytes([i])).digest()[0] & 1] for i in range(256))
+_STRICT_RUN = b'1' * 22
+_LOOSE_RUN = b'1' * 18
+
+LOOKUP_BATCH = 500  # IN (...) 조회 한 번에 넣는 해시 수
+
+# Linux ioctl FICLONE (btrfs/XFS 등에서 블록을 공유하는 복사)
+FICLONE = 0x40049409
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    hash BLOB NOT NULL,
+    file_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_hash ON chunks(hash);
+CREATE INDEX IF NOT EXISTS chunks_file ON chunks(file_id);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _cut_point(bits, available):
+    """현재 청크 길이 (bits는 청크 시작부터의 0/1 변환 결과)"""
+    if available <= CHUNK_MIN:
+        return available
+    end = min(CHUNK_AVG, available)
+    found = bits.find(_STRICT_RUN, CHUNK_MIN - len(_STRICT_RUN), end)
+    if found >= 0:
+        return found + len(_STRICT_RUN)
+    end = min(CHUNK_MAX, available)
+    found = bits.find(_LOOSE_RUN, CHUNK_AVG - len(_LOOSE_RUN), end)
+    if found >= 0:
+        return found + len(_LOOSE_RUN)
+    return end
+
+
+def iter_chunks(f, on_progress=None):
+    """열린 파일을 내용 기준 청크로 나눔 → (위치, 길이, sha256 hex)
+
+    바이트 변환/검색은 bytes.translate/find로 처리하므로 파이썬 루프가 바이트마다 돌지 않음
+    """
+    buf = bits = b''
+    offset = total = 0
+    eof = False
+    while True:
+        while not eof and len(buf) < CHUNK_MAX:
+            data = f.read(READ_SIZE)
+            if not data:
+                eof = True
+                break
+            buf += data
+            bits += data.translate(_BIT_TABLE)
+            total += len(data)
+            if on_progress is not None:
+                on_progress(total)
+        if not buf:
+            return
+        length = _cut_point(bits, len(buf))
+        yield offset, length, hashlib.sha256(memoryview(buf)[:length]).hexdigest()
+        buf = buf[length:]
+        bits = bits[length:]
+        offset += length
+
+
+def clone_file(src, dst):
+    """가능하면 reflink로 복사 (디스크 블록 공유). 지원하지 않는 파일 시스템/OS면 False"""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        import fcntl
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+class ChunkIndex:
+    """청크 해시 → 공유 폴더 안 파일의 (경로, 위치, 길이)
+
+    파일이 바뀌었는지는 (크기, mtime_ns)로 확인하고, 바뀐 파일의 항목은 조회할 때 지움.
+    실제 복사 시에도 sha256을 다시 확인하므로 색인이 틀려도 잘못된 내용이 저장되지는 않음
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def locate(self, hashes):
+        """가진 청크 찾기 → {sha256 hex: (경로, 위치, 길이)}"""
+        conn = self._connect()
+        keys = [bytes.fromhex(h) for h in set(hashes)]
+        found = {}
+        valid = {}  # file_id → 파일이 색인 이후 그대로인지
+        stale = []
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            rows = conn.execute(
+                "SELECT c.hash, c.offset, c.length, f.id, f.path, f.size, f.mtime_ns "
+                "FROM chunks c JOIN files f ON f.id = c.file_id "
+                f"WHERE c.hash IN ({','.join('?' * len(batch))})", batch).fetchall()
+            for digest, offset, length, file_id, path, size, mtime_ns in rows:
+                key = digest.hex()
+                if key in found:
+                    continue
+                if file_id not in valid:
+                    try:
+                        st = os.stat(path)
+                        valid[file_id] = st.st_size == size and st.st_mtime_ns == mtime_ns
+                    except OSError:
+                        valid[file_id] = False
+                    if not valid[file_id]:
+                        stale.append(file_id)
+                if valid[file_id]:
+                    found[key] = (path, offset, length)
+        if stale:
+            with conn:
+                for file_id in stale:
+                    self._remove(conn, file_id)
+        return found
+
+    def add_file(self, path, chunks):
+        """업로드로 만든 파일의 청크 등록 (chunks: [(위치, 길이, sha256 hex), ...])"""
+        st = os.stat(path)
+        conn = self._connect()
+        with conn:
+            row = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+            if row:
+                self._remove(conn, row[0])
+            file_id = conn.execute("INSERT INTO files(path, size, mtime_ns) VALUES (?, ?, ?)",
+                                   (path, st.st_size, st.st_mtime_ns)).lastrowid
+            conn.executemany("INSERT INTO chunks(hash, file_id, offset, length) VALUES (?, ?, ?, ?)",
+                             [(bytes.fromhex(h), file_id, offset, length) for offset, length, h in chunks])
+
+    def record(self, logical_bytes, received_bytes):
+        """업로드 한 건의 전체 크기와 실제로 받은 크기 누적"""
+        conn = self._connect()
+        with conn:
+            for name, value in (('files', 1), ('logical_bytes', logical_bytes),
+                                ('received_bytes', received_bytes)):
+                conn.execute("INSERT INTO counters(name, value) VALUES (?, ?) "
+                             "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                             (name, value))
+
+    def stats(self):
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        logical = counters.get('logical_bytes', 0)
+        received = counters.get('received_bytes', 0)
+        return {
+            'uploads': counters.get('files', 0),
+            'logical_bytes': logical,
+            'received_bytes': received,
+            'saved_bytes': logical - received,
+            'dedup_ratio': round(logical / received, 2) if received else (1.0 if not logical else None),
+            'indexed_files': conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            'indexed_chunks': conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        }
+
+    def _remove(self, conn, file_id):
+        conn.execute("DELETE FROM chunks WHERE file_id = ?", (file_id,))
+        conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
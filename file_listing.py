@@ -0,0 +1,43 @@
+"""
+폴더 목록 엔진
+os.scandir의 DirEntry(종류/stat 캐시)를 이용해 항목당 stat을 한 번 이하로만 호출합니다.
+서버 /browse, /api/files 와 같은 형식(name, path, size, is_dir, modified)으로 돌려줍니다.
+"""
+import os
+import stat
+from operator import itemgetter
+
+
+def entry_info(entry):
+    """DirEntry → 목록 항목 (링크는 대상 기준, Windows에서는 stat 호출 없음)"""
+    st = entry.stat()
+    is_dir = stat.S_ISDIR(st.st_mode)
+    return {
+        'name': entry.name,
+        'path': entry.path,
+        'size': st.st_size if stat.S_ISREG(st.st_mode) else 0,
+        'is_dir': is_dir,
+        'modified': st.st_mtime
+    }
+
+
+def scan_folder(folder_path, skip_suffix=None):
+    """폴더 목록 (폴더 먼저, 이름순). skip_suffix로 끝나는 항목은 제외"""
+    keyed = []
+    try:
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if skip_suffix and entry.name.endswith(skip_suffix):
+                    continue
+                try:
+                    info = entry_info(entry)
+                except Exception as e:
+                    print(f"Error accessing {entry.path}: {e}")
+                    continue
+                # 정렬 키는 한 번만 만들어 둠
+                keyed.append(((not info['is_dir'], entry.name.lower()), info))
+    except Exception as e:
+        print(f"Error listing directory {folder_path}: {e}")
+    
+    keyed.sort(key=itemgetter(0))
+    return [info for _, info in keyed]
@@ -4,11 +4,17 @@
 """
 import sys
 import os
+import io
 import json
+import hashlib
 from pathlib import Path
 from datetime import datetime
+from email.utils import formatdate
 import time
 import threading
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -23,6 +29,12 @@ from PyQt5.QtGui import QFont, QColor, QPalette
 import requests
 from requests.adapters import HTTPAdapter
 
+import chunk_store
+import delta_sync
+import transfer_control
+import wire_codec
+import zip_extract
+
 # 다크 테마 QSS 스타일시트
 DARK_STYLE = """
 QMainWindow, QWidget {
@@ -205,6 +217,41 @@ QPushButton#pauseBtn {
 """
 
 
+# 이어받기 정보(.part.json)를 갱신하는 간격
+RESUME_SAVE_INTERVAL = 8 * 1024 * 1024
+
+# 이 크기 이상인 파일은 여러 연결로 나눠 주고받음 (파일 하나의 최대 연결 수는
+# download_connections / upload_connections 설정, 실제 연결 수는 전송 제어기가 나눠 줌)
+SEGMENTED_MIN_SIZE = 32 * 1024 * 1024
+SEGMENT_MAX_RETRIES = 5
+
+# 폴더 목록을 한 번에 받는 항목 수 (나머지는 스크롤할 때 받음)
+LISTING_PAGE_SIZE = 500
+
+# 분할 업로드: 서버가 청크 크기를 알려주지 않을 때의 기본값과 청크별 재시도 횟수
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_RETRIES = 5
+
+# 전송 스케줄러: 모든 업로드+다운로드가 함께 쓰는 연결 수 예산 (세션 연결 풀 안에서)
+# (transfer_connections 설정에서 시작해 처리량/재시도/RTT에 따라 1~MAX_TRANSFER_CONNECTIONS 사이에서
+#  AIMD로 조정, 진행 중인 작업들에 나눠 줌. 분할 다운로드 구간/업로드 청크 크기도 함께 조정)
+MAX_TRANSFER_CONNECTIONS = 16
+TRANSFER_TICK_MS = 2000
+
+# 폴더 업로드 시 작은 파일은 tar 스트림 하나로 묶어서 전송 (묶음 하나의 최대 파일 수/크기)
+UPLOAD_BATCH_MAX_FILES = 1000
+UPLOAD_BATCH_MAX_BYTES = 64 * 1024 * 1024
+
+# 받는 쪽에 이 크기 이상인 이전 파일이 있으면 바뀐 블록만 주고받음 (rsync 방식 델타)
+DELTA_MIN_SIZE = 64 * 1024 * 1024
+
+# 이 크기 이상인 파일은 청크 해시를 먼저 보내고 서버에 없는 청크만 전송 (중복 제거)
+DEDUP_MIN_SIZE = 8 * 1024 * 1024
+
+# 폴더 동기화 업로드: mtime 비교 허용 오차 (FAT/SMB는 2초 단위로 기록)
+SYNC_MTIME_TOLERANCE = 2.0
+
+
 class DownloadTask:
     """다운로드 작업"""
     def __init__(self, file_path, file_name, save_path, total_size=0):
@@ -216,6 +263,7 @@ class DownloadTask:
         self.status = 'waiting'
         self.cancel_flag = False
         self.pause_flag = False
+        self.keep_partial = False  # True면 중단 시 .part 파일 보관 (이어받기용)
         self.error_msg = None
         self.speed = 0
         self.start_time = None
@@ -238,6 +286,76 @@ class UploadTask:
         self.start_time = None
         self.batch_id = None
         self.last_reported = 0
+        self.connections = 1
+        self.members = None  # 묶음 업로드일 때 [(로컬 경로, 상대 경로), ...]
+
+
+class _LegacyUploadServer(Exception):
+    """분할 업로드 API가 없는 이전 버전 서버"""
+
+
+# 서버별 업로드 본문 압축 방식 (/api/encodings 응답, 지원하지 않으면 None)
+_server_encodings = {}
+
+
+def _report_retry(link):
+    """전송 재시도를 전송 제어기에 알림 (혼잡 신호 → 동시 전송 수/구간 크기를 줄임)"""
+    if link is not None:
+        link.observe_error()
+
+
+def _iter_response(response):
+    """응답 본문 조각 (서버가 전송 압축했으면 원본 바이트로 풀어서)"""
+    chunks = response.iter_content(chunk_size=1048576)
+    encoding = response.headers.get(wire_codec.ENCODING_HEADER)
+    if not encoding:
+        yield from chunks
+        return
+    try:
+        yield from wire_codec.iter_decompressed(chunks, encoding)
+    except requests.exceptions.RequestException:
+        raise
+    except Exception as e:
+        # 끊긴 압축 스트림도 받은 만큼은 올바른 원본이므로 그 위치부터 이어받기
+        raise requests.exceptions.ConnectionError(f"압축 스트림 오류: {e}")
+
+
+class _ChunkReader:
+    """파일의 [offset, offset + length) 구간만 읽는 업로드 본문 (읽은 만큼 콜백)"""
+    def __init__(self, f, offset, length, callback):
+        self.f = f
+        self.f.seek(offset)
+        self.length = length
+        self.remaining = length
+        self.callback = callback
+    
+    def __len__(self):
+        return self.length
+    
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        self.callback(self.length - self.remaining)
+        return data
+
+
+class _TarBuffer:
+    """tarfile 스트림 출력을 모아 두었다가 요청 본문 조각으로 꺼내는 버퍼"""
+    def __init__(self):
+        self.parts = []
+    
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+    
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
 
 
 class UploadThread(QThread):
@@ -245,20 +363,23 @@ class UploadThread(QThread):
     progress = pyqtSignal(int, str, int, int)  # 진행률, 속도, 업로드된 크기, 전체 크기
     finished = pyqtSignal(bool, str)  # 성공여부, 메시지
     
-    def __init__(self, task, server_url, session):
+    def __init__(self, task, server_url, session, connections=1, link=None, grant=None):
         super().__init__()
         self.task = task
         self.server_url = server_url
         self.session = session
+        self.connections = connections  # 한 파일의 청크를 동시에 올릴 최대 연결 수
+        self.link = link  # transfer_control.AimdController (청크 크기 제안, 재시도 보고)
+        # 지금 쓸 수 있는 연결 수 (스케줄러가 전체 예산을 나눠 바꿈, 없으면 connections 고정)
+        self.grant = grant or transfer_control.ConnectionGrant(connections)
+        self._lock = threading.Lock()
     
     def run(self):
         try:
             self.task.status = 'uploading'
             self.task.start_time = time.time()
             
-            url = f"{self.server_url}/upload"
             debug_info = f"[DEBUG 업로드 요청]"
-            debug_info += f"\n  - URL: {url}"
             debug_info += f"\n  - 파일: {os.path.basename(self.task.local_path)}"
             debug_info += f"\n  - 전체경로: {self.task.local_path}"
             debug_info += f"\n  - target_folder: {self.task.target_folder}"
@@ -269,75 +390,39 @@ class UploadThread(QThread):
             if hasattr(self.parent(), 'add_log'):
                 self.parent().add_log(debug_info)
             
-            # 파일을 청크로 읽어서 업로드 진행률 추적
-            try:
-                from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
-                use_toolbelt = True
-            except ImportError:
-                use_toolbelt = False
-            
-            if use_toolbelt:
-                # requests_toolbelt 사용 (진행률 추적 가능)
-                with open(self.task.local_path, 'rb') as f:
-                    encoder = MultipartEncoder(
-                        fields={
-                            'file': (os.path.basename(self.task.local_path), f, 'application/octet-stream'),
-                            'target_folder': self.task.target_folder,
-                            'relative_path': self.task.relative_path
-                        }
-                    )
-                    
-                    def callback(monitor):
-                        if self.task.cancel_flag:
-                            return
-                        
-                        self.task.uploaded = monitor.bytes_read
-                        elapsed = time.time() - self.task.start_time
-                        if elapsed > 0:
-                            self.task.speed = self.task.uploaded / elapsed
-                        
-                        if self.task.total_size > 0:
-                            percent = int((self.task.uploaded / self.task.total_size) * 100)
-                            speed_mb = self.task.speed / (1024 * 1024)
-                            self.progress.emit(percent, f"{speed_mb:.1f} MB/s",
-                                             self.task.uploaded, self.task.total_size)
-                    
-                    monitor = MultipartEncoderMonitor(encoder, callback)
-                    
-                    response = self.session.post(
-                        url,
-                        data=monitor,
-                        headers={'Content-Type': monitor.content_type},
-                        timeout=300
-                    )
-            else:
-                # 기본 requests 사용 (진행률 추적 불가)
-                with open(self.task.local_path, 'rb') as f:
-                    files = {'file': (os.path.basename(self.task.local_path), f)}
-                    data = {
-                        'target_folder': self.task.target_folder,
-                        'relative_path': self.task.relative_path
-                    }
-                    
-                    # 간단한 진행률 표시 (업로드 시작/완료만)
-                    self.progress.emit(50, "업로드 중...", self.task.total_size // 2, self.task.total_size)
-                    
-                    response = self.session.post(url, files=files, data=data, timeout=300)
-            
-            response_info = f"[DEBUG 업로드 응답]"
-            response_info += f"\n  - 상태코드: {response.status_code}"
-            response_info += f"\n  - 응답내용: {response.text[:500]}"
-            print(response_info)
-            if hasattr(self.parent(), 'add_log'):
-                self.parent().add_log(response_info)
-            
-            if response.status_code == 200:
+            if self.task.members:
+                if not self._upload_tar():
+                    self.finished.emit(False, "취소됨")
+                    return
                 self.task.status = 'completed'
                 self.task.uploaded = self.task.total_size
                 self.progress.emit(100, "완료", self.task.total_size, self.task.total_size)
                 self.finished.emit(True, "완료")
-            else:
-                raise Exception(f"서버 오류: {response.status_code}")
+                return
+            
+            # 서버에 같은 이름의 큰 파일이 있으면 바뀐 블록만 전송
+            done = None
+            if self.task.total_size >= DELTA_MIN_SIZE:
+                done = self._upload_delta()
+            # 다른 폴더에 같은 내용이 있으면 서버가 가진 청크는 보내지 않음
+            if done is None and self.task.total_size >= DEDUP_MIN_SIZE:
+                done = self._upload_dedup()
+            if done is None:
+                # 분할 업로드 (터널 요청 크기/시간 제한 회피, 끊기면 이어올리기)
+                try:
+                    done = self._upload_chunked()
+                except _LegacyUploadServer:
+                    print("[업로드] 서버가 분할 업로드를 지원하지 않아 한 번에 전송합니다")
+                    self._upload_multipart()
+                    done = True
+            if not done:
+                self.finished.emit(False, "취소됨")
+                return
+            
+            self.task.status = 'completed'
+            self.task.uploaded = self.task.total_size
+            self.progress.emit(100, "완료", self.task.total_size, self.task.total_size)
+            self.finished.emit(True, "완료")
         
         except Exception as e:
             error_detail = f"[DEBUG] 업로드 예외: {str(e)}"
@@ -347,6 +432,547 @@ class UploadThread(QThread):
             self.task.status = 'error'
             self.task.error_msg = str(e)
             self.finished.emit(False, f"오류: {e}")
+    
+    def _body_encoding(self):
+        """이 파일의 업로드 본문 압축 방식 (서버가 풀 수 있고 내용이 줄어들 때만, 아니면 None)"""
+        if not hasattr(self, '_encoding'):
+            self._encoding = None
+            if self.server_url not in _server_encodings:
+                try:
+                    response = self.session.get(f"{self.server_url}/api/encodings", timeout=10)
+                    if response.status_code in (200, 404):
+                        _server_encodings[self.server_url] = (
+                            wire_codec.choose(', '.join(response.json().get('upload', [])))
+                            if response.status_code == 200 else None)
+                except (requests.exceptions.RequestException, ValueError):
+                    pass
+            encoding = _server_encodings.get(self.server_url)
+            if encoding and self.task.members:
+                # 묶음은 압축할 만한 파일이 절반 이상일 때만
+                compressible = sum(os.path.getsize(path) for path, _ in self.task.members
+                                   if wire_codec.is_compressible_name(path))
+                if compressible * 2 >= self.task.total_size:
+                    self._encoding = encoding
+            elif encoding and wire_codec.is_compressible_name(self.task.local_path):
+                with open(self.task.local_path, 'rb') as f:
+                    if wire_codec.looks_compressible(f.read(wire_codec.SAMPLE_SIZE)):
+                        self._encoding = encoding
+            if self._encoding:
+                print(f"[업로드] 전송 압축 사용: {self._encoding}")
+        return self._encoding
+    
+    def _report(self):
+        """진행률/속도 알림 (task.uploaded 기준)"""
+        elapsed = time.time() - self.task.start_time
+        if elapsed > 0:
+            self.task.speed = self.task.uploaded / elapsed
+        if self.task.total_size > 0:
+            percent = int((self.task.uploaded / self.task.total_size) * 100)
+            speed_mb = self.task.speed / (1024 * 1024)
+            self.progress.emit(percent, f"{speed_mb:.1f} MB/s",
+                             self.task.uploaded, self.task.total_size)
+    
+    def _upload_delta(self):
+        """서버 파일 서명을 받아 델타로 전송 (해당 없으면 None → 분할 업로드, 취소 시 False)"""
+        params = {
+            'target_folder': self.task.target_folder,
+            'relative_path': self.task.relative_path,
+            'file_name': os.path.basename(self.task.local_path)
+        }
+        try:
+            response = self.session.get(f"{self.server_url}/api/delta/signature", params=params,
+                                        stream=True, timeout=(10, 300))
+            with response:
+                if response.status_code != 200:
+                    return None  # 새 파일이거나 델타를 지원하지 않는 이전 서버
+                base = response.headers.get('X-Delta-Base', '')
+                signature = delta_sync.parse_signature(response.content)
+        except (requests.exceptions.RequestException, delta_sync.DeltaError) as e:
+            print(f"[델타 업로드] 서명을 받지 못해 일반 업로드로 전송: {e}")
+            return None
+        if signature[1] < self.task.total_size // 2:
+            return None  # 대부분 새로 보내야 하면 여러 연결로 올리는 분할 업로드가 빠름
+        
+        # 델타를 먼저 임시 파일로 만들어 크기를 확인 (같은 파일/서명이면 델타도 같아 이어올리기 가능)
+        self.progress.emit(0, "델타 계산 중...", 0, self.task.total_size)
+        
+        def on_progress(done):
+            self.progress.emit(0, f"델타 계산 중... {done * 100 // max(self.task.total_size, 1)}%",
+                               0, self.task.total_size)
+        
+        spool = tempfile.NamedTemporaryFile(prefix='woori_delta_', suffix='.tmp', delete=False)
+        try:
+            with spool, open(self.task.local_path, 'rb') as f:
+                for data in delta_sync.iter_delta(f, signature, on_progress):
+                    if self.task.cancel_flag:
+                        return False
+                    spool.write(data)
+            delta_size = os.path.getsize(spool.name)
+            if delta_size >= self.task.total_size // 2:
+                # 델타 크기 ≈ 새로 보낼 내용: 절반 이상이면 여러 연결로 올리는 분할 업로드가 빠름
+                print(f"[델타 업로드] 바뀐 내용이 많아({delta_size:,} bytes) 분할 업로드로 전송")
+                return None
+            return self._send_delta(params, base, spool.name, delta_size)
+        finally:
+            os.remove(spool.name)
+    
+    def _send_delta(self, params, base, path, delta_size):
+        """델타 파일을 세션으로 나눠 보내고 서버에서 적용 (이전 서버면 작은 델타만 한 번에, 취소 시 False)"""
+        api = f"{self.server_url}/api/delta"
+        mtime = os.path.getmtime(self.task.local_path)
+        response = self.session.post(f"{api}/init", json={
+            **params, 'base': base, 'mtime': mtime, 'size': delta_size,
+            'chunk_size': self.link.segment_size if self.link else UPLOAD_CHUNK_SIZE
+        }, timeout=30)
+        if response.status_code == 404 and delta_size <= UPLOAD_CHUNK_SIZE:
+            # 세션을 지원하지 않는 이전 서버: 청크 하나 크기 이하일 때만 요청 하나로 보냄
+            try:
+                with open(path, 'rb') as f:
+                    response = self.session.post(f"{api}/upload", params={**params, 'base': base, 'mtime': mtime},
+                                                 data=f, timeout=120,
+                                                 headers={'Content-Type': 'application/octet-stream'})
+            except requests.exceptions.RequestException as e:
+                print(f"[델타 업로드] 전송 실패, 분할 업로드로 다시 보냅니다: {e}")
+                return None
+        else:
+            if response.status_code != 200:
+                print(f"[델타 업로드] 서버 오류 {response.status_code}, 분할 업로드로 전송: {response.text[:200]}")
+                return None
+            info = response.json()
+            upload_id = info['upload_id']
+            chunk_size = int(info.get('chunk_size') or UPLOAD_CHUNK_SIZE)
+            pending = self._pending_chunks(info, chunk_size, delta_size)
+            spans = [(index * chunk_size, min(chunk_size, delta_size - index * chunk_size)) for index in pending]
+            # 재사용하는 블록은 이미 올린 것으로 보고 남은 델타만큼 진행률 표시
+            self.task.uploaded = self.task.total_size - sum(length for _, length in spans)
+            print(f"[델타 업로드] 서버 파일과 다른 부분만 전송: 델타 {delta_size:,} bytes 중 "
+                  f"{sum(length for _, length in spans):,} bytes 남음")
+            self._report()
+            if not self._put_spans(f"{self.server_url}/api/upload/{upload_id}", spans, path):
+                return False
+            response = self.session.post(f"{api}/{upload_id}/commit", timeout=600)
+        if self.task.cancel_flag:
+            return False
+        if response.status_code != 200:
+            print(f"[델타 업로드] 서버 오류 {response.status_code}, 분할 업로드로 다시 보냅니다: {response.text[:200]}")
+            return None
+        stats = response.json()
+        print(f"[델타 업로드] 완료: 기존 블록 {stats.get('copied', 0):,} bytes 재사용, "
+              f"새로 보냄 {stats.get('literal', 0):,} bytes")
+        return True
+    
+    def _upload_chunked(self):
+        """세션 생성 → 남은 청크 PUT (connections개 동시) → 커밋 (취소 시 False)"""
+        api = f"{self.server_url}/api/upload"
+        response = self.session.post(f"{api}/init", json={
+            'target_folder': self.task.target_folder,
+            'relative_path': self.task.relative_path,
+            'file_name': os.path.basename(self.task.local_path),
+            'size': self.task.total_size,
+            'mtime': os.path.getmtime(self.task.local_path),
+            'chunk_size': self.link.segment_size if self.link else UPLOAD_CHUNK_SIZE  # 새 세션에만 적용
+        }, timeout=30)
+        if response.status_code == 404:
+            raise _LegacyUploadServer()
+        if response.status_code != 200:
+            raise Exception(f"서버 오류: {response.status_code} {response.text[:200]}")
+        info = response.json()
+        upload_id = info['upload_id']
+        chunk_size = int(info.get('chunk_size') or UPLOAD_CHUNK_SIZE)
+        
+        total = self.task.total_size
+        pending = self._pending_chunks(info, chunk_size)
+        self.task.uploaded = total - sum(min(chunk_size, total - i * chunk_size) for i in pending)
+        if self.task.uploaded > 0:
+            print(f"[업로드] 이어올리기: {self.task.uploaded:,} / {total:,} bytes 받음")
+        self._report()
+        
+        spans = [(index * chunk_size, min(chunk_size, total - index * chunk_size)) for index in pending]
+        if not self._put_spans(f"{api}/{upload_id}", spans):
+            return False
+        
+        response = self.session.post(f"{api}/{upload_id}/commit", timeout=60)
+        if response.status_code != 200:
+            raise Exception(f"서버 오류: {response.status_code} {response.text[:200]}")
+        return True
+    
+    def _upload_dedup(self):
+        """청크 해시 목록을 보내고 서버에 없는 청크만 전송 (서버가 지원하지 않으면 None, 취소 시 False)"""
+        self.progress.emit(0, "청크 해시 계산 중...", 0, self.task.total_size)
+        chunks = []
+        with open(self.task.local_path, 'rb') as f:
+            for offset, length, digest in chunk_store.iter_chunks(f):
+                if self.task.cancel_flag:
+                    return False
+                chunks.append((offset, length, digest))
+        
+        api = f"{self.server_url}/api/dedup"
+        response = self.session.post(f"{api}/init", json={
+            'target_folder': self.task.target_folder,
+            'relative_path': self.task.relative_path,
+            'file_name': os.path.basename(self.task.local_path),
+            'size': self.task.total_size,
+            'mtime': os.path.getmtime(self.task.local_path),
+            'chunks': [[digest, length] for _, length, digest in chunks]
+        }, timeout=60)
+        if response.status_code != 200:
+            if response.status_code != 404:  # 404: 이전 서버이거나 서버에서 꺼 둠
+                print(f"[중복 제거] 서버 오류 {response.status_code}, 분할 업로드로 전송: {response.text[:200]}")
+            return None
+        info = response.json()
+        upload_id = info['upload_id']
+        
+        for attempt in range(3):
+            # 이어진 청크는 구간 크기(제어기가 없으면 UPLOAD_CHUNK_SIZE)까지 한 요청으로 묶음
+            span_max = self.link.segment_size if self.link else UPLOAD_CHUNK_SIZE
+            spans = []
+            for index in sorted(info['missing']):
+                offset, length, _ = chunks[index]
+                if spans and spans[-1][0] + spans[-1][1] == offset and spans[-1][1] + length <= span_max:
+                    spans[-1][1] += length
+                else:
+                    spans.append([offset, length])
+            self.task.uploaded = self.task.total_size - sum(length for _, length in spans)
+            if attempt == 0 and self.task.uploaded > 0:
+                print(f"[중복 제거] 서버에 있는 {self.task.uploaded:,} bytes는 보내지 않음")
+            self._report()
+            if not self._put_spans(f"{api}/{upload_id}", spans):
+                return False
+            
+            response = self.session.post(f"{api}/{upload_id}/commit", timeout=600)
+            if response.status_code == 409 and 'missing' in response.json():
+                info = response.json()  # 재사용하려던 원본이 바뀜 → 그 청크만 다시 보냄
+                continue
+            break
+        if response.status_code != 200:
+            raise Exception(f"서버 오류: {response.status_code} {response.text[:200]}")
+        result = response.json()
+        if result.get('dedup_bytes'):
+            print(f"[중복 제거] {self.task.file_name}: {result['dedup_bytes']:,} bytes 절약"
+                  f" (전송 {result.get('received_bytes', 0):,} bytes)")
+        return True
+    
+    def _pending_chunks(self, info, chunk_size, total=None):
+        """서버 상태(청크 비트맵, 없으면 연속 offset)에서 아직 안 올린 청크 번호 목록 (total: 세션 크기)"""
+        count = -(-(self.task.total_size if total is None else total) // chunk_size)
+        if info.get('done') is not None:
+            bitmap = bytes.fromhex(info['done'])
+            return [i for i in range(count)
+                    if i >> 3 >= len(bitmap) or not bitmap[i >> 3] & (1 << (i & 7))]
+        return list(range(int(info.get('offset', 0)) // chunk_size, count))
+    
+    def _put_spans(self, url, spans, path=None):
+        """파일(기본은 업로드할 파일) 구간들을 connections개 연결로 동시에 PUT (취소 시 세션을 지우고 False)"""
+        workers = max(1, min(self.connections, len(spans)))
+        if workers > 1:
+            print(f"[업로드] {len(spans)}개 청크를 {workers}개 연결로 전송")
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._put_chunk, url, offset, length, stop, path)
+                       for offset, length in spans]
+            try:
+                while True:
+                    finished, not_finished = wait(futures, timeout=0.3)
+                    self._report()
+                    for future in finished:
+                        if future.exception() is not None:
+                            raise future.exception()
+                    if self.task.cancel_flag:
+                        stop.set()
+                        wait(futures)
+                        try:
+                            self.session.delete(url, timeout=10)
+                        except requests.exceptions.RequestException:
+                            pass
+                        return False
+                    if not not_finished:
+                        break
+            except BaseException:
+                stop.set()
+                wait(futures)
+                raise
+        return True
+    
+    def _put_chunk(self, url, offset, length, stop, path=None):
+        """파일 구간 하나 전송 (구간별 재시도, 다른 구간과 동시에 실행됨)"""
+        attempt = 0
+        while not stop.is_set():
+            sent = [0]
+            
+            def on_read(position):
+                with self._lock:
+                    self.task.uploaded += position - sent[0]
+                sent[0] = position
+            
+            if not self.grant.acquire(stop):
+                return
+            try:
+                try:
+                    with open(path or self.task.local_path, 'rb') as f:
+                        body, headers = self._chunk_body(f, offset, length, on_read)
+                        response = self.session.put(url, params={'offset': offset}, data=body,
+                                                    timeout=120, headers=headers)
+                finally:
+                    self.grant.release()
+                response.raise_for_status()
+                on_read(length)
+                return
+            except requests.exceptions.RequestException as e:
+                # 보낸 만큼 진행률에서 되돌림
+                on_read(0)
+                status = getattr(e.response, 'status_code', None)
+                if status is not None and 400 <= status < 500 and status != 408:
+                    raise
+                attempt += 1
+                if attempt > UPLOAD_MAX_RETRIES:
+                    raise
+                _report_retry(self.link)
+                print(f"[업로드] {offset:,} 위치 청크 전송 실패, 재시도 {attempt} ({e})")
+                time.sleep(min(2 * attempt, 10))
+    
+    def _chunk_body(self, f, offset, length, on_read):
+        """구간 PUT 본문과 헤더 (압축해서 줄어들면 압축본, 진행률은 원본 크기 기준)"""
+        headers = {'Content-Type': 'application/octet-stream'}
+        encoding = self._body_encoding()
+        if encoding:
+            f.seek(offset)
+            data = wire_codec.compress(f.read(length), encoding)
+            if len(data) < length:
+                headers['Content-Encoding'] = encoding
+                headers[wire_codec.LENGTH_HEADER] = str(length)
+                return _ChunkReader(io.BytesIO(data), 0, len(data),
+                                    lambda position: on_read(position * length // len(data))), headers
+        return _ChunkReader(f, offset, length, on_read), headers
+    
+    def _upload_tar(self):
+        """작은 파일 여러 개를 tar 스트림 하나로 전송 (취소 시 False)"""
+        def body():
+            buffer = _TarBuffer()
+            with tarfile.open(fileobj=buffer, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+                for local_path, relative_path in self.task.members:
+                    if self.task.cancel_flag:
+                        return  # 본문을 끊으면 서버는 받은 파일까지만 저장
+                    info = tar.gettarinfo(local_path, arcname=relative_path)
+                    with open(local_path, 'rb') as f:
+                        tar.addfile(info, f)
+                    self.task.uploaded += info.size
+                    self._report()
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            yield buffer.drain()
+        
+        print(f"[묶음 업로드] 파일 {len(self.task.members)}개, {self.task.total_size:,} bytes")
+        headers = {'Content-Type': 'application/x-tar'}
+        data = body()
+        encoding = self._body_encoding()
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            data = wire_codec.iter_compressed(data, encoding)
+        try:
+            response = self.session.post(f"{self.server_url}/api/upload/tar",
+                                         params={'target_folder': self.task.target_folder},
+                                         data=data, timeout=300, headers=headers)
+        except requests.exceptions.RequestException:
+            if self.task.cancel_flag:
+                return False
+            raise
+        if self.task.cancel_flag:
+            return False
+        if response.status_code == 404:
+            print("[묶음 업로드] 서버가 묶음 업로드를 지원하지 않아 파일별로 전송합니다")
+            return self._upload_members_one_by_one()
+        if response.status_code != 200:
+            raise Exception(f"서버 오류: {response.status_code} {response.text[:200]}")
+        skipped = response.json().get('skipped') or []
+        if skipped:
+            print(f"[묶음 업로드] 서버가 건너뛴 항목 {len(skipped)}개: {skipped[:10]}")
+        return True
+    
+    def _upload_members_one_by_one(self):
+        """이전 서버용: 묶음의 파일을 /upload 로 하나씩 전송 (취소 시 False)"""
+        self.task.uploaded = 0
+        for local_path, relative_path in self.task.members:
+            if self.task.cancel_flag:
+                return False
+            with open(local_path, 'rb') as f:
+                response = self.session.post(f"{self.server_url}/upload",
+                                             files={'file': (os.path.basename(local_path), f)},
+                                             data={'target_folder': self.task.target_folder,
+                                                   'relative_path': relative_path},
+                                             timeout=300)
+            if response.status_code != 200:
+                raise Exception(f"서버 오류: {response.status_code} ({relative_path})")
+            self.task.uploaded += os.path.getsize(local_path)
+            self._report()
+        return True
+    
+    def _upload_multipart(self):
+        """이전 서버용: 파일 하나를 multipart POST 한 번으로 전송"""
+        url = f"{self.server_url}/upload"
+        # 파일을 청크로 읽어서 업로드 진행률 추적
+        try:
+            from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+            use_toolbelt = True
+        except ImportError:
+            use_toolbelt = False
+        
+        if use_toolbelt:
+            # requests_toolbelt 사용 (진행률 추적 가능)
+            with open(self.task.local_path, 'rb') as f:
+                encoder = MultipartEncoder(
+                    fields={
+                        'file': (os.path.basename(self.task.local_path), f, 'application/octet-stream'),
+                        'target_folder': self.task.target_folder,
+                        'relative_path': self.task.relative_path
+                    }
+                )
+                
+                def callback(monitor):
+                    if self.task.cancel_flag:
+                        return
+                    
+                    self.task.uploaded = monitor.bytes_read
+                    elapsed = time.time() - self.task.start_time
+                    if elapsed > 0:
+                        self.task.speed = self.task.uploaded / elapsed
+                    
+                    if self.task.total_size > 0:
+                        percent = int((self.task.uploaded / self.task.total_size) * 100)
+                        speed_mb = self.task.speed / (1024 * 1024)
+                        self.progress.emit(percent, f"{speed_mb:.1f} MB/s",
+                                         self.task.uploaded, self.task.total_size)
+                
+                monitor = MultipartEncoderMonitor(encoder, callback)
+                
+                response = self.session.post(
+                    url,
+                    data=monitor,
+                    headers={'Content-Type': monitor.content_type},
+                    timeout=300
+                )
+        else:
+            # 기본 requests 사용 (진행률 추적 불가)
+            with open(self.task.local_path, 'rb') as f:
+                files = {'file': (os.path.basename(self.task.local_path), f)}
+                data = {
+                    'target_folder': self.task.target_folder,
+                    'relative_path': self.task.relative_path
+                }
+                
+                # 간단한 진행률 표시 (업로드 시작/완료만)
+                self.progress.emit(50, "업로드 중...", self.task.total_size // 2, self.task.total_size)
+                
+                response = self.session.post(url, files=files, data=data, timeout=300)
+        
+        response_info = f"[DEBUG 업로드 응답]"
+        response_info += f"\n  - 상태코드: {response.status_code}"
+        response_info += f"\n  - 응답내용: {response.text[:500]}"
+        print(response_info)
+        if hasattr(self.parent(), 'add_log'):
+            self.parent().add_log(response_info)
+        
+        if response.status_code != 200:
+            raise Exception(f"서버 오류: {response.status_code}")
+
+
+class FolderSyncThread(QThread):
+    """폴더 동기화 업로드 준비: 서버 매니페스트와 비교해 올릴 파일만 추림
+    
+    - 크기와 mtime이 같으면 건너뜀
+    - 해시 모드면 mtime이 달라도 크기와 sha256이 같으면 건너뜀 (다시 빌드만 된 파일)
+    """
+    finished = pyqtSignal(list, int, int, str)  # 올릴 파일 목록, 건너뛴 파일 수, 건너뛴 크기, 안내 메시지
+    
+    def __init__(self, session, server_url, remote_folder, file_list, sizes, use_hash, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.server_url = server_url
+        self.remote_folder = remote_folder
+        self.file_list = file_list
+        self.sizes = sizes
+        self.use_hash = use_hash
+    
+    def run(self):
+        try:
+            remote = self.fetch_manifest()
+        except Exception as e:
+            self.finished.emit(self.file_list, 0, 0, f"서버 목록 비교 실패, 전체 업로드: {e}")
+            return
+        if remote is None:
+            self.finished.emit(self.file_list, 0, 0, "서버에 같은 폴더가 없어 전체 업로드")
+            return
+        
+        to_upload = []
+        skipped = 0
+        skipped_bytes = 0
+        for file_path, relative_path in self.file_list:
+            # relative_path는 "폴더이름/하위 경로" → 매니페스트 경로는 폴더 기준 '/' 구분
+            key = relative_path.replace(os.sep, '/').split('/', 1)[-1]
+            if self.is_unchanged(file_path, remote.get(key)):
+                skipped += 1
+                skipped_bytes += self.sizes.get(file_path, 0)
+            else:
+                to_upload.append((file_path, relative_path))
+        self.finished.emit(to_upload, skipped, skipped_bytes, "")
+    
+    def fetch_manifest(self):
+        """서버 폴더 매니페스트 → {상대 경로: 레코드} (폴더가 없으면 None)"""
+        params = {'path': self.remote_folder}
+        if self.use_hash:
+            params['hash'] = 'sha256'
+        response = self.session.get(f"{self.server_url}/api/manifest", params=params,
+                                    stream=True, timeout=(10, 300))
+        with response:
+            if response.status_code == 404:
+                return None  # 새 폴더 (또는 매니페스트를 모르는 이전 서버)
+            response.raise_for_status()
+            remote = {}
+            complete = False
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get('type') == 'file':
+                    remote[record['path']] = record
+                elif record.get('type') == 'end':
+                    complete = True
+            if not complete:
+                raise Exception("매니페스트가 중간에 끊김")
+        return remote
+    
+    def is_unchanged(self, file_path, record):
+        if record is None:
+            return False
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        if st.st_size != record.get('size'):
+            return False
+        if abs(st.st_mtime - record.get('mtime', 0)) <= SYNC_MTIME_TOLERANCE:
+            return True
+        if not self.use_hash or not record.get('sha256'):
+            return False
+        h = hashlib.sha256()
+        try:
+            with open(file_path, 'rb') as f:
+                while True:
+                    data = f.read(1024 * 1024)
+                    if not data:
+                        break
+                    h.update(data)
+        except OSError:
+            return False
+        return h.hexdigest() == record['sha256']
+
+
+class _SourceChanged(Exception):
+    """이어받는 도중 서버 파일이 바뀜 (If-Range 불일치로 200 응답)"""
+
+
+class _DeltaCancelled(Exception):
+    """델타 다운로드 도중 취소"""
 
 
 class DownloadThread(QThread):
@@ -354,12 +980,25 @@ class DownloadThread(QThread):
     progress = pyqtSignal(int, str, int, int)  # 진행률, 속도, 다운로드된 크기, 전체 크기
     finished = pyqtSignal(bool, str)  # 성공여부, 메시지
     
-    def __init__(self, task, server_url, session, is_folder=False):
+    def __init__(self, task, server_url, session, is_folder=False, connections=1, link=None, grant=None):
         super().__init__()
         self.task = task
         self.server_url = server_url
         self.session = session
         self.is_folder = is_folder
+        # 큰 파일을 여러 연결로 나눠 받을 때의 최대 동시 연결 수
+        self.connections = max(1, int(connections))
+        self.link = link  # transfer_control.AimdController (구간 크기, 재시도 보고)
+        # 지금 쓸 수 있는 연결 수 (스케줄러가 전체 예산을 나눠 바꿈, 없으면 connections 고정)
+        self.grant = grant or transfer_control.ConnectionGrant(self.connections)
+        # 받는 동안은 .part에 쓰고, 사이드카(.part.json)에 ETag/위치를 기록
+        self.part_path = task.save_path + '.part'
+        self.state_path = task.save_path + '.part.json'
+        self.etag = None
+        self.saved_offset = 0
+        self.segments = None  # 분할 다운로드 구간: [[시작, 끝, 받은 크기], ...]
+        self.extracted = False  # 폴더 ZIP을 받으면서 바로 풀었음 (.zip 없음)
+        self._lock = threading.Lock()
     
     def run(self):
         try:
@@ -370,61 +1009,41 @@ class DownloadThread(QThread):
             if self.is_folder:
                 # 폴더는 ZIP으로만 다운로드 (서버에서 압축)
                 url = f"{self.server_url}/download_folder"
-                # 폴더는 압축 시간이 필요하므로 타임아웃을 길게 설정
+                # 서버가 ZIP을 스트리밍하므로 첫 바이트가 바로 도착하지만
+                # 큰 파일 읽기 지연을 고려해 타임아웃은 여유 있게 설정
                 timeout = 300  # 5분
             else:
                 url = f"{self.server_url}/download"
                 timeout = 60  # 1분
             
             params = {'path': self.task.file_path}
+            # 이전에 받다 만 .part 파일이 있으면 이어받기 (클라이언트 재시작 후에도)
+            state = self._read_resume_state()
             
-            # 재시도 로직 (최대 2번)
-            max_retries = 2
-            for attempt in range(max_retries):
-                try:
-                    response = self.session.get(url, params=params, stream=True, timeout=timeout)
-                    response.raise_for_status()
-                    break  # 성공하면 루프 탈출
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        print(f"[재시도] {attempt + 1}번째 시도 실패, 재시도 중... ({e})")
-                        time.sleep(2)  # 2초 대기 후 재시도
-                    else:
-                        raise  # 마지막 시도에서도 실패하면 예외 발생
+            done = None
+            # 받을 위치에 이전 파일이 있으면 바뀐 블록만 받기
+            if (not self.is_folder and not state and os.path.isfile(self.task.save_path)
+                    and os.path.getsize(self.task.save_path) >= DELTA_MIN_SIZE):
+                done = self._run_delta(params)
+            if done is None and not self.is_folder and self.connections > 1:
+                done = self._run_segmented(url, params, timeout, state)
+            # 폴더 그대로 받기는 .zip을 저장하지 않고 받으면서 풀기
+            if done is None and self.is_folder and getattr(self.task, 'auto_extract', False) and not state:
+                done = self._run_extract(url, params, timeout)
+            if done is None:
+                done = self._run_single(url, params, timeout, state)
+            if not done:
+                return  # 취소됨
             
-            self.task.total_size = int(response.headers.get('content-length', 0))
-            self.task.downloaded = 0
+            if self.extracted:
+                self._clear_resume_state()
+                self.task.status = 'completed'
+                self.finished.emit(True, "완료 (압축 해제)")
+                return
             
-            with open(self.task.save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1048576):
-                    if self.task.cancel_flag:
-                        # 취소 시 부분 파일 삭제
-                        try:
-                            f.close()
-                            if os.path.exists(self.task.save_path):
-                                os.remove(self.task.save_path)
-                                print(f"[취소] 부분 파일 삭제: {self.task.save_path}")
-                        except Exception as del_err:
-                            print(f"[취소] 파일 삭제 실패: {del_err}")
-                        self.finished.emit(False, "취소됨")
-                        return
-                    
-                    while self.task.pause_flag and not self.task.cancel_flag:
-                        time.sleep(0.1)
-                    
-                    if chunk:
-                        f.write(chunk)
-                        self.task.downloaded += len(chunk)
-                        
-                        elapsed = time.time() - self.task.start_time
-                        if elapsed > 0:
-                            self.task.speed = self.task.downloaded / elapsed
-                        
-                        if self.task.total_size > 0:
-                            percent = int((self.task.downloaded / self.task.total_size) * 100)
-                            speed_mb = self.task.speed / (1024 * 1024)
-                            self.progress.emit(percent, f"{speed_mb:.1f} MB/s", 
-                                             self.task.downloaded, self.task.total_size)
+            # 완료: .part → 최종 파일, 이어받기 정보 삭제
+            os.replace(self.part_path, self.task.save_path)
+            self._clear_resume_state(remove_part=False)
             
             self.task.status = 'completed'
             
@@ -446,14 +1065,688 @@ class DownloadThread(QThread):
         except Exception as e:
             self.task.status = 'error'
             self.task.error_msg = str(e)
-            # 오류 시 부분 파일 삭제
+            if self.etag and self.task.downloaded > 0:
+                # 이어받기 가능: 부분 파일을 남겨 두고 다음 다운로드 때 계속
+                self._save_resume_state()
+                print(f"[오류] 부분 파일 보관 (다음에 이어받기): {self.part_path}")
+            else:
+                # 오류 시 부분 파일 삭제
+                self._clear_resume_state()
+            self.finished.emit(False, f"오류: {e}")
+    
+    def _run_single(self, url, params, timeout, state):
+        """연결 하나로 받기 (끊기면 받은 위치부터 Range로 이어받기). 취소 시 False"""
+        self.segments = None
+        self.task.downloaded, self.etag = 0, None
+        if state and 'offset' in state:
+            # 사이드카 기록 이후 일부만 디스크에 남았을 수 있으므로 작은 쪽 기준
+            self.task.downloaded = min(int(state['offset']), os.path.getsize(self.part_path))
+            self.etag = state['etag']
+            print(f"[이어받기] 부분 파일 발견: {self.part_path} ({self.task.downloaded:,} bytes)")
+        
+        # 재시도 로직: 연결이 끊기면 받은 위치부터 Range로 이어받기
+        max_retries = 5
+        attempt = 0
+        with open(self.part_path, 'r+b' if self.task.downloaded > 0 else 'wb') as f:
+            while True:
+                headers = {wire_codec.ENCODING_HEADER: ', '.join(wire_codec.available())}
+                if self.etag and self.task.downloaded > 0:
+                    headers['Range'] = f"bytes={self.task.downloaded}-"
+                    headers['If-Range'] = self.etag
+                try:
+                    response = self.session.get(url, params=params, headers=headers,
+                                                stream=True, timeout=timeout)
+                    try:
+                        response.raise_for_status()
+                        self._prepare_target(response, f)
+                        if response.headers.get('Accept-Ranges') == 'bytes':
+                            self.etag = response.headers.get('ETag')
+                        else:
+                            self.etag = None
+                        if not self._receive(response, f):
+                            return False  # 취소됨
+                    finally:
+                        response.close()
+                    return True
+                except requests.exceptions.RequestException as e:
+                    attempt += 1
+                    if attempt > max_retries or self.task.cancel_flag:
+                        raise
+                    status = getattr(getattr(e, 'response', None), 'status_code', None)
+                    if status is not None and 400 <= status < 500:
+                        raise  # 권한/경로 오류는 재시도해도 동일
+                    _report_retry(self.link)
+                    f.flush()
+                    self._save_resume_state()
+                    if self.etag and self.task.downloaded > 0:
+                        print(f"[재시도] {attempt}번째 시도 실패, {self.task.downloaded:,} bytes부터 이어받기... ({e})")
+                    else:
+                        print(f"[재시도] {attempt}번째 시도 실패, 재시도 중... ({e})")
+                    time.sleep(min(2 * attempt, 10))
+    
+    def _run_extract(self, url, params, timeout):
+        """폴더 ZIP을 받으면서 항목별로 바로 풀기 (끊기면 받은 위치부터 Range로 이어받기)
+        
+        받으면서 풀 수 없는 ZIP이면 None (.zip으로 받아서 풀기), 취소 시 False, 완료 시 True
+        """
+        self.segments = None
+        self.task.downloaded, self.etag = 0, None
+        extract_dir = self.task.save_path[:-4]  # .zip 제거
+        extractor = zip_extract.ZipStreamExtractor(extract_dir)
+        max_retries = 5
+        attempt = 0
+        try:
+            while True:
+                headers = {}
+                if self.etag and self.task.downloaded > 0:
+                    headers['Range'] = f"bytes={self.task.downloaded}-"
+                    headers['If-Range'] = self.etag
+                try:
+                    with self.session.get(url, params=params, headers=headers,
+                                          stream=True, timeout=timeout) as response:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            if extractor.fed:
+                                # 서버 폴더가 바뀌어 처음부터: 이미 푼 파일은 덮어씀
+                                print("[이어받기] 서버 내용이 바뀌어 처음부터 다시 받습니다")
+                                extractor.abort()
+                                extractor = zip_extract.ZipStreamExtractor(extract_dir)
+                            self.task.downloaded = 0
+                            self.task.total_size = int(response.headers.get('content-length', 0))
+                        else:
+                            content_range = response.headers.get('Content-Range', '')
+                            if not content_range.startswith(f"bytes {self.task.downloaded}-"):
+                                raise zip_extract.ZipExtractError(f"잘못된 부분 응답: {content_range}")
+                            self.task.total_size = int(content_range.rsplit('/', 1)[1])
+                        if response.headers.get('Accept-Ranges') == 'bytes':
+                            self.etag = response.headers.get('ETag')
+                        else:
+                            self.etag = None
+                        for chunk in response.iter_content(chunk_size=1048576):
+                            if self.task.cancel_flag:
+                                extractor.abort()
+                                self.etag = None  # 풀던 폴더는 이어받을 .part가 없음
+                                self._on_cancel()
+                                return False
+                            while self.task.pause_flag and not self.task.cancel_flag:
+                                time.sleep(0.1)
+                            if chunk:
+                                extractor.feed(chunk)
+                                self.task.downloaded += len(chunk)
+                                self._emit_progress()
+                    if self.task.total_size and self.task.downloaded < self.task.total_size:
+                        raise requests.exceptions.ConnectionError("응답이 일찍 끝남")
+                    extractor.close()
+                    break
+                except requests.exceptions.RequestException as e:
+                    attempt += 1
+                    status = getattr(getattr(e, 'response', None), 'status_code', None)
+                    if attempt > max_retries or self.task.cancel_flag or (status is not None and 400 <= status < 500):
+                        raise
+                    _report_retry(self.link)
+                    if self.etag and self.task.downloaded > 0:
+                        print(f"[재시도] {attempt}번째 시도 실패, {self.task.downloaded:,} bytes부터 이어받기... ({e})")
+                    else:
+                        print(f"[재시도] {attempt}번째 시도 실패, 재시도 중... ({e})")
+                    time.sleep(min(2 * attempt, 10))
+        except zip_extract.ZipExtractError as e:
+            extractor.abort()
+            self.etag = None
+            print(f"[폴더 다운로드] 받으면서 풀 수 없는 ZIP이라 저장 후 풀기로 전환: {e}")
+            return None
+        except BaseException:
+            extractor.abort()
+            self.etag = None  # 실패 시 남길 .part가 없음
+            raise
+        print(f"[폴더 다운로드] 받으면서 압축 해제 완료: {extractor.file_count}개 파일")
+        self.extracted = True
+        return True
+    
+    def _run_delta(self, params):
+        """이전 파일의 서명을 보내고 델타를 받아 .part에 복원
+        
+        서버가 지원하지 않거나 실패하면 None (전체 받기), 취소 시 False, 완료 시 True
+        """
+        self.segments = None
+        self.task.downloaded, self.etag = 0, None
+        last_emit = 0
+        
+        def read(size):
+            if self.task.cancel_flag:
+                raise _DeltaCancelled()
+            while self.task.pause_flag and not self.task.cancel_flag:
+                time.sleep(0.1)
+            return response.raw.read(size)
+        
+        def on_progress(done):
+            nonlocal last_emit
+            self.task.downloaded = done
+            if done - last_emit >= 1024 * 1024:
+                last_emit = done
+                self._emit_progress()
+        
+        try:
+            with open(self.task.save_path, 'rb') as basis:
+                block_size = delta_sync.block_size_for(os.fstat(basis.fileno()).st_size)
+                parts = []
+                for data in delta_sync.iter_signature(basis, block_size):
+                    if self.task.cancel_flag:
+                        raise _DeltaCancelled()
+                    parts.append(data)
+                response = self.session.post(f"{self.server_url}/api/delta/download", params=params,
+                                             data=b''.join(parts), stream=True, timeout=(10, 300),
+                                             headers={'Content-Type': 'application/octet-stream'})
+                with response:
+                    if response.status_code != 200:
+                        return None  # 델타를 지원하지 않는 이전 서버 등
+                    self.task.total_size = int(response.headers.get('X-File-Size', 0) or 0)
+                    response.raw.decode_content = True
+                    print(f"[델타 다운로드] 이전 파일과 비교해 바뀐 블록만 받기: {self.task.file_name}")
+                    with open(self.part_path, 'wb') as out:
+                        stats = delta_sync.apply_delta(read, basis, out, block_size, on_progress)
+        except _DeltaCancelled:
+            self._on_cancel()
+            return False
+        except (requests.exceptions.RequestException, delta_sync.DeltaError, OSError) as e:
+            print(f"[델타 다운로드] 실패, 전체를 다시 받습니다: {e}")
+            self._clear_resume_state()
+            return None
+        
+        print(f"[델타 다운로드] 완료: 기존 블록 {stats['copied']:,} bytes 재사용, "
+              f"새로 받음 {stats['literal']:,} bytes")
+        return True
+    
+    def _run_segmented(self, url, params, timeout, state):
+        """큰 파일을 N개 구간으로 나눠 동시에 받기
+        
+        분할할 수 없으면(작은 파일, Range 미지원) None, 취소 시 False, 완료 시 True
+        """
+        if state and state.get('segments'):
+            self.etag = state['etag']
+            total = int(state['total'])
+            segments = state['segments']
+            print(f"[분할 다운로드] 부분 파일 발견: {self.part_path}")
+        else:
+            if state:
+                return None  # 단일 연결로 받던 파일은 그대로 이어받기
+            probe = self.session.head(url, params=params, timeout=timeout, allow_redirects=True)
+            total = int(probe.headers.get('Content-Length', 0) or 0)
+            if (probe.status_code != 200 or probe.headers.get('Accept-Ranges') != 'bytes'
+                    or not probe.headers.get('ETag') or total < SEGMENTED_MIN_SIZE):
+                return None
+            self.etag = probe.headers['ETag']
+            # 연결 수만큼 나누되 구간은 제어기가 정한 크기 이하로 (재시도/마지막 구간이 짧아지도록)
+            seg_size = -(-total // self.connections)
+            if self.link is not None:
+                seg_size = min(seg_size, self.link.segment_size)
+            segments = [[start, min(start + seg_size, total), 0]
+                        for start in range(0, total, seg_size)]
+        
+        self.segments = segments
+        self.task.total_size = total
+        self.task.downloaded = sum(seg[2] for seg in segments)
+        self.saved_offset = self.task.downloaded
+        pending = [seg for seg in segments if seg[0] + seg[2] < seg[1]]
+        print(f"[분할 다운로드] {len(segments)}개 구간, 남은 구간 {len(pending)}개, 전체 {total:,} bytes")
+        
+        with open(self.part_path, 'r+b' if state else 'wb') as f:
+            f.truncate(total)  # 미리 전체 크기로 할당
+            write = self._positional_writer(f)
+            stop = threading.Event()
+            with ThreadPoolExecutor(max_workers=max(1, min(self.connections, len(pending)))) as pool:
+                futures = [pool.submit(self._fetch_segment, url, params, seg, timeout, write, stop)
+                           for seg in pending]
+                try:
+                    while True:
+                        finished, not_finished = wait(futures, timeout=0.3)
+                        self._emit_progress()
+                        if self.task.downloaded - self.saved_offset >= RESUME_SAVE_INTERVAL:
+                            self._save_resume_state()
+                            self.saved_offset = self.task.downloaded
+                        for future in finished:
+                            if future.exception() is not None:
+                                raise future.exception()
+                        if self.task.cancel_flag:
+                            stop.set()
+                            wait(futures)
+                            f.close()
+                            self._on_cancel()
+                            return False
+                        if not not_finished:
+                            break
+                except _SourceChanged:
+                    stop.set()
+                    wait(futures)
+                    f.close()
+                    print("[분할 다운로드] 서버 파일이 바뀌어 처음부터 다시 받습니다")
+                    self._clear_resume_state()
+                    return self._run_segmented(url, params, timeout, None) if state else None
+                except BaseException:
+                    stop.set()
+                    wait(futures)
+                    raise
+        return True
+    
+    def _positional_writer(self, f):
+        """지정 위치 쓰기 함수 (os.pwrite가 없으면 잠금 + seek)"""
+        if hasattr(os, 'pwrite'):
+            fd = f.fileno()
+            
+            def write(data, pos):
+                view = memoryview(data)
+                while view:
+                    written = os.pwrite(fd, view, pos)
+                    view = view[written:]
+                    pos += written
+        else:
+            write_lock = threading.Lock()
+            
+            def write(data, pos):
+                with write_lock:
+                    f.seek(pos)
+                    f.write(data)
+        return write
+    
+    def _fetch_segment(self, url, params, seg, timeout, write, stop):
+        """구간 하나를 받아 해당 위치에 기록 (구간별 재시도)"""
+        attempt = 0
+        while seg[0] + seg[2] < seg[1]:
+            if stop.is_set() or self.task.cancel_flag:
+                return
+            pos = seg[0] + seg[2]
+            headers = {'Range': f"bytes={pos}-{seg[1] - 1}", 'If-Range': self.etag,
+                       wire_codec.ENCODING_HEADER: ', '.join(wire_codec.available())}
+            if not self.grant.acquire(stop):
+                return
             try:
-                if os.path.exists(self.task.save_path):
-                    os.remove(self.task.save_path)
-                    print(f"[오류] 부분 파일 삭제: {self.task.save_path}")
+                try:
+                    with self.session.get(url, params=params, headers=headers,
+                                          stream=True, timeout=timeout) as response:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            raise _SourceChanged()
+                        for chunk in _iter_response(response):
+                            if stop.is_set() or self.task.cancel_flag:
+                                return
+                            while self.task.pause_flag and not self.task.cancel_flag:
+                                time.sleep(0.1)
+                            if not chunk:
+                                continue
+                            chunk = chunk[:seg[1] - pos]
+                            write(chunk, pos)
+                            pos += len(chunk)
+                            with self._lock:
+                                seg[2] += len(chunk)
+                                self.task.downloaded += len(chunk)
+                            attempt = 0
+                finally:
+                    self.grant.release()
+                if seg[0] + seg[2] < seg[1]:
+                    raise requests.exceptions.ConnectionError("구간 응답이 일찍 끝남")
+            except requests.exceptions.RequestException as e:
+                attempt += 1
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if attempt > SEGMENT_MAX_RETRIES or (status is not None and 400 <= status < 500):
+                    raise
+                _report_retry(self.link)
+                print(f"[분할 다운로드] 구간 {seg[0]:,}~{seg[1]:,} 재시도 {attempt} ({e})")
+                stop.wait(min(2 * attempt, 10))
+    
+    def _read_resume_state(self):
+        """.part 사이드카 읽기 - 원본 경로가 같고 부분 파일이 있을 때만 사용"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as sf:
+                state = json.load(sf)
+            if state.get('path') != self.task.file_path or not state.get('etag'):
+                return None
+            if not os.path.exists(self.part_path):
+                return None
+            return state
+        except (OSError, ValueError):
+            return None
+    
+    def _save_resume_state(self):
+        """이어받기 정보 저장 (ETag, 받은 크기 또는 구간별 진행)"""
+        if not self.etag:
+            return
+        state = {
+            'path': self.task.file_path,
+            'etag': self.etag,
+            'total': self.task.total_size
+        }
+        if self.segments is not None:
+            with self._lock:
+                state['segments'] = [list(seg) for seg in self.segments]
+        else:
+            state['offset'] = self.task.downloaded
+        try:
+            with open(self.state_path, 'w', encoding='utf-8') as sf:
+                json.dump(state, sf, ensure_ascii=False)
+        except OSError as e:
+            print(f"[이어받기] 상태 저장 실패: {e}")
+    
+    def _clear_resume_state(self, remove_part=True):
+        """부분 파일/사이드카 삭제"""
+        paths = [self.state_path, self.part_path] if remove_part else [self.state_path]
+        for path in paths:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
             except Exception as del_err:
                 print(f"[오류] 파일 삭제 실패: {del_err}")
+    
+    def _on_cancel(self):
+        """취소/종료 처리 (종료 시에는 부분 파일 보관)"""
+        if self.task.keep_partial and self.etag:
+            # 프로그램 종료: 다음 실행 때 이어받도록 부분 파일 보관
+            self._save_resume_state()
+            print(f"[종료] 부분 파일 보관: {self.part_path}")
+        else:
+            # 취소 시 부분 파일 삭제
+            self._clear_resume_state()
+            print(f"[취소] 부분 파일 삭제: {self.part_path}")
+        self.finished.emit(False, "취소됨")
+    
+    def _prepare_target(self, response, f):
+        """응답 상태에 맞춰 저장 파일 위치 조정 (206: 이어쓰기, 200: 처음부터)"""
+        if response.status_code == 206:
+            # Content-Range: bytes start-end/total
+            content_range = response.headers.get('Content-Range', '')
+            try:
+                range_part, total = content_range.split(' ', 1)[1].split('/')
+                start = int(range_part.split('-')[0])
+                self.task.total_size = int(total)
+            except (IndexError, ValueError):
+                start = -1
+            if start == self.task.downloaded:
+                f.seek(start)
+                f.truncate()
+                self.saved_offset = start
+                print(f"[이어받기] {start:,} bytes부터 계속")
+                return
+            # 예상과 다른 구간 → 다음 시도는 처음부터
+            self.task.downloaded = 0
+            raise requests.exceptions.RequestException(f"잘못된 부분 응답: {content_range}")
+        if self.task.downloaded > 0:
+            print("[이어받기] 서버 내용이 바뀌어 처음부터 다시 받습니다")
+        f.seek(0)
+        f.truncate()
+        self.task.downloaded = 0
+        self.saved_offset = 0
+        # 전송 압축 응답은 Content-Length가 없고 원본 크기를 따로 알려줌
+        self.task.total_size = int(response.headers.get(wire_codec.LENGTH_HEADER)
+                                   or response.headers.get('content-length', 0))
+    
+    def _receive(self, response, f):
+        """응답 본문을 파일에 기록 (취소 시 False)"""
+        for chunk in _iter_response(response):
+            if self.task.cancel_flag:
+                f.close()
+                self._on_cancel()
+                return False
+            
+            while self.task.pause_flag and not self.task.cancel_flag:
+                time.sleep(0.1)
+            
+            if chunk:
+                f.write(chunk)
+                self.task.downloaded += len(chunk)
+                
+                # 주기적으로 이어받기 정보 기록 (비정상 종료 대비)
+                if self.etag and self.task.downloaded - self.saved_offset >= RESUME_SAVE_INTERVAL:
+                    f.flush()
+                    self._save_resume_state()
+                    self.saved_offset = self.task.downloaded
+                
+                self._emit_progress()
+        return True
+    
+    def _emit_progress(self):
+        """진행률/속도 알림 (분할 다운로드는 모든 구간 합계)"""
+        elapsed = time.time() - self.task.start_time
+        if elapsed > 0:
+            self.task.speed = self.task.downloaded / elapsed
+        
+        speed_mb = self.task.speed / (1024 * 1024)
+        if self.task.total_size > 0:
+            percent = int((self.task.downloaded / self.task.total_size) * 100)
+            self.progress.emit(percent, f"{speed_mb:.1f} MB/s", 
+                             self.task.downloaded, self.task.total_size)
+        else:
+            # 스트리밍 ZIP 등 전체 크기를 모르는 경우 받은 용량만 표시
+            self.progress.emit(0, f"{speed_mb:.1f} MB/s", self.task.downloaded, 0)
+
+
+class FolderDownloadThread(DownloadThread):
+    """폴더 그대로 받기: ZIP 없이 서버 매니페스트를 받아 파일별로 동시에 내려받음
+    
+    - 파일마다 '.part'에 받고 완료되면 원래 이름으로 바꾼 뒤 서버 mtime을 기록
+    - 다시 받으면 크기와 mtime이 같은 파일은 건너뛰고, 남은 .part는 Range로 이어받기
+      (.part.json에 기록한 버전(크기, mtime)이 지금 매니페스트와 같을 때만,
+       If-Range에 그 mtime을 넣어 요청 사이에 바뀐 파일은 처음부터)
+    - 진행률은 폴더 전체 합계
+    - 매니페스트를 모르는 이전 서버면 ZIP으로 받아 압축 해제
+    """
+    def __init__(self, task, server_url, session, connections=1, link=None, grant=None):
+        super().__init__(task, server_url, session, is_folder=True, connections=connections,
+                         link=link, grant=grant)
+        self.failed = []
+    
+    def run(self):
+        try:
+            self.task.status = 'downloading'
+            self.task.start_time = time.time()
+            records = self._fetch_manifest()
+            if records is None:
+                print("[폴더 다운로드] 서버가 매니페스트를 지원하지 않아 ZIP으로 받습니다")
+                self._fallback_to_zip()
+                super().run()
+                return
+            if not self._run_native(records):
+                return  # 취소됨
+            if self.failed:
+                self.task.status = 'error'
+                self.task.error_msg = f"{len(self.failed)}개 파일 실패"
+                self.finished.emit(False, f"오류: {len(self.failed)}개 파일 실패 (다시 받으면 이어받기)")
+                return
+            self.task.status = 'completed'
+            self.finished.emit(True, "완료")
+        except Exception as e:
+            self.task.status = 'error'
+            self.task.error_msg = str(e)
             self.finished.emit(False, f"오류: {e}")
+    
+    def _fetch_manifest(self):
+        """서버 폴더 매니페스트 → 레코드 목록 (매니페스트를 모르는 서버면 None)"""
+        response = self.session.get(f"{self.server_url}/api/manifest", params={'path': self.task.file_path},
+                                    stream=True, timeout=(10, 300))
+        with response:
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            records = []
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get('type') == 'end':
+                    return records
+                records.append(record)
+        raise requests.exceptions.ConnectionError("매니페스트가 중간에 끊김")
+    
+    def _fallback_to_zip(self):
+        self.task.save_path += '.zip'
+        self.task.auto_extract = True
+        self.part_path = self.task.save_path + '.part'
+        self.state_path = self.task.save_path + '.part.json'
+    
+    def _local_path(self, rel_path):
+        parts = [p for p in rel_path.split('/') if p not in ('', '.', '..')]
+        return os.path.join(self.task.save_path, *parts)
+    
+    def _run_native(self, records):
+        """매니페스트대로 폴더 트리를 만들고 파일을 작업자 풀로 받기 (취소 시 False)"""
+        os.makedirs(self.task.save_path, exist_ok=True)
+        files = []
+        for record in records:
+            local_path = self._local_path(record['path'])
+            if record.get('type') == 'dir':
+                os.makedirs(local_path, exist_ok=True)
+            elif record.get('type') == 'file':
+                files.append((record, local_path))
+        
+        self.task.total_size = sum(record['size'] for record, _ in files)
+        self.task.downloaded = 0
+        pending = []
+        for record, local_path in files:
+            if self._is_unchanged(local_path, record):
+                self.task.downloaded += record['size']
+            else:
+                pending.append((record, local_path))
+        skipped = len(files) - len(pending)
+        print(f"[폴더 다운로드] {len(files)}개 파일, {self.task.total_size:,} bytes"
+              + (f" (변경 없음 {skipped}개 건너뜀)" if skipped else ""))
+        # 큰 파일부터 시작해 마지막에 큰 파일 하나만 남아 도는 시간을 줄임
+        pending.sort(key=lambda item: item[0]['size'], reverse=True)
+        
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.connections) as pool:
+            futures = [pool.submit(self._fetch_file, record, local_path, stop)
+                       for record, local_path in pending]
+            try:
+                while True:
+                    finished, not_finished = wait(futures, timeout=0.3)
+                    self._emit_progress()
+                    if self.task.cancel_flag:
+                        stop.set()
+                        wait(futures)
+                        self._on_folder_cancel(pending)
+                        return False
+                    if not not_finished:
+                        break
+            except BaseException:
+                stop.set()
+                wait(futures)
+                raise
+        self._emit_progress()
+        return True
+    
+    def _is_unchanged(self, local_path, record):
+        try:
+            st = os.stat(local_path)
+        except OSError:
+            return False
+        return st.st_size == record['size'] and abs(st.st_mtime - record['mtime']) <= SYNC_MTIME_TOLERANCE
+    
+    def _add_progress(self, delta):
+        with self._lock:
+            self.task.downloaded += delta
+    
+    def _part_matches(self, state_path, record):
+        """남은 .part가 매니페스트와 같은 버전(크기, mtime)을 받던 것인지 (.part.json 확인)"""
+        try:
+            with open(state_path, 'r', encoding='utf-8') as sf:
+                state = json.load(sf)
+        except (OSError, ValueError):
+            return False
+        return state.get('size') == record['size'] and state.get('mtime') == record['mtime']
+    
+    def _fetch_file(self, record, local_path, stop):
+        """파일 하나를 .part로 받아 완료 시 교체 (파일별 재시도/이어받기, 실패는 self.failed에 기록)"""
+        part_path = local_path + '.part'
+        state_path = part_path + '.json'
+        size = record['size']
+        offset = 0
+        if self._part_matches(state_path, record):
+            try:
+                offset = os.path.getsize(part_path)
+            except OSError:
+                offset = 0
+        if offset > size:
+            offset = 0
+        counted = offset
+        self._add_progress(offset)
+        attempt = 0
+        remote_path = self.task.file_path.rstrip('/\\') + '/' + record['path']
+        try:
+            while offset < size or not os.path.exists(part_path):
+                if stop.is_set() or self.task.cancel_flag:
+                    return
+                headers = {wire_codec.ENCODING_HEADER: ', '.join(wire_codec.available())}
+                if offset > 0:
+                    headers['Range'] = f"bytes={offset}-"
+                    headers['If-Range'] = formatdate(int(record['mtime']), usegmt=True)
+                if not self.grant.acquire(stop):
+                    return
+                try:
+                    try:
+                        with self.session.get(f"{self.server_url}/download", params={'path': remote_path},
+                                              headers=headers, stream=True, timeout=60) as response:
+                            response.raise_for_status()
+                            if response.status_code != 206:
+                                offset = 0  # 처음부터 (이어받기 불가 또는 그 사이 파일이 바뀜)
+                            # 전송 압축 응답은 Content-Length 대신 원본 길이를 따로 알려줌
+                            length = (response.headers.get(wire_codec.LENGTH_HEADER)
+                                      or response.headers.get('Content-Length'))
+                            expected = offset + int(length) if length else None
+                            if not offset:
+                                # 새로 받기 시작: 어떤 버전을 받는지 기록 (다음에 이어받을 수 있는지 판단)
+                                with open(state_path, 'w', encoding='utf-8') as sf:
+                                    json.dump({'size': record['size'], 'mtime': record['mtime']}, sf)
+                            with open(part_path, 'r+b' if offset else 'wb') as f:
+                                f.seek(offset)
+                                f.truncate()
+                                self._add_progress(offset - counted)
+                                counted = offset
+                                for chunk in _iter_response(response):
+                                    if stop.is_set() or self.task.cancel_flag:
+                                        return
+                                    while self.task.pause_flag and not self.task.cancel_flag:
+                                        time.sleep(0.1)
+                                    if not chunk:
+                                        continue
+                                    f.write(chunk)
+                                    offset += len(chunk)
+                                    counted += len(chunk)
+                                    self._add_progress(len(chunk))
+                                    attempt = 0
+                    finally:
+                        self.grant.release()
+                    if expected is not None and offset < expected:
+                        raise requests.exceptions.ConnectionError("응답이 일찍 끝남")
+                    size = offset  # 매니페스트 이후 크기가 바뀐 파일은 받은 크기 기준
+                    break
+                except requests.exceptions.RequestException as e:
+                    attempt += 1
+                    status = getattr(getattr(e, 'response', None), 'status_code', None)
+                    if attempt > SEGMENT_MAX_RETRIES or (status is not None and 400 <= status < 500):
+                        raise
+                    _report_retry(self.link)
+                    print(f"[폴더 다운로드] {record['path']} 재시도 {attempt} ({e})")
+                    stop.wait(min(2 * attempt, 10))
+            os.replace(part_path, local_path)
+            os.utime(local_path, (record['mtime'], record['mtime']))
+            if os.path.exists(state_path):
+                os.remove(state_path)
+        except Exception as e:
+            print(f"[오류] 폴더 다운로드 파일 실패 {record['path']}: {e}")
+            with self._lock:
+                self.failed.append(record['path'])
+    
+    def _on_folder_cancel(self, pending):
+        """취소 시 받던 .part 삭제 (프로그램 종료면 다음에 이어받도록 보관)"""
+        if self.task.keep_partial:
+            print(f"[종료] 폴더 다운로드 부분 파일 보관: {self.task.save_path}")
+        else:
+            for _, local_path in pending:
+                for path in (local_path + '.part', local_path + '.part.json'):
+                    try:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    except OSError as e:
+                        print(f"[오류] 파일 삭제 실패: {e}")
+            print(f"[취소] 폴더 다운로드 중단: {self.task.save_path}")
+        self.finished.emit(False, "취소됨")
 
 
 class DownloadItemWidget(QWidget):
@@ -475,6 +1768,14 @@ class DownloadItemWidget(QWidget):
         self.name_label.setFont(QFont("맑은 고딕", 9, QFont.Bold))
         top_layout.addWidget(self.name_label, 1)
         
+        # 대기 중인 작업을 먼저 시작 (전송 스케줄러 큐에 있을 때만 표시)
+        self.pin_btn = QPushButton("📌")
+        self.pin_btn.setObjectName("pauseBtn")
+        self.pin_btn.setFixedSize(30, 30)
+        self.pin_btn.setToolTip("먼저 받기")
+        self.pin_btn.setVisible(False)
+        top_layout.addWidget(self.pin_btn)
+        
         self.pause_btn = QPushButton("⏸")
         self.pause_btn.setObjectName("pauseBtn")
         self.pause_btn.setFixedSize(30, 30)
@@ -569,6 +1870,18 @@ class FileShareClient(QMainWindow):
             self.settings['folder_download_mode'] = 'zip'
         if 'duplicate_mode' not in self.settings:
             self.settings['duplicate_mode'] = 'overwrite'
+        if 'download_connections' not in self.settings:
+            self.settings['download_connections'] = 4  # 큰 파일 분할 다운로드 연결 수
+        if 'upload_connections' not in self.settings:
+            self.settings['upload_connections'] = 4  # 큰 파일 청크 동시 업로드 연결 수
+        if 'upload_sync_mode' not in self.settings:
+            self.settings['upload_sync_mode'] = 'off'  # 폴더 업로드 시 서버와 같은 파일 건너뛰기
+        if 'upload_batch_min_files' not in self.settings:
+            self.settings['upload_batch_min_files'] = 20  # 작은 파일이 이 개수 이상이면 묶어서 전송
+        if 'upload_batch_file_size' not in self.settings:
+            self.settings['upload_batch_file_size'] = 4 * 1024 * 1024  # 이 크기 미만을 작은 파일로 봄
+        if 'transfer_connections' not in self.settings:
+            self.settings['transfer_connections'] = 6  # 모든 전송이 함께 쓰는 연결 수 (시작값, 자동 조정)
     
     def save_settings(self):
         """설정 저장"""
@@ -835,8 +2148,14 @@ class FileShareClient(QMainWindow):
         self.file_tree.setColumnWidth(1, 360)
         self.file_tree.setAlternatingRowColors(True)
         self.file_tree.setSelectionMode(QTreeWidget.ExtendedSelection)  # Shift/Ctrl 선택 가능
-        self.file_tree.setSortingEnabled(True)  # 컬럼 클릭 정렬 활성화
-        self.file_tree.sortByColumn(1, Qt.AscendingOrder)  # 기본: 이름순 정렬
+        # 정렬은 서버가 함 (페이지로 나눠 받으므로 받은 항목만 정렬하면 순서가 어긋남)
+        header = self.file_tree.header()
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(1, Qt.AscendingOrder)  # 기본: 이름순 정렬
+        header.sortIndicatorChanged.connect(self.on_sort_changed)
+        # 아래로 스크롤하면 다음 페이지 요청
+        self.file_tree.verticalScrollBar().valueChanged.connect(self.on_tree_scrolled)
         self.file_tree.itemDoubleClicked.connect(self.on_item_double_clicked)
         self.file_tree.itemClicked.connect(self.on_item_clicked)
         layout.addWidget(self.file_tree)
@@ -895,13 +2214,29 @@ class FileShareClient(QMainWindow):
         self.duplicate_mode_combo.currentIndexChanged.connect(self.on_duplicate_mode_changed)
         btn_layout.addWidget(self.duplicate_mode_combo)
         
+        # 폴더 업로드 방식 (변경분만 올리기)
+        btn_layout.addWidget(QLabel("폴더 업로드:"))
+        self.upload_sync_combo = QComboBox()
+        self.upload_sync_combo.addItems(["전체", "변경분만", "변경분만(내용 비교)"])
+        saved_sync_mode = self.settings.get('upload_sync_mode', 'off')
+        self.upload_sync_combo.setCurrentIndex({'off': 0, 'metadata': 1, 'hash': 2}.get(saved_sync_mode, 0))
+        self.upload_sync_combo.currentIndexChanged.connect(self.on_upload_sync_changed)
+        btn_layout.addWidget(self.upload_sync_combo)
+        
         layout.addWidget(btn_widget)
         
-        # 다운로드 진행 영역
+        # 다운로드 진행 영역 (오른쪽: 전송 제어기의 현재 동시 전송 수/구간 크기)
+        download_header_widget = QWidget()
+        download_header_layout = QHBoxLayout(download_header_widget)
+        download_header_layout.setContentsMargins(5, 5, 5, 2)
         download_area_label = QLabel("다운로드 진행")
         download_area_label.setFont(QFont("맑은 고딕", 10, QFont.Bold))
-        download_area_label.setContentsMargins(5, 5, 5, 2)
-        layout.addWidget(download_area_label)
+        download_header_layout.addWidget(download_area_label)
+        download_header_layout.addStretch()
+        self.transfer_status_label = QLabel("")
+        self.transfer_status_label.setStyleSheet("color: #999999; font-size: 8pt;")
+        download_header_layout.addWidget(self.transfer_status_label)
+        layout.addWidget(download_header_widget)
         
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -985,24 +2320,78 @@ class FileShareClient(QMainWindow):
             QMessageBox.critical(self, "오류", f"공유 폴더 로드 실패:\n{e}")
     
     def browse(self, path):
-        """폴더 탐색"""
+        """폴더 탐색 (첫 페이지만 받고 나머지는 스크롤할 때 받음)"""
         self.current_path = path
         self.path_label.setText(path)
+        self.listing_cursor = None
+        self.listing_loading = False
+        self.file_tree.clear()
+        self.fetch_listing_page()
+    
+    def listing_sort(self):
+        """헤더 정렬 표시 → 서버 정렬 파라미터"""
+        header = self.file_tree.header()
+        field = 'modified' if header.sortIndicatorSection() == 2 else 'name'
+        return f"-{field}" if header.sortIndicatorOrder() == Qt.DescendingOrder else field
+    
+    def fetch_listing_page(self):
+        """현재 폴더 목록의 다음 페이지 받기 (마지막 페이지면 False)"""
+        if getattr(self, 'listing_loading', False):
+            return False
+        first_page = self.listing_cursor is None
+        params = {'path': self.current_path, 'limit': LISTING_PAGE_SIZE}
+        if first_page:
+            params['sort'] = self.listing_sort()
+        else:
+            params['cursor'] = self.listing_cursor
         
+        self.listing_loading = True
         try:
-            response = self.session.get(f"{self.server_url}/api/files",
-                                       params={'path': path}, timeout=10)
+            response = self.session.get(f"{self.server_url}/api/files", params=params, timeout=10)
             if response.status_code == 200:
-                files = response.json().get('files', [])
-                self.populate_tree(files)
+                data = response.json()
+                # 이전 서버는 커서 없이 전체 목록을 돌려줌
+                self.listing_cursor = data.get('next_cursor') or ''
+                self.populate_tree(data.get('files', []), clear=first_page)
         except Exception as e:
             QMessageBox.critical(self, "오류", f"폴더 로드 실패:\n{e}")
+            self.listing_cursor = ''
+        finally:
+            self.listing_loading = False
+        
+        # 첫 페이지가 화면을 다 채우지 못하면 스크롤이 생기지 않으므로 이어서 요청
+        if self.listing_cursor:
+            QTimer.singleShot(0, lambda: self.on_tree_scrolled(self.file_tree.verticalScrollBar().value()))
+        return bool(self.listing_cursor)
     
-    def populate_tree(self, files):
-        """트리 채우기"""
-        self.file_tree.clear()
+    def load_all_pages(self):
+        """남은 페이지를 모두 받기 (전체 선택 등)"""
+        while getattr(self, 'listing_cursor', '') and self.fetch_listing_page():
+            pass
+    
+    def on_tree_scrolled(self, value):
+        """목록 끝 근처까지 스크롤하면 다음 페이지 요청"""
+        if not getattr(self, 'listing_cursor', ''):
+            return
+        scrollbar = self.file_tree.verticalScrollBar()
+        if value >= scrollbar.maximum() - scrollbar.pageStep():
+            self.fetch_listing_page()
+    
+    def on_sort_changed(self, column, order):
+        """헤더 클릭 → 서버 정렬로 다시 받기"""
+        if column == 0:
+            self.file_tree.header().setSortIndicator(1, order)
+            return
+        if getattr(self, 'current_path', None):
+            self.browse(self.current_path)
+    
+    def populate_tree(self, files, clear=True):
+        """트리 채우기 (서버가 정렬한 순서대로, clear=False면 뒤에 이어 붙임)"""
+        if clear:
+            self.file_tree.clear()
         
-        for file_info in sorted(files, key=lambda x: (not x['is_dir'], x['name'].lower())):
+        items = []
+        for file_info in files:
             item = QTreeWidgetItem()
             
             # 체크박스
@@ -1022,8 +2411,10 @@ class FileShareClient(QMainWindow):
             # 데이터 저장
             item.setData(0, Qt.UserRole, file_info['path'])
             item.setData(1, Qt.UserRole, "dir" if file_info['is_dir'] else "file")
+            item.setData(2, Qt.UserRole, None if file_info['is_dir'] else file_info.get('size'))
             
-            self.file_tree.addTopLevelItem(item)
+            items.append(item)
+        self.file_tree.addTopLevelItems(items)
     
     def on_item_clicked(self, item, column):
         """항목 클릭 - 체크박스 클릭 시 선택된 모든 항목 체크"""
@@ -1065,6 +2456,7 @@ class FileShareClient(QMainWindow):
     
     def select_all(self):
         """전체 선택"""
+        self.load_all_pages()
         for i in range(self.file_tree.topLevelItemCount()):
             item = self.file_tree.topLevelItem(i)
             item.setCheckState(0, Qt.Checked)
@@ -1154,6 +2546,7 @@ class FileShareClient(QMainWindow):
     
     def select_all(self):
         """전체 선택"""
+        self.load_all_pages()
         for i in range(self.file_tree.topLevelItemCount()):
             item = self.file_tree.topLevelItem(i)
             item.setCheckState(0, Qt.Checked)
@@ -1178,6 +2571,12 @@ class FileShareClient(QMainWindow):
         self.save_settings()
         self.add_log(f"중복 파일 처리: {self.duplicate_mode_combo.currentText()}")
     
+    def on_upload_sync_changed(self, index):
+        """폴더 업로드 방식 변경"""
+        self.settings['upload_sync_mode'] = ['off', 'metadata', 'hash'][index]
+        self.save_settings()
+        self.add_log(f"폴더 업로드 방식: {self.upload_sync_combo.currentText()}")
+    
     def open_download_folder(self):
         """다운로드 폴더 열기"""
         try:
@@ -1267,7 +2666,7 @@ class FileShareClient(QMainWindow):
         
         # 폴더 내 모든 파일 찾기
         file_list = []
-        total_bytes = 0
+        sizes = {}
         for root, dirs, files in os.walk(folder_path):
             for file in files:
                 file_full_path = os.path.join(root, file)
@@ -1277,22 +2676,75 @@ class FileShareClient(QMainWindow):
                 relative_with_folder = os.path.join(folder_name, relative_path)
                 file_list.append((file_full_path, relative_with_folder))
                 try:
-                    total_bytes += os.path.getsize(file_full_path)
-                except Exception:
-                    pass
+                    sizes[file_full_path] = os.path.getsize(file_full_path)
+                except OSError:
+                    sizes[file_full_path] = 0
         
         if not file_list:
             QMessageBox.information(self, "정보", "업로드할 파일이 없습니다.")
             return
         
+        # 변경분만 올리기: 서버 매니페스트와 비교한 뒤 큐에 추가
+        sync_mode = self.settings.get('upload_sync_mode', 'off')
+        if sync_mode != 'off':
+            remote_folder = target_folder.rstrip('/\\') + '/' + folder_name
+            self.add_log(f"서버 폴더와 비교 중: {len(file_list)}개 파일")
+            thread = FolderSyncThread(self.session, self.server_url, remote_folder,
+                                      file_list, sizes, sync_mode == 'hash', self)
+            if not hasattr(self, 'sync_threads'):
+                self.sync_threads = []
+            self.sync_threads.append(thread)
+            
+            def _planned(to_upload, skipped, skipped_bytes, message):
+                self.sync_threads.remove(thread)
+                if message:
+                    self.add_log(message)
+                self.queue_folder_upload(folder_path, target_folder, to_upload, sizes, skipped, skipped_bytes)
+            
+            thread.finished.connect(_planned)
+            thread.start()
+            return
+        
+        self.queue_folder_upload(folder_path, target_folder, file_list, sizes)
+    
+    def queue_folder_upload(self, folder_path, target_folder, file_list, sizes, skipped=0, skipped_bytes=0):
+        """폴더 업로드 큐 등록 (skipped: 서버와 같아서 건너뛴 파일 수/크기)"""
+        folder_name = os.path.basename(folder_path)
+        if skipped:
+            self.add_log(f"서버와 같은 파일 {skipped}개 건너뜀")
+        if not file_list:
+            self.add_log(f"✓ 변경된 파일 없음: {folder_name}")
+            return
+        
         self.add_log(f"총 {len(file_list)}개 파일 업로드 예정")
+        total_bytes = sum(sizes[path] for path, _ in file_list)
+        
+        # 작은 파일이 많으면 tar 묶음으로 전송 (파일마다 요청/위젯을 만들지 않도록)
+        small_limit = self.settings.get('upload_batch_file_size', 4 * 1024 * 1024)
+        small_files = [item for item in file_list if sizes[item[0]] < small_limit]
+        if len(small_files) < self.settings.get('upload_batch_min_files', 20):
+            small_files = []
+        single_files = [item for item in file_list if sizes[item[0]] >= small_limit] if small_files else file_list
+        
+        bundles = []
+        bundle_bytes = 0
+        for item in small_files:
+            if (not bundles or len(bundles[-1]) >= UPLOAD_BATCH_MAX_FILES
+                    or bundle_bytes + sizes[item[0]] > UPLOAD_BATCH_MAX_BYTES):
+                bundles.append([])
+                bundle_bytes = 0
+            bundles[-1].append(item)
+            bundle_bytes += sizes[item[0]]
+        if bundles:
+            self.add_log(f"작은 파일 {len(small_files)}개를 {len(bundles)}개 묶음으로 전송")
         
         # 배치 ID와 집계 위젯 생성
         batch_id = str(int(time.time() * 1000))
         self.upload_batches[batch_id] = {
-            'total': total_bytes,
-            'uploaded': 0,
-            'pending': len(file_list)
+            'total': total_bytes + skipped_bytes,
+            'uploaded': skipped_bytes,  # 건너뛴 파일은 이미 올라간 것으로 집계
+            'skipped': skipped_bytes,
+            'pending': len(single_files) + len(bundles)
         }
         # 배치 진행 표시용 위젯 추가
         batch_task = UploadTask(folder_path, target_folder, folder_name)
@@ -1303,50 +2755,94 @@ class FileShareClient(QMainWindow):
         self.download_layout.insertWidget(self.download_layout.count() - 1, batch_widget)
         self.upload_batch_widgets[batch_id] = batch_widget
         
-        # 업로드 큐 초기화
-        if not hasattr(self, 'upload_queue'):
-            self.upload_queue = []
-        if not hasattr(self, 'active_uploads'):
-            self.active_uploads = 0
-        
-        # 모든 파일을 큐에 추가
-        for file_path, relative_path in file_list:
+        # 모든 파일을 전송 스케줄러에 등록 (작은 것부터, 자리가 나는 대로 시작)
+        scheduler = self._scheduler()
+        for index, members in enumerate(bundles, 1):
+            task = UploadTask(folder_path, target_folder, f"{folder_name} (작은 파일 묶음 {index}/{len(bundles)})")
+            task.members = members
+            task.total_size = sum(sizes[path] for path, _ in members)
+            task.batch_id = batch_id
+            scheduler.submit(transfer_control.UPLOAD, task, task.total_size,
+                             max_connections=self._upload_connections(task))
+        for file_path, relative_path in single_files:
             task = UploadTask(file_path, target_folder, relative_path)
             task.batch_id = batch_id
-            self.upload_queue.append(task)
-        
-        # 큐 처리 시작
-        self.process_upload_queue()
+            scheduler.submit(transfer_control.UPLOAD, task, task.total_size,
+                             max_connections=self._upload_connections(task))
     
     def upload_single_file(self, file_path, target_folder):
         """단일 파일 업로드"""
         file_name = os.path.basename(file_path)
         self.add_log(f"📤 파일 업로드 시작: {file_name}")
         
-        # 큐 초기화
-        if not hasattr(self, 'upload_queue'):
-            self.upload_queue = []
-        if not hasattr(self, 'active_uploads'):
-            self.active_uploads = 0
-        
         task = UploadTask(file_path, target_folder, '')
-        self.upload_queue.append(task)
-        self.process_upload_queue()
+        self._scheduler().submit(transfer_control.UPLOAD, task, task.total_size,
+                                 max_connections=self._upload_connections(task))
     
-    def process_upload_queue(self):
-        """업로드 큐 처리 (최대 3개 동시 업로드)"""
-        MAX_CONCURRENT_UPLOADS = 3
-        
-        if not hasattr(self, 'upload_queue'):
-            self.upload_queue = []
-        if not hasattr(self, 'active_uploads'):
-            self.active_uploads = 0
-        
-        # 큐에서 작업을 꺼내서 시작
-        while self.upload_queue and self.active_uploads < MAX_CONCURRENT_UPLOADS:
-            task = self.upload_queue.pop(0)
-            self.active_uploads += 1
-            self.start_upload_task(task)
+    def _upload_connections(self, task):
+        """업로드 하나가 쓸 수 있는 최대 연결 수 (큰 파일만 청크를 동시에 올림)"""
+        if task.total_size >= SEGMENTED_MIN_SIZE and not task.members:
+            return max(1, self.settings.get('upload_connections', 4))
+        return 1
+    
+    def _scheduler(self):
+        """업로드/다운로드 공용 전송 스케줄러 (처음 쓸 때 생성)"""
+        if not hasattr(self, 'transfer_scheduler'):
+            controller = transfer_control.AimdController(
+                connections=self.settings.get('transfer_connections', 6),
+                max_connections=MAX_TRANSFER_CONNECTIONS)
+            self.transfer_scheduler = transfer_control.TransferScheduler(
+                self._start_transfer,
+                progress_of=lambda job: job.task.uploaded if job.kind == transfer_control.UPLOAD else job.task.downloaded,
+                controller=controller)
+            self.transfer_timer = QTimer(self)
+            self.transfer_timer.timeout.connect(self._tick_transfers)
+            self.transfer_timer.start(TRANSFER_TICK_MS)
+        return self.transfer_scheduler
+    
+    def _start_transfer(self, job):
+        """스케줄러가 차례가 된 작업을 시작"""
+        task = job.task
+        # 실제로 쓰는 연결 수는 job.grant (스케줄러가 전체 예산을 진행 중인 작업에 나눠 줌)
+        task.connections = job.max_connections
+        task.grant = job.grant
+        task.link = self.transfer_scheduler.controller
+        if job.kind == transfer_control.DOWNLOAD:
+            self._start_download(task)
+            return
+        self.start_upload_task(task)
+    
+    def _tick_transfers(self):
+        """주기적으로 처리량을 재서 연결 수 예산/구간 크기 조정, 전송 중이면 RTT 측정"""
+        scheduler = self.transfer_scheduler
+        old_limit = scheduler.limit
+        scheduler.tick()
+        stats = scheduler.stats()
+        if scheduler.limit != old_limit:
+            print(f"[전송] 연결 수 {old_limit} → {scheduler.limit} "
+                  f"(처리량 {stats['goodput'] / 1024 / 1024:.1f} MB/s, 구간 {stats['segment_size'] >> 20} MB)")
+        active = any(stats['running'].values())
+        if active:
+            rtt = f", RTT {stats['rtt'] * 1000:.0f} ms" if stats['rtt'] is not None else ""
+            self.transfer_status_label.setText(
+                f"연결 {stats['active_connections']}/{stats['connections']}개 · 구간 {stats['segment_size'] >> 20} MB"
+                f" · {stats['goodput'] / 1024 / 1024:.1f} MB/s{rtt}")
+        else:
+            self.transfer_status_label.setText("")
+        if active and self.server_url and not getattr(self, 'rtt_probe_running', False):
+            self.rtt_probe_running = True
+            threading.Thread(target=self._probe_rtt, daemon=True).start()
+    
+    def _probe_rtt(self):
+        """전송 중인 회선의 왕복 시간 측정 (큐가 쌓이면 늘어남)"""
+        try:
+            started = time.time()
+            self.session.get(f"{self.server_url}/api/ping", timeout=5)
+            self.transfer_scheduler.controller.observe_rtt(time.time() - started)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            self.rtt_probe_running = False
     
     def start_upload_task(self, task):
         """업로드 작업 시작"""
@@ -1367,7 +2863,8 @@ class FileShareClient(QMainWindow):
         self.upload_widgets[id(task)] = widget
         
         # 업로드 시작
-        thread = UploadThread(task, self.server_url, self.session)
+        thread = UploadThread(task, self.server_url, self.session, connections=task.connections,
+                              link=getattr(task, 'link', None), grant=getattr(task, 'grant', None))
         thread.progress.connect(lambda p, s, u, t, w=widget, task_ref=task: self.update_upload_progress(w, p, s, u, t, task_ref))
         thread.finished.connect(lambda success, msg, w=widget, t=task: self.upload_finished(w, t, success, msg))
         
@@ -1409,12 +2906,8 @@ class FileShareClient(QMainWindow):
     
     def upload_finished(self, widget, task, success, message):
         """업로드 완료 처리"""
-        # 활성 업로드 수 감소
-        if hasattr(self, 'active_uploads'):
-            self.active_uploads = max(0, self.active_uploads - 1)
-        
-        # 다음 큐 항목 처리
-        self.process_upload_queue()
+        # 다음 대기 작업 시작 (연결 예산을 다시 나눔)
+        self._scheduler().done(task)
         
         if success:
             widget.status_label.setText("✓ 업로드 완료")
@@ -1469,7 +2962,10 @@ class FileShareClient(QMainWindow):
             return f"{size:.1f} TB"
 
         widget.progress_bar.setValue(percent)
-        widget.status_label.setText(f"{percent}% - 전체 {format_size(batch['uploaded'])} / {format_size(batch['total'])}")
+        status = f"{percent}% - 전체 {format_size(batch['uploaded'])} / {format_size(batch['total'])}"
+        if batch.get('skipped'):
+            status += f" (변경 없음 {format_size(batch['skipped'])} 건너뜀)"
+        widget.status_label.setText(status)
 
     def finish_batch(self, batch_id):
         """배치(폴더 전체) 완료 처리 및 위젯 제거"""
@@ -1589,8 +3085,8 @@ class FileShareClient(QMainWindow):
                     download_as_zip = True
                     auto_extract = False
                 else:
-                    # 폴더 그대로 (다운로드 후 압축 해제)
-                    save_name = file_name + ".zip"  # 임시로 ZIP 다운로드
+                    # 폴더 그대로 (ZIP 없이 파일별로 받음, FolderDownloadThread)
+                    save_name = file_name
                     download_as_zip = True
                     auto_extract = True
             else:
@@ -1615,6 +3111,7 @@ class FileShareClient(QMainWindow):
             task = DownloadTask(file_path, save_name, save_path, 0)
             task.auto_extract = auto_extract  # 압축 해제 플래그
             task.is_folder = is_folder       # 폴더 다운로드 여부 플래그
+            task.download_as_zip = download_as_zip
             self.download_tasks.append(task)
             
             if auto_extract:
@@ -1626,23 +3123,49 @@ class FileShareClient(QMainWindow):
             widget = DownloadItemWidget(task)
             widget.cancel_btn.clicked.connect(lambda checked, t=task: self.cancel_download(t))
             widget.pause_btn.clicked.connect(lambda checked, t=task: self.pause_download(t))
+            widget.pin_btn.clicked.connect(lambda checked, t=task: self.pin_download(t))
+            widget.pin_btn.setVisible(True)
             
             self.download_layout.insertWidget(self.download_layout.count() - 1, widget)
             self.download_widgets[id(task)] = widget
             
-            # 다운로드 시작 (ZIP 다운로드 여부 전달)
-            thread = DownloadThread(task, self.server_url, self.session, download_as_zip)
-            thread.progress.connect(lambda p, s, d, t, w=widget: self.update_progress(w, p, s, d, t))
-            thread.finished.connect(lambda success, msg, w=widget, t=task: self.download_finished(w, t, success, msg))
-            
-            # 스레드를 멤버로 저장 (GC 방지)
-            if not hasattr(self, 'download_threads'):
-                self.download_threads = []
-            self.download_threads.append(thread)
-            thread.finished.connect(lambda: self.download_threads.remove(thread) if thread in self.download_threads else None)
-            
+            # 전송 스케줄러에 등록 (자리가 나면 _start_download로 시작)
             self.has_active_downloads = True
-            thread.start()
+            # 폴더/큰 파일만 여러 연결 (크기를 모르는 폴더도 포함)
+            size = item.data(2, Qt.UserRole)
+            connections = 1
+            if is_folder or (size or 0) >= SEGMENTED_MIN_SIZE:
+                connections = max(1, self.settings.get('download_connections', 4))
+            self._scheduler().submit(transfer_control.DOWNLOAD, task, size, max_connections=connections)
+    
+    def _start_download(self, task):
+        """다운로드 스레드 시작 (ZIP 다운로드 여부 전달)"""
+        widget = self.download_widgets.get(id(task))
+        if widget is None or task.status == 'cancelled':
+            self._scheduler().done(task)
+            return
+        widget.pin_btn.setVisible(False)
+        if task.is_folder and task.auto_extract:
+            thread = FolderDownloadThread(task, self.server_url, self.session, connections=task.connections,
+                                          link=task.link, grant=task.grant)
+        else:
+            thread = DownloadThread(task, self.server_url, self.session, task.download_as_zip,
+                                    connections=task.connections, link=task.link, grant=task.grant)
+        thread.progress.connect(lambda p, s, d, t, w=widget: self.update_progress(w, p, s, d, t))
+        thread.finished.connect(lambda success, msg, w=widget, t=task: self.download_finished(w, t, success, msg))
+        
+        # 스레드를 멤버로 저장 (GC 방지)
+        if not hasattr(self, 'download_threads'):
+            self.download_threads = []
+        self.download_threads.append(thread)
+        thread.finished.connect(lambda: self.download_threads.remove(thread) if thread in self.download_threads else None)
+        
+        thread.start()
+    
+    def pin_download(self, task):
+        """대기 중인 다운로드를 먼저 시작"""
+        if self._scheduler().pin(task):
+            self.add_log(f"📌 먼저 받기: {task.file_name}")
     
     def update_progress(self, widget, percent, speed_text, downloaded, total):
         """진행률 업데이트"""
@@ -1657,12 +3180,19 @@ class FileShareClient(QMainWindow):
             return f"{size:.1f} TB"
         
         downloaded_str = format_size(downloaded)
+        if total <= 0:
+            # 전체 크기를 모름 (스트리밍 전송) - 진행바를 바쁨 표시로 전환
+            widget.progress_bar.setMaximum(0)
+            widget.status_label.setText(f"{speed_text} - {downloaded_str} 받음")
+            return
+        widget.progress_bar.setMaximum(100)
         total_str = format_size(total)
         
         widget.status_label.setText(f"{percent}% - {speed_text} - {downloaded_str} / {total_str}")
     
     def download_finished(self, widget, task, success, message):
         """다운로드 완료"""
+        self._scheduler().done(task)
         # 이미 취소 처리 중이면 무시
         if task.status == 'cancelled' and message == "취소됨":
             return
@@ -1690,6 +3220,10 @@ class FileShareClient(QMainWindow):
             if getattr(task, 'auto_extract', False) and getattr(task, 'is_folder', False) and task.save_path.endswith('.zip'):
                 final_path = task.save_path[:-4]
                 final_bytes = get_dir_size(final_path) if os.path.exists(final_path) else 0
+            elif os.path.isdir(task.save_path):
+                # 폴더 그대로 받기 (ZIP 없이)
+                final_path = task.save_path
+                final_bytes = get_dir_size(final_path)
             else:
                 final_path = task.save_path
                 try:
@@ -1697,6 +3231,7 @@ class FileShareClient(QMainWindow):
                 except Exception:
                     final_bytes = 0
 
+            widget.progress_bar.setMaximum(100)
             widget.progress_bar.setValue(100)
             widget.progress_bar.setVisible(False)  # 완료 후 진행바 숨김
             widget.status_label.setText(f"✓ 완료 - 최종 용량: {format_size(final_bytes)}")
@@ -1793,6 +3328,7 @@ class FileShareClient(QMainWindow):
         if reply == QMessageBox.Yes:
             task.cancel_flag = True
             task.status = 'cancelled'
+            self._scheduler().cancel(task)  # 아직 시작 전이면 큐에서 뺌
             
             # 취소 시에도 페이드 아웃 (더 천천히)
             task_id = id(task)
@@ -1814,8 +3350,10 @@ class FileShareClient(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            # 진행 중인 다운로드 취소
+            # 진행 중인 다운로드 중단 (부분 파일은 다음 실행 때 이어받기용으로 보관)
             for task in self.download_tasks:
+                task.keep_partial = True
+                task.pause_flag = False
                 task.cancel_flag = True
             event.accept()
         else:
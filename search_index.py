@@ -0,0 +1,312 @@
+"""
+공유 폴더 검색 색인
+백그라운드에서 공유 폴더 전체를 훑어 이름/경로를 SQLite에 저장하고,
+파일 변경 알림(notify)을 받아 바뀐 부분만 갱신합니다.
+
+검색 방식
+    prefix    : 이름이 q로 시작 (이름 인덱스 범위 조회)
+    substring : 이름에 q 포함 (FTS5 trigram, 3글자 미만은 LIKE)
+    glob      : 이름이 *, ?, [...] 패턴과 일치 (리터럴 부분으로 먼저 좁힌 뒤 GLOB)
+대소문자는 구분하지 않습니다.
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'woori_search_index.db')
+BATCH_SIZE = 5000  # 트랜잭션 하나에 기록하는 항목 수
+EVENT_DEBOUNCE = 1.0  # 변경 알림을 모아서 처리하는 간격 (초)
+RESCAN_INTERVAL = 600  # 변경 알림이 없을 때 전체 재색인 주기 (초)
+RESCAN_INTERVAL_WATCHED = 6 * 3600  # 변경 알림을 받는 중일 때 (놓친 이벤트 보정용)
+SEARCH_LIMIT_MAX = 1000
+PATH_END = '\U0010ffff'  # 문자열 범위 조회의 상한
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    modified REAL NOT NULL,
+    root TEXT NOT NULL,
+    seen INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_name ON files(name_lower);
+CREATE INDEX IF NOT EXISTS files_root_seen ON files(root, seen);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names_fts USING fts5(name, content='files', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO names_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO names_fts(names_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE OF name ON files BEGIN
+    INSERT INTO names_fts(names_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO names_fts(rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+UPSERT = """
+INSERT INTO files(path, name, name_lower, is_dir, size, modified, root, seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    is_dir = excluded.is_dir, size = excluded.size, modified = excluded.modified,
+    root = excluded.root, seen = excluded.seen
+"""
+
+COLUMNS = "f.name, f.path, f.size, f.is_dir, f.modified"
+
+
+def _glob_literals(pattern):
+    """glob 패턴에서 와일드카드가 아닌 가장 긴 글자 묶음과 앞부분 리터럴"""
+    runs, current, prefix, in_class = [], '', None, False
+    for ch in pattern:
+        if in_class:
+            in_class = ch != ']'
+            continue
+        if ch in '*?[':
+            if prefix is None:
+                prefix = current
+            runs.append(current)
+            current = ''
+            in_class = ch == '['
+        else:
+            current += ch
+    runs.append(current)
+    if prefix is None:
+        prefix = current
+    return prefix, max(runs, key=len)
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SearchIndex:
+    """공유 폴더 이름/경로 색인 (쓰기는 색인 스레드 하나, 읽기는 요청 스레드별 연결)"""
+    def __init__(self, db_path=DEFAULT_DB_PATH, skip_suffix=None):
+        self.db_path = db_path
+        self.skip_suffix = skip_suffix  # 이 접미사로 끝나는 이름은 색인하지 않음 (업로드 중인 부분 파일)
+        self.roots = []
+        self.indexing = False
+        self.watched = False  # 파일 변경 알림을 받는 중인지 (재색인 주기 결정)
+        self.fts = False
+        self._local = threading.local()
+        self._events = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # trigram 토크나이저가 없는 SQLite (3.34 미만): 부분 검색은 LIKE로
+            print(f"[검색 색인] FTS5 trigram 사용 불가, LIKE로 검색합니다: {e}")
+        conn.commit()
+
+    def set_roots(self, roots):
+        """색인할 공유 폴더 지정 (바뀌었으면 색인 스레드가 추가/제거 반영)"""
+        roots = sorted({os.path.abspath(root) for root in roots if os.path.isdir(root)})
+        with self._lock:
+            if roots != self.roots:
+                self.roots = roots
+                self._events.put(('roots', roots))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='search-indexer', daemon=True)
+                self._thread.start()
+
+    def notify(self, path):
+        """파일/폴더 변경 알림 (생성/수정/삭제/이동 경로)"""
+        self._events.put(('path', os.path.abspath(path)))
+
+    def search(self, query, mode='substring', scope=None, limit=200):
+        """이름 검색 → [{'name', 'path', 'size', 'is_dir', 'modified'}, ...]"""
+        q = query.lower()
+        limit = max(1, min(int(limit), SEARCH_LIMIT_MAX))
+        where, params, source = [], [], "files f"
+
+        if mode == 'prefix':
+            where.append("f.name_lower >= ? AND f.name_lower < ?")
+            params += [q, q + PATH_END]
+        elif mode == 'glob':
+            prefix, literal = _glob_literals(q)
+            if prefix:
+                where.append("f.name_lower >= ? AND f.name_lower < ?")
+                params += [prefix, prefix + PATH_END]
+            elif self.fts and len(literal) >= 3:
+                source = "names_fts JOIN files f ON f.id = names_fts.rowid"
+                where.append("names_fts MATCH ?")
+                params.append(_fts_phrase(literal))
+            where.append("f.name_lower GLOB ?")
+            params.append(q)
+        else:
+            if self.fts and len(q) >= 3:
+                source = "names_fts JOIN files f ON f.id = names_fts.rowid"
+                where.append("names_fts MATCH ?")
+                params.append(_fts_phrase(q))
+            else:
+                escaped = q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                where.append("f.name_lower LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+
+        if scope:
+            scope = os.path.join(os.path.abspath(scope), '')
+            where.append("f.path >= ? AND f.path < ?")
+            params += [scope, scope + PATH_END]
+
+        sql = f"SELECT {COLUMNS} FROM {source} WHERE {' AND '.join(where)} LIMIT ?"
+        rows = self._connect().execute(sql, params + [limit]).fetchall()
+        return [{'name': name, 'path': path, 'size': size, 'is_dir': bool(is_dir), 'modified': modified}
+                for name, path, size, is_dir, modified in rows]
+
+    def stats(self):
+        count = self._connect().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return {'entries': count, 'roots': list(self.roots), 'indexing': self.indexing,
+                'watched': self.watched, 'fts': self.fts}
+
+    # ---- 색인 스레드 ----
+
+    def _run(self):
+        conn = self._connect()
+        next_rescan = 0
+        while True:
+            interval = RESCAN_INTERVAL_WATCHED if self.watched else RESCAN_INTERVAL
+            try:
+                kind, value = self._events.get(timeout=max(0.1, next_rescan - time.time()))
+            except queue.Empty:
+                kind, value = 'rescan', None
+
+            try:
+                if kind == 'roots':
+                    self._apply_roots(conn, value)
+                    next_rescan = time.time() + interval
+                elif kind == 'rescan':
+                    for root in list(self.roots):
+                        self._scan(conn, root, root)
+                    next_rescan = time.time() + interval
+                else:
+                    # 짧은 시간에 몰린 알림을 모아서 한 번에 처리
+                    paths = {value}
+                    deadline = time.time() + EVENT_DEBOUNCE
+                    while time.time() < deadline:
+                        try:
+                            kind, value = self._events.get(timeout=max(0.01, deadline - time.time()))
+                        except queue.Empty:
+                            break
+                        if kind != 'path':
+                            self._events.put((kind, value))
+                            break
+                        paths.add(value)
+                    self._apply_changes(conn, paths)
+            except sqlite3.Error as e:
+                print(f"[검색 색인] 오류: {e}")
+
+    def _apply_roots(self, conn, roots):
+        """제거된 공유 폴더의 항목 삭제 후 전체 색인"""
+        indexed = [row[0] for row in conn.execute("SELECT DISTINCT root FROM files")]
+        for root in indexed:
+            if root not in roots:
+                conn.execute("DELETE FROM files WHERE root = ?", (root,))
+                conn.commit()
+                print(f"[검색 색인] 공유 해제된 폴더 제거: {root}")
+        for root in roots:
+            self._scan(conn, root, root)
+
+    def _scan(self, conn, root, top):
+        """top 아래를 훑어 색인 갱신 후, 이번에 보지 못한 항목 삭제"""
+        self.indexing = True
+        started = time.time()
+        seen = time.time_ns()
+        batch, count = [], 0
+        stack = [top]
+        try:
+            while stack:
+                folder = stack.pop()
+                try:
+                    it = os.scandir(folder)
+                except OSError:
+                    continue
+                with it:
+                    for entry in it:
+                        if self.skip_suffix and entry.name.endswith(self.skip_suffix):
+                            continue
+                        try:
+                            st = entry.stat()
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            continue
+                        if is_dir and not entry.is_symlink():
+                            stack.append(entry.path)
+                        batch.append((entry.path, entry.name, entry.name.lower(), int(is_dir),
+                                      0 if is_dir else st.st_size, st.st_mtime, root, seen))
+                        if len(batch) >= BATCH_SIZE:
+                            count += self._write(conn, batch)
+                            batch = []
+            count += self._write(conn, batch)
+
+            if top == root:
+                conn.execute("DELETE FROM files WHERE root = ? AND seen < ?", (root, seen))
+            else:
+                prefix = os.path.join(top, '')
+                conn.execute("DELETE FROM files WHERE path >= ? AND path < ? AND seen < ?",
+                             (prefix, prefix + PATH_END, seen))
+            conn.commit()
+            if top == root:
+                print(f"[검색 색인] {root}: {count:,}개 항목, {time.time() - started:.1f}초")
+        finally:
+            self.indexing = False
+
+    def _write(self, conn, batch):
+        if batch:
+            conn.executemany(UPSERT, batch)
+            conn.commit()
+        return len(batch)
+
+    def _apply_changes(self, conn, paths):
+        """변경 알림 경로 반영 (있으면 갱신, 폴더면 하위 재색인, 없으면 하위까지 삭제)"""
+        for path in paths:
+            root = next((r for r in self.roots
+                         if path == r or path.startswith(os.path.join(r, ''))), None)
+            if root is None or path == root:
+                continue
+            if self.skip_suffix and path.endswith(self.skip_suffix):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                prefix = os.path.join(path, '')
+                conn.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                             (path, prefix, prefix + PATH_END))
+                continue
+            is_dir = os.path.isdir(path)
+            name = os.path.basename(path)
+            # 처음 보는 폴더(새로 만들었거나 옮겨 온 폴더)만 하위까지 색인.
+            # 이미 있는 폴더의 수정 알림은 하위 항목 알림이 따로 오므로 자기 자신만 갱신
+            is_new = conn.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone() is None
+            conn.execute(UPSERT, (path, name, name.lower(), int(is_dir), 0 if is_dir else st.st_size,
+                                  st.st_mtime, root, time.time_ns()))
+            if is_dir and is_new:
+                conn.commit()
+                self._scan(conn, root, path)
+        conn.commit()
@@ -5,18 +5,45 @@
 import os
 import json
 from pathlib import Path
-from flask import Flask, render_template, send_file, request, jsonify, abort, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, abort, session, redirect, url_for, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.http import http_date, parse_date, parse_range_header, unquote_etag, is_resource_modified
 import mimetypes
 import secrets
 import random
 import string
 import requests
 import sys
+import base64
+import zlib
+import hashlib
+import shutil
+import sqlite3
+import tarfile
+import itertools
+import tempfile
+import threading
+import time
 from urllib.parse import quote
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import archive_cache
+import chunk_store
+import delta_sync
+import file_listing
+import search_index
+import wire_codec
+import zip_stream
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog가 없으면 폴더 mtime + TTL로만 목록 캐시 검증
+    Observer = None
+    FileSystemEventHandler = object
 
 def _resource_path(rel_path: str) -> str:
     """PyInstaller 환경에서 리소스 경로를 반환"""
@@ -60,32 +87,315 @@ BLOCK_DURATION = 900  # 15분 (초)
 # 접속 로그
 access_log = []
 
-def get_file_info(file_path):
-    """파일/폴더 정보를 가져옵니다"""
-    stat = os.stat(file_path)
-    return {
-        'name': os.path.basename(file_path),
-        'path': file_path,
-        'size': stat.st_size if os.path.isfile(file_path) else 0,
-        'is_dir': os.path.isdir(file_path),
-        'modified': stat.st_mtime
-    }
+# 서버 실행 방식: 'waitress'(스레드 풀) 또는 'asgi'(asyncio + uvicorn, 동시 연결이 많을 때)
+SERVER_ENGINE = os.environ.get('WOORI_SERVER_ENGINE', 'waitress')
+
+# 파일 다운로드 블록 크기 (wsgi.file_wrapper가 한 번에 읽어 소켓으로 넘기는 단위)
+DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+
+# 전송 압축 (wire_codec): 클라이언트가 요청하고 내용이 줄어들 때만
+DOWNLOAD_COMPRESS_MIN = 64 * 1024  # 이보다 작은 다운로드 구간은 그대로 보냄
+JSON_COMPRESS_MIN = 1024  # 이보다 작은 JSON 응답은 그대로 보냄
+
+# 폴더 ZIP 압축 모드(comp=deflate)의 병렬 압축
+# 모든 다운로드가 프로세스 공용 풀을 나눠 쓰므로 압축이 요청 처리 스레드를 모두 잡아먹지 않음
+# WOORI_ZIP_WORKERS: 공용 풀 크기 (1이면 요청 스레드에서 순차 압축)
+ZIP_DEFLATE_WORKERS = int(os.environ.get('WOORI_ZIP_WORKERS', 0)) or min(4, os.cpu_count() or 1)
+ZIP_DEFLATE_PER_REQUEST = ZIP_DEFLATE_WORKERS  # 요청 하나가 동시에 맡기는 블록 수 상한
+zip_deflate_pool = None
+zip_deflate_pool_lock = threading.Lock()
+
+# 폴더 ZIP 디스크 캐시 (폴더 경로 + 매니페스트 지문 + 압축 방식별, LRU)
+# WOORI_ARCHIVE_CACHE_MB: 디스크 예산 (0이면 끔)
+ARCHIVE_CACHE_MAX_BYTES = int(os.environ.get('WOORI_ARCHIVE_CACHE_MB', 4096)) * 1024 * 1024
+ARCHIVE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'woori_archive_cache')
+# 비압축(STORED) ZIP은 원본 바이트 그대로라 캐시해도 아끼는 게 없으므로 기본은 압축 모드만 캐시
+# WOORI_ARCHIVE_CACHE_STORED=1: 비압축 ZIP도 캐시
+ARCHIVE_CACHE_STORED = os.environ.get('WOORI_ARCHIVE_CACHE_STORED', '') == '1'
+archive_cache_store = None
+archive_cache_lock = threading.Lock()
+
+# 분할 업로드 (청크 단위로 올리고 끊기면 서버가 알려준 위치부터 이어올리기)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 클라이언트에 권장하는 청크 크기
+UPLOAD_CHUNK_MAX = 64 * 1024 * 1024  # 요청 하나에 허용하는 최대 청크
+UPLOAD_CHUNK_MIN = 1024 * 1024  # 클라이언트가 제안할 수 있는 최소 청크 (1MB 단위)
+UPLOAD_PART_SUFFIX = '.woori-upload'  # 업로드 중인 부분 파일 (목록에서 숨김)
+UPLOAD_SESSION_TTL = 7 * 24 * 3600  # 방치된 업로드 세션 보관 기간 (초)
+UPLOAD_SESSION_DIR = os.path.join(tempfile.gettempdir(), 'woori_upload_sessions')
+DELTA_SIGNATURE_MAX = 64 * 1024 * 1024  # 델타 다운로드 요청에 받는 서명 최대 크기
+upload_sessions = {}
+upload_session_locks = {}
+upload_sessions_lock = threading.Lock()
+
+# 폴더 목록 캐시 (폴더 경로 → 정렬된 목록, LRU)
+# 폴더 mtime이 바뀌거나 watchdog 이벤트가 오면 무효화
+LISTING_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 캐시 전체 메모리 예산 (추정치)
+LISTING_CACHE_TTL = 30  # 감시가 없을 때 하위 파일 크기/수정시각 변경을 반영하는 주기 (초)
+LISTING_RACY_WINDOW = 2  # 폴더 mtime이 이보다 최근이면 캐시하지 않음 (mtime 해상도가 거친 SMB/FAT 대비)
+listing_cache = OrderedDict()
+listing_cache_lock = threading.Lock()
+listing_cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0, 'bytes': 0}
+listing_watchers = {}  # 공유 폴더 → watchdog Observer (시작 실패 시 None)
+listing_generation = 0  # 무효화될 때마다 증가 (조회 중 무효화된 결과는 저장하지 않음)
+
+# 검색 색인 (공유 폴더 목록/검색 요청 시 시작, 폴더 감시 이벤트로 갱신)
+search_idx = None
+search_idx_lock = threading.Lock()
+
+# 업로드 중복 제거 (/api/dedup/*): 청크 해시를 먼저 받고 없는 청크만 요청
+# WOORI_DEDUP=0 이면 끔 (클라이언트는 일반 분할 업로드로 전송)
+DEDUP_ENABLED = os.environ.get('WOORI_DEDUP', '1') != '0'
+DEDUP_SESSION_TTL = 24 * 3600  # 커밋하지 않은 중복 제거 세션 보관 기간 (초)
+# 세션 정보(<id>.json)와 받은 청크 번호 기록(<id>.received, 한 줄에 하나씩 덧붙임)
+DEDUP_SESSION_DIR = os.path.join(tempfile.gettempdir(), 'woori_dedup_sessions')
+chunk_idx = None
+chunk_idx_lock = threading.Lock()
+dedup_sessions = {}
+dedup_sessions_lock = threading.Lock()
+
+# 폴더 매니페스트 (/api/manifest)
+MANIFEST_FLUSH_BYTES = 64 * 1024  # gzip 스트림을 이만큼 모일 때마다 내보냄
+FILE_HASH_CACHE_MAX = 200000  # (경로, 크기, mtime) → sha256 캐시 항목 수
+file_hash_cache = OrderedDict()
+file_hash_lock = threading.Lock()
+
+# /api/files 페이지 조회 (limit/cursor/sort)
+LISTING_PAGE_MAX = 5000  # 한 페이지 최대 항목 수
+LISTING_SORT_FIELDS = {
+    'name': lambda item: item['name'].lower(),
+    'modified': lambda item: item['modified'],
+    'size': lambda item: item['size']
+}
+LISTING_VIEW_MAX = 64  # 정렬별로 만들어 둔 목록(정렬 키 포함) 보관 개수
+listing_views = OrderedDict()
+
+def _listing_key(folder_path):
+    return os.path.normcase(os.path.abspath(folder_path))
+
+def _listing_size(items):
+    """캐시 항목 메모리 사용량 추정 (dict + 문자열)"""
+    return 256 + sum(400 + 2 * (len(item['name']) + len(item['path'])) for item in items)
 
 def list_files(folder_path):
-    """폴더 내 파일 목록을 가져옵니다"""
-    items = []
+    """폴더 내 파일 목록을 가져옵니다 (캐시된 목록은 호출자끼리 공유하므로 수정하지 말 것)"""
+    global listing_generation
+    key = _listing_key(folder_path)
     try:
-        for item in os.listdir(folder_path):
-            item_path = os.path.join(folder_path, item)
-            try:
-                items.append(get_file_info(item_path))
-            except Exception as e:
-                print(f"Error accessing {item_path}: {e}")
-                continue
-    except Exception as e:
+        dir_mtime = os.stat(folder_path).st_mtime_ns
+    except OSError as e:
         print(f"Error listing directory {folder_path}: {e}")
+        return []
+    watched = _ensure_listing_watch(key)
+    now = time.time()
+    
+    with listing_cache_lock:
+        cached = listing_cache.get(key)
+        if (cached and cached['mtime'] == dir_mtime
+                and (cached['watched'] or now - cached['time'] < LISTING_CACHE_TTL)):
+            listing_cache.move_to_end(key)
+            listing_cache_stats['hits'] += 1
+            return cached['items']
+        listing_cache_stats['misses'] += 1
+        generation = listing_generation
+    
+    items = file_listing.scan_folder(folder_path, skip_suffix=UPLOAD_PART_SUFFIX)
+    if now - dir_mtime / 1e9 < LISTING_RACY_WINDOW:
+        return items  # 방금 바뀐 폴더는 같은 mtime으로 또 바뀔 수 있음
     
-    return sorted(items, key=lambda x: (not x['is_dir'], x['name'].lower()))
+    size = _listing_size(items)
+    with listing_cache_lock:
+        if generation != listing_generation or size > LISTING_CACHE_MAX_BYTES:
+            return items
+        old = listing_cache.pop(key, None)
+        if old:
+            listing_cache_stats['bytes'] -= old['size']
+        listing_cache[key] = {'items': items, 'mtime': dir_mtime, 'time': now,
+                              'watched': watched, 'size': size}
+        listing_cache_stats['bytes'] += size
+        while listing_cache_stats['bytes'] > LISTING_CACHE_MAX_BYTES:
+            _, evicted = listing_cache.popitem(last=False)
+            listing_cache_stats['bytes'] -= evicted['size']
+            listing_cache_stats['evictions'] += 1
+    return items
+
+def _listing_view(folder_path, sort, desc):
+    """정렬된 목록과 항목별 정렬 키 (폴더 먼저 → 정렬 필드 → 이름, 키가 항목마다 유일)"""
+    items = list_files(folder_path)
+    view_key = (_listing_key(folder_path), sort, desc)
+    with listing_cache_lock:
+        view = listing_views.get(view_key)
+        if view and view['source'] is items:
+            listing_views.move_to_end(view_key)
+            return view
+    
+    field = LISTING_SORT_FIELDS[sort]
+    keyed = [((not item['is_dir'], field(item), item['name'].lower(), item['name']), item) for item in items]
+    # 안정 정렬을 겹쳐서 필드만 내림차순으로 (폴더 먼저, 이름은 항상 오름차순)
+    keyed.sort(key=lambda pair: pair[0][2:])
+    keyed.sort(key=lambda pair: pair[0][1], reverse=desc)
+    keyed.sort(key=lambda pair: pair[0][0])
+    view = {'source': items, 'keys': [pair[0] for pair in keyed], 'items': [pair[1] for pair in keyed]}
+    with listing_cache_lock:
+        listing_views[view_key] = view
+        while len(listing_views) > LISTING_VIEW_MAX:
+            listing_views.popitem(last=False)
+    return view
+
+def _listing_key_before(a, b, desc):
+    """정렬 순서에서 a가 b보다 앞이면 True"""
+    if a[0] != b[0]:
+        return a[0] < b[0]
+    if a[1] != b[1]:
+        return a[1] > b[1] if desc else a[1] < b[1]
+    return a[2:] < b[2:]
+
+def _listing_page_start(keys, cursor_key, desc):
+    """cursor_key 바로 다음 항목의 위치 (이진 탐색, 그 사이 항목이 추가/삭제돼도 이어짐)"""
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _listing_key_before(cursor_key, keys[mid], desc):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def _encode_listing_cursor(sort, desc, key):
+    raw = json.dumps([sort, desc, list(key)], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_listing_cursor(cursor):
+    """커서 → (sort, desc, 마지막 항목의 정렬 키), 잘못된 커서면 None"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, desc, key = json.loads(raw.decode('utf-8'))
+        if sort not in LISTING_SORT_FIELDS or not isinstance(key, list) or len(key) != 4:
+            return None
+        # 정렬 키와 같은 형식이어야 비교 가능 (폴더 여부, 정렬 필드 값, 소문자 이름, 이름)
+        is_file, value, lower, name = key
+        if sort == 'name':
+            value_ok = isinstance(value, str)
+        else:
+            value_ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if not (isinstance(is_file, bool) and value_ok and isinstance(lower, str) and isinstance(name, str)):
+            return None
+        return sort, bool(desc), tuple(key)
+    except (ValueError, TypeError):
+        return None
+
+def invalidate_listing(folder_path):
+    """폴더 목록 캐시 무효화 (업로드 등 서버가 직접 바꾼 경우, 감시 이벤트)"""
+    global listing_generation
+    key = _listing_key(folder_path)
+    with listing_cache_lock:
+        listing_generation += 1
+        old = listing_cache.pop(key, None)
+        if old:
+            listing_cache_stats['bytes'] -= old['size']
+            listing_cache_stats['invalidations'] += 1
+
+class _ListingWatchHandler(FileSystemEventHandler):
+    """watchdog 이벤트 → 바뀐 항목이 들어 있는 폴더의 목록 캐시 무효화"""
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed', 'closed_no_write'):
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', None)):
+            if not path:
+                continue
+            path = os.fsdecode(path)
+            invalidate_listing(os.path.dirname(path))
+            if event.is_directory:
+                invalidate_listing(path)
+            _notify_search(path)
+
+def _notify_search(path):
+    """검색 색인에 변경 알림 (색인이 아직 없으면 무시)"""
+    if search_idx is not None:
+        search_idx.notify(path)
+
+def _ensure_search_index():
+    """검색 색인을 만들고 현재 공유 폴더로 색인 시작 (공유 폴더가 바뀌면 반영)"""
+    global search_idx
+    with search_idx_lock:
+        if search_idx is None:
+            try:
+                search_idx = search_index.SearchIndex(skip_suffix=UPLOAD_PART_SUFFIX)
+            except sqlite3.Error as e:
+                print(f"[검색 색인] 색인 파일을 열 수 없습니다: {e}")
+                return None
+        index = search_idx
+    index.set_roots(SHARED_FOLDERS)
+    # 폴더 감시가 되면 이벤트로 갱신, 안 되면 주기적 재색인
+    index.watched = all([_ensure_listing_watch(_listing_key(folder)) for folder in SHARED_FOLDERS])
+    return index
+
+def _ensure_chunk_index():
+    """중복 제거용 청크 색인 (꺼져 있거나 열 수 없으면 None)"""
+    global chunk_idx
+    if not DEDUP_ENABLED:
+        return None
+    with chunk_idx_lock:
+        if chunk_idx is None:
+            try:
+                chunk_idx = chunk_store.ChunkIndex()
+            except sqlite3.Error as e:
+                print(f"[중복 제거] 청크 색인 파일을 열 수 없습니다: {e}")
+                return None
+        return chunk_idx
+
+def _ensure_listing_watch(key):
+    """폴더가 속한 공유 폴더에 watchdog 감시를 걸어 둠 (감시 중이면 True)"""
+    if Observer is None:
+        return False
+    for folder in SHARED_FOLDERS:
+        root = _listing_key(folder)
+        if key != root and not key.startswith(root.rstrip(os.sep) + os.sep):
+            continue
+        with listing_cache_lock:
+            if root not in listing_watchers:
+                listing_watchers[root] = None
+                try:
+                    observer = Observer()
+                    observer.daemon = True
+                    observer.schedule(_ListingWatchHandler(), folder, recursive=True)
+                    observer.start()
+                    listing_watchers[root] = observer
+                    print(f"[목록 캐시] 폴더 감시 시작: {folder}")
+                except Exception as e:
+                    print(f"[목록 캐시] 폴더 감시 실패, mtime으로만 확인합니다: {folder} ({e})")
+            return listing_watchers[root] is not None
+    return False
+
+@app.after_request
+def compress_json(response):
+    """/api/* JSON 응답을 Accept-Encoding에 맞춰 압축 (zstd, gzip)"""
+    if (response.mimetype != 'application/json' or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.status_code in (204, 304)):
+        return response
+    encoding = wire_codec.choose(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < JSON_COMPRESS_MIN:
+        return response
+    response.set_data(wire_codec.compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def _request_body():
+    """업로드 본문 스트림과 원본 크기 (Content-Encoding으로 압축해 보냈으면 풀면서 읽음)
+
+    지원하지 않는 압축 방식이면 (None, None)
+    """
+    encoding = request.headers.get('Content-Encoding', '').strip().lower()
+    if not encoding or encoding == 'identity':
+        return request.stream, request.content_length
+    try:
+        body = wire_codec.DecodingReader(request.stream, encoding)
+    except ValueError:
+        return None, None
+    return body, request.headers.get(wire_codec.LENGTH_HEADER, type=int)
 
 def login_required(f):
     """로그인 필수 데코레이터"""
@@ -178,15 +488,18 @@ def load_server_config(config_path='server_config.json'):
     형식 예시:
     {
       "users": {"admin":"admin"},
-      "shared_folders": ["D:/Share"]
+      "shared_folders": ["D:/Share"],
+      "engine": "waitress"
     }
     """
+    global SERVER_ENGINE
     try:
         if os.path.exists(config_path):
             with open(config_path, 'r', encoding='utf-8') as f:
                 cfg = json.load(f)
             users = cfg.get('users', {})
             folders = cfg.get('shared_folders', [])
+            SERVER_ENGINE = cfg.get('engine', SERVER_ENGINE)
             # 사용자 적용
             if isinstance(users, dict):
                 for u, p in users.items():
@@ -325,8 +638,43 @@ def shared_folders():
     for folder in SHARED_FOLDERS:
         if os.path.exists(folder):
             folders.append(folder)
+    _ensure_search_index()  # 로그인 직후 색인을 미리 시작
     return jsonify({'folders': folders})
 
+@app.route('/api/search')
+@login_required
+def api_search():
+    """이름 검색 API (?q=...&mode=prefix|substring|glob&path=검색 범위&limit=200)"""
+    query = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'substring')
+    scope = request.args.get('path', '')
+    limit = request.args.get('limit', 200, type=int)
+    if not query:
+        return jsonify({'error': '검색어가 없습니다'}), 400
+    if mode not in ('prefix', 'substring', 'glob'):
+        return jsonify({'error': f'지원하지 않는 검색 방식: {mode}'}), 400
+    if scope and not is_allowed_path(os.path.abspath(scope)):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    index = _ensure_search_index()
+    if index is None:
+        return jsonify({'error': '검색 색인을 사용할 수 없습니다'}), 503
+    started = time.perf_counter()
+    try:
+        results = index.search(query, mode, scope or None, limit)
+    except sqlite3.Error as e:
+        return jsonify({'error': f'검색 실패: {e}'}), 400
+    # 공유가 해제됐거나 허용 범위 밖인 항목 제외
+    results = [item for item in results if is_allowed_path(item['path'])]
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'query': query,
+        'mode': mode,
+        'indexing': index.indexing,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+    })
+
 @app.route('/api/files')
 @login_required
 def api_files():
@@ -337,8 +685,67 @@ def api_files():
     if not os.path.isdir(folder_path):
         return jsonify({'error': 'Folder not found'}), 404
     
-    files = list_files(folder_path)
-    return jsonify({'files': files, 'current_path': folder_path})
+    # limit이 없으면 이전처럼 전체 목록
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor', '')
+    sort = request.args.get('sort', 'name')
+    desc = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in LISTING_SORT_FIELDS:
+        return jsonify({'error': f'지원하지 않는 정렬: {sort}'}), 400
+    if not limit and not cursor and sort == 'name' and not desc:
+        files = list_files(folder_path)
+        return jsonify({'files': files, 'current_path': folder_path, 'total': len(files)})
+    
+    start = 0
+    view = None
+    if cursor:
+        decoded = _decode_listing_cursor(cursor)
+        if decoded is None:
+            return jsonify({'error': '잘못된 커서입니다'}), 400
+        sort, desc, cursor_key = decoded  # 커서의 정렬 방식을 따름
+        view = _listing_view(folder_path, sort, desc)
+        start = _listing_page_start(view['keys'], cursor_key, desc)
+    else:
+        view = _listing_view(folder_path, sort, desc)
+    
+    total = len(view['items'])
+    limit = max(1, min(limit or LISTING_PAGE_MAX, LISTING_PAGE_MAX))
+    end = min(start + limit, total)
+    next_cursor = _encode_listing_cursor(sort, desc, view['keys'][end - 1]) if end < total else None
+    return jsonify({
+        'files': view['items'][start:end],
+        'current_path': folder_path,
+        'total': total,
+        'sort': f"-{sort}" if desc else sort,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/cache_stats')
+@login_required
+def cache_stats():
+    """폴더 목록 캐시 적중/미스 통계"""
+    with listing_cache_lock:
+        stats = dict(listing_cache_stats)
+        stats['entries'] = len(listing_cache)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['max_bytes'] = LISTING_CACHE_MAX_BYTES
+    stats['watched_folders'] = [root for root, observer in listing_watchers.items() if observer]
+    result = {'listing': stats}
+    if search_idx is not None:
+        result['search'] = search_idx.stats()
+    if chunk_idx is not None:
+        result['dedup'] = chunk_idx.stats()
+    if archive_cache_store is not None:
+        result['archive'] = archive_cache_store.stats()
+    return jsonify(result)
+
+@app.route('/api/encodings')
+@login_required
+def api_encodings():
+    """서버가 쓸 수 있는 전송 압축 방식 (업로드 본문 Content-Encoding, 다운로드 X-Woori-Encoding)"""
+    return jsonify({'upload': wire_codec.available(), 'download': wire_codec.available()})
 
 @app.route('/download')
 @login_required
@@ -354,12 +761,86 @@ def download():
     # 로그 기록
     log_access(session.get('username', '알 수 없음'), '파일 다운로드', os.path.basename(file_path))
     
-    response = send_file(file_path, as_attachment=True, 
-                        download_name=os.path.basename(file_path),
-                        conditional=True)
-    response.headers['Accept-Ranges'] = 'bytes'
-    response.headers['Cache-Control'] = 'no-transform'
-    return response
+    stat = os.stat(file_path)
+    size = stat.st_size
+    # werkzeug send_file과 같은 형식 (이전 버전에서 받던 .part도 그대로 이어받기)
+    etag = f"{stat.st_mtime}-{size}-{zlib.adler32(file_path.encode('utf-8')) & 0xFFFFFFFF}"
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+    headers = {
+        'ETag': f'"{etag}"',
+        'Last-Modified': http_date(last_modified),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'no-transform'
+    }
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return app.response_class(status=304, headers=headers)
+    
+    start, end, status = 0, size, 200
+    byte_range = parse_range_header(request.headers.get('Range'))
+    if byte_range is not None and len(byte_range.ranges) == 1 and _if_range_matches(etag, last_modified):
+        span = byte_range.range_for_length(size)
+        if span is None:
+            headers['Content-Range'] = f"bytes */{size}"
+            return app.response_class(status=416, headers=headers)
+        start, end = span
+        status = 206
+        headers['Content-Range'] = f"bytes {start}-{end - 1}/{size}"
+    
+    file_name = os.path.basename(file_path)
+    headers['Content-Disposition'] = (f"attachment; filename=\"{secure_filename(file_name) or 'download'}\"; "
+                                      f"filename*=UTF-8''{quote(file_name)}")
+    headers['Content-Length'] = str(end - start)
+    mimetype = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+    
+    f = open(file_path, 'rb')
+    f.seek(start)
+    
+    # 전송 압축: 요청한 구간의 원본 바이트를 압축 (Content-Range/ETag는 원본 기준 그대로)
+    encoding = wire_codec.choose(request.headers.get(wire_codec.ENCODING_HEADER))
+    headers['Vary'] = wire_codec.ENCODING_HEADER
+    if encoding and end - start >= DOWNLOAD_COMPRESS_MIN and wire_codec.is_compressible_name(file_name):
+        sample = f.read(wire_codec.SAMPLE_SIZE)
+        f.seek(start)
+        if wire_codec.looks_compressible(sample):
+            del headers['Content-Length']
+            headers[wire_codec.ENCODING_HEADER] = encoding
+            headers[wire_codec.LENGTH_HEADER] = str(end - start)
+            body = wire_codec.iter_compressed(_iter_file_range(f, end - start), encoding)
+            return app.response_class(body, status=status, headers=headers, mimetype=mimetype,
+                                      direct_passthrough=True)
+    
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    if file_wrapper is not None:
+        # 서버에 파일 객체를 그대로 넘김 (waitress는 큰 블록 직접 전송, gunicorn은 os.sendfile).
+        # Content-Length까지만 보내므로 구간 요청도 같은 경로 사용
+        body = file_wrapper(f, DOWNLOAD_BLOCK_SIZE)
+    else:
+        body = _iter_file_range(f, end - start)
+    return app.response_class(body, status=status, headers=headers, mimetype=mimetype,
+                              direct_passthrough=True)
+
+def _if_range_matches(etag, last_modified):
+    """If-Range가 없거나 현재 파일과 같으면 True (다르면 전체 파일로 응답)"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if_range_etag, weak = unquote_etag(if_range)
+    if if_range_etag and not weak and if_range_etag == etag:
+        return True
+    if_range_date = parse_date(if_range)
+    return if_range_date is not None and if_range_date.replace(tzinfo=None) == last_modified.replace(tzinfo=None)
+
+def _iter_file_range(f, length):
+    """wsgi.file_wrapper가 없는 서버용: 열린 파일에서 length 바이트만 읽어 전달"""
+    try:
+        while length > 0:
+            data = f.read(min(DOWNLOAD_BLOCK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        f.close()
 
 @app.route('/upload', methods=['POST'])
 @login_required
@@ -409,6 +890,8 @@ def upload_file():
         
         # 파일 저장
         file.save(full_path)
+        invalidate_listing(os.path.dirname(full_path))
+        _notify_search(full_path)
         
         # 로그 기록
         log_access(session.get('username', '알 수 없음'), '파일 업로드', 
@@ -420,22 +903,1080 @@ def upload_file():
         print(f"[업로드 오류] {e}")
         return jsonify({'error': str(e)}), 500
 
+def _resolve_upload_path(target_folder, relative_path, file_name):
+    """업로드 저장 경로 계산 (공유 폴더 밖이면 None)"""
+    target_abs = os.path.abspath(target_folder)
+    if not is_allowed_path(target_abs):
+        return None
+    if relative_path:
+        # 폴더 구조 유지
+        full_path = os.path.abspath(os.path.join(target_abs, relative_path))
+    else:
+        # 단일 파일
+        full_path = os.path.join(target_abs, secure_filename(file_name))
+    if not is_allowed_path(full_path) or full_path == target_abs:
+        return None
+    return full_path
+
+def _upload_lock(upload_id):
+    """업로드 세션별 잠금 (같은 부분 파일에 동시에 쓰지 않도록)"""
+    with upload_sessions_lock:
+        lock = upload_session_locks.get(upload_id)
+        if lock is None:
+            lock = upload_session_locks[upload_id] = threading.Lock()
+        return lock
+
+def _upload_session_file(upload_id):
+    return os.path.join(UPLOAD_SESSION_DIR, f"{upload_id}.json")
+
+def _save_upload_session(sess):
+    """업로드 세션을 디스크에 기록 (서버 재시작 후에도 이어올리기)"""
+    try:
+        os.makedirs(UPLOAD_SESSION_DIR, exist_ok=True)
+        tmp_path = _upload_session_file(sess['id']) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sess, f, ensure_ascii=False)
+        os.replace(tmp_path, _upload_session_file(sess['id']))
+    except OSError as e:
+        print(f"[업로드] 세션 저장 실패: {e}")
+
+def _get_upload_session(upload_id):
+    """업로드 세션 조회 (메모리 → 디스크 순)"""
+    if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+        return None
+    with upload_sessions_lock:
+        sess = upload_sessions.get(upload_id)
+        if sess is None:
+            try:
+                with open(_upload_session_file(upload_id), 'r', encoding='utf-8') as f:
+                    sess = json.load(f)
+            except (OSError, ValueError):
+                return None
+            upload_sessions[upload_id] = sess
+    if sess.get('user') != session.get('username'):
+        return None
+    return sess
+
+def _drop_upload_session(sess, remove_part=False):
+    """업로드 세션 정리"""
+    with upload_sessions_lock:
+        upload_sessions.pop(sess['id'], None)
+    paths = [_upload_session_file(sess['id'])]
+    if remove_part:
+        paths.append(sess['part'])
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"[업로드] 세션 정리 실패 {path}: {e}")
+
+def _upload_chunk_count(sess):
+    return -(-sess['size'] // sess['chunk_size'])
+
+def _upload_bitmap(sess):
+    """받은 청크 비트맵 (청크 i → i번째 비트)"""
+    if 'done' not in sess:
+        # 순차 업로드 시절 세션: offset 앞쪽의 완전한 청크만 받은 것으로 복원
+        sess.setdefault('chunk_size', UPLOAD_CHUNK_SIZE)
+        bitmap = bytearray((_upload_chunk_count(sess) + 7) // 8)
+        full = sess['offset'] // sess['chunk_size']
+        if sess['offset'] >= sess['size']:
+            full = _upload_chunk_count(sess)
+        for index in range(full):
+            bitmap[index >> 3] |= 1 << (index & 7)
+        return bitmap
+    return bytearray.fromhex(sess['done'])
+
+def _mark_upload_chunk(sess, index):
+    """청크 완료 표시 후 앞에서부터 연속으로 받은 위치(offset) 갱신 (세션 잠금 안에서 호출)"""
+    bitmap = _upload_bitmap(sess)
+    bitmap[index >> 3] |= 1 << (index & 7)
+    sess['done'] = bitmap.hex()
+    count = _upload_chunk_count(sess)
+    first_missing = next((i for i in range(count) if not bitmap[i >> 3] & (1 << (i & 7))), count)
+    sess['offset'] = min(first_missing * sess['chunk_size'], sess['size'])
+
+def _upload_state(sess):
+    """클라이언트에 돌려줄 업로드 진행 상태"""
+    return {
+        'upload_id': sess['id'],
+        'offset': sess['offset'],
+        'size': sess['size'],
+        'chunk_size': sess.get('chunk_size', UPLOAD_CHUNK_SIZE),
+        'done': _upload_bitmap(sess).hex()
+    }
+
+def _cleanup_upload_sessions():
+    """오래 방치된 업로드 세션과 부분 파일 삭제"""
+    try:
+        names = os.listdir(UPLOAD_SESSION_DIR)
+    except OSError:
+        return
+    now = datetime.now().timestamp()
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(UPLOAD_SESSION_DIR, name)
+        try:
+            if now - os.path.getmtime(path) < UPLOAD_SESSION_TTL:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                sess = json.load(f)
+            _drop_upload_session(sess, remove_part=True)
+            print(f"[업로드] 방치된 세션 삭제: {sess.get('path')}")
+        except (OSError, ValueError, KeyError):
+            continue
+
+@app.route('/api/upload/init', methods=['POST'])
+@login_required
+def upload_init():
+    """분할 업로드 세션 생성 (같은 파일이면 기존 세션과 받은 위치를 돌려줌)"""
+    data = request.get_json(silent=True) or {}
+    target_folder = data.get('target_folder', '')
+    try:
+        size = int(data.get('size', -1))
+        mtime = float(data.get('mtime', 0))
+        # 새 세션의 청크 크기: 클라이언트가 회선 상태에 맞춰 제안 (이어가는 세션은 기존 크기 유지)
+        chunk_size = int(data.get('chunk_size') or UPLOAD_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({'error': '잘못된 파일 정보입니다'}), 400
+    if not target_folder or size < 0:
+        return jsonify({'error': '대상 폴더/파일 크기가 지정되지 않았습니다'}), 400
+    chunk_size = max(UPLOAD_CHUNK_MIN, min(UPLOAD_CHUNK_MAX, chunk_size // UPLOAD_CHUNK_MIN * UPLOAD_CHUNK_MIN))
+    
+    full_path = _resolve_upload_path(target_folder, data.get('relative_path', ''), data.get('file_name', ''))
+    if not full_path:
+        return jsonify({'error': '업로드 권한이 없습니다'}), 403
+    
+    username = session.get('username', '')
+    key = f"{username}\0{full_path}\0{size}\0{mtime!r}"
+    upload_id = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    with _upload_lock(upload_id):
+        sess = _get_upload_session(upload_id)
+        if sess and os.path.exists(sess['part']):
+            print(f"[업로드] 세션 이어가기: {os.path.basename(full_path)} ({sess['offset']:,}/{size:,} bytes)")
+        else:
+            _cleanup_upload_sessions()
+            part_path = os.path.join(os.path.dirname(full_path),
+                                     f".{os.path.basename(full_path)}.{upload_id[:8]}{UPLOAD_PART_SUFFIX}")
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            # 전체 크기로 미리 할당한 부분 파일에 청크를 바로 기록
+            with open(part_path, 'wb') as f:
+                f.truncate(size)
+            sess = {
+                'id': upload_id,
+                'user': username,
+                'path': full_path,
+                'part': part_path,
+                'size': size,
+                'mtime': mtime,
+                'offset': 0,
+                'chunk_size': chunk_size,
+                'target_folder': target_folder
+            }
+            sess['done'] = _upload_bitmap(sess).hex()
+            with upload_sessions_lock:
+                upload_sessions[upload_id] = sess
+            _save_upload_session(sess)
+            print(f"[업로드] 세션 생성: {os.path.basename(full_path)} ({size:,} bytes)")
+    
+    return jsonify(_upload_state(sess))
+
+@app.route('/api/upload/<upload_id>', methods=['GET'])
+@login_required
+def upload_status(upload_id):
+    """분할 업로드 상태 (연속으로 받은 위치와 청크 비트맵)"""
+    sess = _get_upload_session(upload_id)
+    if not sess:
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    return jsonify(_upload_state(sess))
+
+@app.route('/api/upload/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    """청크 하나를 부분 파일의 지정 위치에 기록 (?offset=N, 본문은 원본 바이트)
+    
+    offset은 chunk_size의 배수여야 하며 청크는 순서와 상관없이 동시에 받을 수 있음
+    """
+    sess = _get_upload_session(upload_id)
+    if not sess:
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    offset = request.args.get('offset', type=int)
+    body, length = _request_body()
+    if body is None:
+        return jsonify({'error': '지원하지 않는 압축 방식입니다', 'encodings': wire_codec.available()}), 415
+    if offset is None or length is None:
+        return jsonify({'error': 'offset과 Content-Length가 필요합니다'}), 400
+    if length > UPLOAD_CHUNK_MAX:
+        return jsonify({'error': '청크가 너무 큽니다', 'chunk_size': UPLOAD_CHUNK_SIZE}), 413
+    
+    chunk_size = sess.setdefault('chunk_size', UPLOAD_CHUNK_SIZE)
+    index, misaligned = divmod(offset, chunk_size) if offset >= 0 else (0, 1)
+    if misaligned or offset >= max(sess['size'], 1):
+        # 청크 경계가 아님 → 서버 기준 위치 알려주기
+        return jsonify({'error': '오프셋 불일치', **_upload_state(sess)}), 409
+    if length != min(chunk_size, sess['size'] - offset):
+        return jsonify({'error': '청크 크기가 맞지 않습니다', **_upload_state(sess)}), 400
+    
+    # 서로 다른 청크는 겹치지 않으므로 잠금 없이 각자 기록
+    written = 0
+    with open(sess['part'], 'r+b') as f:
+        f.seek(offset)
+        while written < length:
+            data = body.read(min(1024 * 1024, length - written))
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+    if written < length:
+        return jsonify({'error': '청크가 중간에 끊겼습니다', **_upload_state(sess)}), 400
+    
+    with _upload_lock(upload_id):
+        _mark_upload_chunk(sess, index)
+        _save_upload_session(sess)
+    return jsonify({'offset': sess['offset'], 'size': sess['size']})
+
+@app.route('/api/upload/<upload_id>/commit', methods=['POST'])
+@login_required
+def upload_commit(upload_id):
+    """모든 청크를 받았으면 부분 파일을 최종 이름으로 교체"""
+    sess = _get_upload_session(upload_id)
+    if not sess or sess.get('kind'):  # 델타 세션은 /api/delta/<id>/commit 으로 적용
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    with _upload_lock(upload_id):
+        if sess['offset'] != sess['size']:
+            return jsonify({'error': '아직 받지 못한 부분이 있습니다', **_upload_state(sess)}), 409
+        try:
+            os.replace(sess['part'], sess['path'])
+            if sess.get('mtime'):
+                os.utime(sess['path'], (sess['mtime'], sess['mtime']))
+            invalidate_listing(os.path.dirname(sess['path']))
+            _notify_search(sess['path'])
+        except OSError as e:
+            print(f"[업로드 오류] {e}")
+            return jsonify({'error': str(e)}), 500
+        _drop_upload_session(sess)
+    
+    # 로그 기록
+    log_access(session.get('username', '알 수 없음'), '파일 업로드',
+              f"{os.path.basename(sess['path'])} -> {sess.get('target_folder', '')}")
+    return jsonify({'success': True, 'path': sess['path']})
+
+@app.route('/api/upload/<upload_id>', methods=['DELETE'])
+@login_required
+def upload_abort(upload_id):
+    """분할 업로드 취소 (부분 파일 삭제)"""
+    sess = _get_upload_session(upload_id)
+    if not sess:
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    with _upload_lock(upload_id):
+        _drop_upload_session(sess, remove_part=True)
+    return jsonify({'success': True})
+
+@app.route('/api/upload/tar', methods=['POST'])
+@login_required
+def upload_tar():
+    """작은 파일 묶음 업로드 (?target_folder=..., 본문은 tar 스트림)
+    
+    요청 본문을 받는 대로 항목별로 풀어서 저장하므로 전체를 메모리에 올리지 않음.
+    일반 파일과 폴더만 허용하고 링크/장치 파일은 건너뜀
+    """
+    target_folder = request.args.get('target_folder', '')
+    if not target_folder:
+        return jsonify({'error': '대상 폴더가 지정되지 않았습니다'}), 400
+    target_abs = os.path.abspath(target_folder)
+    if not is_allowed_path(target_abs):
+        return jsonify({'error': '업로드 권한이 없습니다'}), 403
+    
+    saved_files = 0
+    saved_bytes = 0
+    skipped = []
+    touched_dirs = set()
+    body, _ = _request_body()
+    if body is None:
+        return jsonify({'error': '지원하지 않는 압축 방식입니다', 'encodings': wire_codec.available()}), 415
+    try:
+        with tarfile.open(fileobj=body, mode='r|') as tar:
+            for member in tar:
+                full_path = _resolve_upload_path(target_folder, member.name, '')
+                # 절대 경로나 ../ 로 대상 폴더 밖을 가리키는 항목 차단
+                if (not full_path or os.path.isabs(member.name)
+                        or os.path.commonpath([target_abs, full_path]) != target_abs):
+                    skipped.append(member.name)
+                    continue
+                if member.isdir():
+                    os.makedirs(full_path, exist_ok=True)
+                    touched_dirs.add(os.path.dirname(full_path))
+                    _notify_search(full_path)
+                    continue
+                if not member.isfile():
+                    skipped.append(member.name)
+                    continue
+                
+                # 부분 파일에 받은 뒤 교체 (중간에 끊겨도 반쪽 파일이 남지 않도록)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                part_path = os.path.join(os.path.dirname(full_path),
+                                         f".{os.path.basename(full_path)}.tar{UPLOAD_PART_SUFFIX}")
+                source = tar.extractfile(member)
+                try:
+                    with open(part_path, 'wb') as f:
+                        shutil.copyfileobj(source, f, 1024 * 1024)
+                    os.replace(part_path, full_path)
+                    touched_dirs.add(os.path.dirname(full_path))
+                    _notify_search(full_path)
+                except BaseException:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    raise
+                if member.mtime:
+                    os.utime(full_path, (member.mtime, member.mtime))
+                saved_files += 1
+                saved_bytes += member.size
+    except (tarfile.TarError, OSError) as e:
+        print(f"[묶음 업로드 오류] {e} ({saved_files}개 저장 후 중단)")
+        return jsonify({'error': str(e), 'files': saved_files, 'bytes': saved_bytes}), 400
+    finally:
+        for folder in touched_dirs:
+            invalidate_listing(folder)
+        if saved_files:
+            # 로그 기록 (묶음 단위)
+            log_access(session.get('username', '알 수 없음'), '파일 업로드',
+                      f"{saved_files}개 파일 묶음 -> {target_folder}")
+    
+    if skipped:
+        print(f"[묶음 업로드] 건너뛴 항목 {len(skipped)}개: {skipped[:10]}")
+    return jsonify({'success': True, 'files': saved_files, 'bytes': saved_bytes, 'skipped': skipped})
+
+def _delta_base(st):
+    """델타 기준 파일 식별값 (크기/수정시각이 바뀌면 달라짐)"""
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+@app.route('/api/delta/signature')
+@login_required
+def delta_signature():
+    """업로드할 위치에 이미 있는 파일의 블록 서명 (?target_folder=&relative_path=&file_name=)
+    
+    클라이언트는 이 서명으로 델타를 만들어 /api/delta/init 세션으로 보냄. 파일이 없으면 404
+    """
+    full_path = _resolve_upload_path(request.args.get('target_folder', ''),
+                                     request.args.get('relative_path', ''),
+                                     request.args.get('file_name', ''))
+    if not full_path:
+        return jsonify({'error': '업로드 권한이 없습니다'}), 403
+    if not os.path.isfile(full_path):
+        return jsonify({'error': 'File not found'}), 404
+    
+    f = open(full_path, 'rb')
+    st = os.fstat(f.fileno())
+    block_size = delta_sync.block_size_for(st.st_size)
+    
+    def generate():
+        with f:
+            yield from delta_sync.iter_signature(f, block_size)
+    
+    headers = {'X-Delta-Base': _delta_base(st), 'Cache-Control': 'no-transform'}
+    return app.response_class(generate(), mimetype='application/octet-stream', headers=headers)
+
+def _apply_delta_upload(full_path, base, mtime, read):
+    """기존 파일 + 델타(read)로 부분 파일을 만들어 교체 → (응답 내용, 상태 코드)
+    
+    델타를 받기 전이나 적용하는 동안 기존 파일이 바뀌었으면 409 (클라이언트는 일반 업로드로 다시 보냄)
+    """
+    part_path = os.path.join(os.path.dirname(full_path),
+                             f".{os.path.basename(full_path)}.{secrets.token_hex(4)}.delta{UPLOAD_PART_SUFFIX}")
+    try:
+        with open(full_path, 'rb') as basis:
+            st = os.fstat(basis.fileno())
+            if _delta_base(st) != base:
+                return {'error': '서버 파일이 바뀌었습니다'}, 409
+            with open(part_path, 'wb') as out:
+                stats = delta_sync.apply_delta(read, basis, out, delta_sync.block_size_for(st.st_size))
+        # 받는 동안 기존 파일이 바뀌었으면 덮어쓰지 않음
+        if _delta_base(os.stat(full_path)) != base:
+            os.remove(part_path)
+            return {'error': '서버 파일이 바뀌었습니다'}, 409
+        os.replace(part_path, full_path)
+        if mtime:
+            os.utime(full_path, (mtime, mtime))
+    except delta_sync.DeltaError as e:
+        os.remove(part_path)
+        print(f"[델타 업로드 오류] {os.path.basename(full_path)}: {e}")
+        return {'error': str(e)}, 400
+    except BaseException as e:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        if isinstance(e, OSError):
+            print(f"[델타 업로드 오류] {e}")
+            return {'error': str(e)}, 500
+        raise
+    invalidate_listing(os.path.dirname(full_path))
+    _notify_search(full_path)
+    
+    print(f"[델타 업로드] {os.path.basename(full_path)}: {stats['size']:,} bytes "
+          f"(기존 블록 {stats['copied']:,} / 새로 받음 {stats['literal']:,})")
+    return {'success': True, 'path': full_path, **stats}, 200
+
+@app.route('/api/delta/upload', methods=['POST'])
+@login_required
+def delta_upload():
+    """델타를 요청 하나로 받아 업로드 (?target_folder=&relative_path=&file_name=&base=&mtime=, 본문은 델타)
+    
+    이전 클라이언트용. 새 클라이언트는 /api/delta/init 으로 세션을 만들어 델타를 청크로 나눠 보냄
+    """
+    args = request.args
+    full_path = _resolve_upload_path(args.get('target_folder', ''), args.get('relative_path', ''),
+                                     args.get('file_name', ''))
+    if not full_path:
+        return jsonify({'error': '업로드 권한이 없습니다'}), 403
+    if not os.path.isfile(full_path):
+        return jsonify({'error': 'File not found'}), 404
+    body, _ = _request_body()
+    if body is None:
+        return jsonify({'error': '지원하지 않는 압축 방식입니다', 'encodings': wire_codec.available()}), 415
+    
+    result, status = _apply_delta_upload(full_path, args.get('base', ''), args.get('mtime', type=float), body.read)
+    if status == 200:
+        log_access(session.get('username', '알 수 없음'), '파일 업로드',
+                  f"{os.path.basename(full_path)} (델타) -> {args.get('target_folder', '')}")
+    return jsonify(result), status
+
+@app.route('/api/delta/init', methods=['POST'])
+@login_required
+def delta_init():
+    """델타 업로드 세션 생성 (JSON: target_folder, relative_path, file_name, base, mtime, size=델타 크기)
+    
+    델타 자체를 분할 업로드 세션의 부분 파일로 받음: 청크는 /api/upload/<id> PUT으로 보내고
+    (요청 크기/시간 제한, 이어올리기, 동시 전송은 일반 분할 업로드와 같음) /api/delta/<id>/commit 으로 적용
+    """
+    data = request.get_json(silent=True) or {}
+    target_folder = data.get('target_folder', '')
+    base = str(data.get('base', ''))
+    try:
+        size = int(data.get('size', -1))
+        mtime = float(data.get('mtime', 0))
+        chunk_size = int(data.get('chunk_size') or UPLOAD_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({'error': '잘못된 파일 정보입니다'}), 400
+    if not target_folder or size < 0 or not base:
+        return jsonify({'error': '대상 폴더/델타 크기가 지정되지 않았습니다'}), 400
+    chunk_size = max(UPLOAD_CHUNK_MIN, min(UPLOAD_CHUNK_MAX, chunk_size // UPLOAD_CHUNK_MIN * UPLOAD_CHUNK_MIN))
+    
+    full_path = _resolve_upload_path(target_folder, data.get('relative_path', ''), data.get('file_name', ''))
+    if not full_path:
+        return jsonify({'error': '업로드 권한이 없습니다'}), 403
+    try:
+        if _delta_base(os.stat(full_path)) != base:
+            return jsonify({'error': '서버 파일이 바뀌었습니다'}), 409
+    except OSError:
+        return jsonify({'error': 'File not found'}), 404
+    
+    # 같은 파일/서명이면 델타도 같으므로 끊긴 세션을 이어서 받음
+    username = session.get('username', '')
+    key = f"delta\0{username}\0{full_path}\0{base}\0{size}\0{mtime!r}"
+    upload_id = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    with _upload_lock(upload_id):
+        sess = _get_upload_session(upload_id)
+        if sess and os.path.exists(sess['part']):
+            print(f"[델타 업로드] 세션 이어가기: {os.path.basename(full_path)} ({sess['offset']:,}/{size:,} bytes)")
+        else:
+            _cleanup_upload_sessions()
+            part_path = os.path.join(os.path.dirname(full_path),
+                                     f".{os.path.basename(full_path)}.{upload_id[:8]}.delta{UPLOAD_PART_SUFFIX}")
+            with open(part_path, 'wb') as f:
+                f.truncate(size)
+            sess = {
+                'id': upload_id,
+                'kind': 'delta',
+                'user': username,
+                'path': full_path,
+                'part': part_path,
+                'base': base,
+                'size': size,
+                'mtime': mtime,
+                'offset': 0,
+                'chunk_size': chunk_size,
+                'target_folder': target_folder
+            }
+            sess['done'] = _upload_bitmap(sess).hex()
+            with upload_sessions_lock:
+                upload_sessions[upload_id] = sess
+            _save_upload_session(sess)
+            print(f"[델타 업로드] 세션 생성: {os.path.basename(full_path)} (델타 {size:,} bytes)")
+    
+    return jsonify(_upload_state(sess))
+
+@app.route('/api/delta/<upload_id>/commit', methods=['POST'])
+@login_required
+def delta_commit(upload_id):
+    """받은 델타를 기존 파일에 적용해 교체 (델타를 모두 받았을 때만)"""
+    sess = _get_upload_session(upload_id)
+    if not sess or sess.get('kind') != 'delta':
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    with _upload_lock(upload_id):
+        if sess['offset'] != sess['size']:
+            return jsonify({'error': '아직 받지 못한 부분이 있습니다', **_upload_state(sess)}), 409
+        try:
+            with open(sess['part'], 'rb') as delta:
+                result, status = _apply_delta_upload(sess['path'], sess['base'], sess.get('mtime'), delta.read)
+        except OSError as e:
+            print(f"[델타 업로드 오류] {e}")
+            return jsonify({'error': str(e)}), 500
+        if status != 500:
+            # 적용했거나 다시 보내도 소용없는 경우(기존 파일이 바뀜/델타 오류) 세션 정리
+            _drop_upload_session(sess, remove_part=True)
+    
+    if status == 200:
+        log_access(session.get('username', '알 수 없음'), '파일 업로드',
+                  f"{os.path.basename(sess['path'])} (델타) -> {sess.get('target_folder', '')}")
+    return jsonify(result), status
+
+@app.route('/api/delta/download', methods=['POST'])
+@login_required
+def delta_download():
+    """클라이언트가 가진 이전 파일의 서명(본문)과 비교해 바뀐 부분만 보냄 (?path=...)
+    
+    응답 본문은 델타 (X-File-Size: 새 파일 크기). 클라이언트가 복원 후 sha256으로 확인
+    """
+    file_path = os.path.abspath(request.args.get('path', ''))
+    if not is_allowed_path(file_path):
+        abort(403)
+    if not os.path.isfile(file_path):
+        abort(404)
+    if request.content_length is None or request.content_length > DELTA_SIGNATURE_MAX:
+        return jsonify({'error': '서명이 너무 큽니다'}), 413
+    try:
+        signature = delta_sync.parse_signature(request.get_data())
+    except delta_sync.DeltaError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    log_access(session.get('username', '알 수 없음'), '파일 다운로드', f"{os.path.basename(file_path)} (델타)")
+    
+    f = open(file_path, 'rb')
+    size = os.fstat(f.fileno()).st_size
+    
+    def generate():
+        with f:
+            yield from delta_sync.iter_delta(f, signature)
+    
+    headers = {'X-File-Size': str(size), 'Cache-Control': 'no-transform'}
+    return app.response_class(stream_with_context(generate()), mimetype='application/octet-stream',
+                              headers=headers)
+
+def _dedup_session_file(upload_id, suffix='.json'):
+    return os.path.join(DEDUP_SESSION_DIR, f"{upload_id}{suffix}")
+
+def _save_dedup_session(sess):
+    """중복 제거 세션을 디스크에 기록 (서버 재시작 후에도 받은 청크부터 이어가기)
+    
+    청크 목록은 세션을 만들 때 한 번만 쓰고, 받은 청크는 _record_dedup_chunks로 덧붙임
+    """
+    state = {key: value for key, value in sess.items() if key not in ('by_offset', 'received')}
+    try:
+        os.makedirs(DEDUP_SESSION_DIR, exist_ok=True)
+        tmp_path = _dedup_session_file(sess['id']) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, _dedup_session_file(sess['id']))
+        with open(_dedup_session_file(sess['id'], '.received'), 'w', encoding='ascii') as f:
+            f.writelines(f"{i}\n" for i in sorted(sess['received']))
+    except OSError as e:
+        print(f"[중복 제거] 세션 저장 실패: {e}")
+
+def _record_dedup_chunks(sess, indexes):
+    """받은 청크 번호를 세션 기록에 덧붙임 (부분 파일에 쓴 뒤 호출)"""
+    try:
+        with open(_dedup_session_file(sess['id'], '.received'), 'a', encoding='ascii') as f:
+            f.writelines(f"{i}\n" for i in indexes)
+    except OSError as e:
+        print(f"[중복 제거] 세션 저장 실패: {e}")
+
+def _load_dedup_session(upload_id):
+    """디스크에 기록된 중복 제거 세션 (없거나 부분 파일이 사라졌으면 None)"""
+    try:
+        with open(_dedup_session_file(upload_id), 'r', encoding='utf-8') as f:
+            sess = json.load(f)
+        received = set()
+        try:
+            with open(_dedup_session_file(upload_id, '.received'), 'r', encoding='ascii') as f:
+                received = {int(line) for line in f if line.strip()}
+        except FileNotFoundError:
+            pass
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(sess.get('part', '')):
+        return None
+    sess['chunks'] = [tuple(chunk) for chunk in sess['chunks']]
+    sess['by_offset'] = {offset: i for i, (offset, _, _) in enumerate(sess['chunks'])}
+    sess['received'] = {i for i in received if 0 <= i < len(sess['chunks'])}
+    sess['received_bytes'] = sum(sess['chunks'][i][1] for i in sess['received'])
+    sess['touched'] = time.time()
+    return sess
+
+def _drop_dedup_session(sess, remove_part=False):
+    with dedup_sessions_lock:
+        dedup_sessions.pop(sess['id'], None)
+    paths = [_dedup_session_file(sess['id']), _dedup_session_file(sess['id'], '.received')]
+    if remove_part:
+        paths.append(sess['part'])
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"[중복 제거] 세션 정리 실패 {path}: {e}")
+
+def _cleanup_dedup_sessions():
+    """오래 방치된 중복 제거 세션과 부분 파일 삭제
+    
+    메모리에 없는 세션(서버를 다시 시작하기 전에 만든 것)도 디스크 기록을 훑어서 정리
+    """
+    now = time.time()
+    with dedup_sessions_lock:
+        expired = [sess for sess in dedup_sessions.values() if now - sess['touched'] > DEDUP_SESSION_TTL]
+        loaded = set(dedup_sessions)
+    try:
+        names = os.listdir(DEDUP_SESSION_DIR)
+    except OSError:
+        names = []
+    for name in names:
+        upload_id, ext = os.path.splitext(name)
+        if ext != '.json' or upload_id in loaded:
+            continue
+        paths = [_dedup_session_file(upload_id), _dedup_session_file(upload_id, '.received')]
+        try:
+            touched = max(os.path.getmtime(path) for path in paths if os.path.exists(path))
+            if now - touched < DEDUP_SESSION_TTL:
+                continue
+            with open(paths[0], 'r', encoding='utf-8') as f:
+                expired.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    for sess in expired:
+        try:
+            _drop_dedup_session(sess, remove_part=True)
+            print(f"[중복 제거] 방치된 세션 삭제: {sess['path']}")
+        except KeyError:
+            continue
+
+def _get_dedup_session(upload_id):
+    """중복 제거 세션 조회 (메모리 → 디스크 순)"""
+    if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+        return None
+    with dedup_sessions_lock:
+        sess = dedup_sessions.get(upload_id)
+        if sess is None:
+            sess = _load_dedup_session(upload_id)
+            if sess is None:
+                return None
+            dedup_sessions[upload_id] = sess
+    if sess['user'] != session.get('username', ''):
+        return None
+    sess['touched'] = time.time()
+    return sess
+
+def _dedup_missing(sess, known):
+    """아직 받아야 하는 청크 번호 (같은 파일 안에서 반복되는 청크는 첫 번째만)"""
+    missing = []
+    wanted = set()
+    received = {sess['chunks'][i][2] for i in sess['received']}
+    for i, (_, _, digest) in enumerate(sess['chunks']):
+        if i in sess['received'] or digest in received or digest in known or digest in wanted:
+            continue
+        wanted.add(digest)
+        missing.append(i)
+    return missing
+
+@app.route('/api/dedup/init', methods=['POST'])
+@login_required
+def dedup_init():
+    """중복 제거 업로드 세션 생성
+    
+    본문: {target_folder, relative_path, file_name, size, mtime, chunks: [[sha256, 길이], ...]}
+    응답의 missing(청크 번호)만 PUT /api/dedup/<id>?offset= 으로 보내면 됨
+    """
+    index = _ensure_chunk_index()
+    if index is None:
+        return jsonify({'error': '중복 제거를 사용하지 않습니다'}), 404
+    data = request.get_json(silent=True) or {}
+    try:
+        size = int(data.get('size', -1))
+        mtime = float(data.get('mtime', 0))
+        chunks = []
+        offset = 0
+        for digest, length in data.get('chunks') or []:
+            length = int(length)
+            if len(digest) != 64 or not 0 < length <= chunk_store.CHUNK_MAX:
+                raise ValueError(digest)
+            bytes.fromhex(digest)
+            chunks.append((offset, length, digest.lower()))
+            offset += length
+    except (TypeError, ValueError):
+        return jsonify({'error': '잘못된 청크 목록입니다'}), 400
+    if not data.get('target_folder') or size <= 0 or offset != size:
+        return jsonify({'error': '청크 목록이 파일 크기와 맞지 않습니다'}), 400
+    
+    full_path = _resolve_upload_path(data['target_folder'], data.get('relative_path', ''),
+                                     data.get('file_name', ''))
+    if not full_path:
+        return jsonify({'error': '업로드 권한이 없습니다'}), 403
+    
+    username = session.get('username', '')
+    chunk_list = hashlib.sha1(''.join(digest for _, _, digest in chunks).encode('ascii')).hexdigest()
+    key = f"dedup\0{username}\0{full_path}\0{size}\0{mtime!r}\0{chunk_list}"
+    upload_id = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    _cleanup_dedup_sessions()
+    with _upload_lock(upload_id):
+        sess = _get_dedup_session(upload_id)
+        if not sess:
+            part_path = os.path.join(os.path.dirname(full_path),
+                                     f".{os.path.basename(full_path)}.{upload_id[:8]}.dedup{UPLOAD_PART_SUFFIX}")
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(part_path, 'wb') as f:
+                f.truncate(size)
+            sess = {
+                'id': upload_id,
+                'user': username,
+                'path': full_path,
+                'part': part_path,
+                'size': size,
+                'mtime': mtime,
+                'chunks': chunks,
+                'by_offset': {offset: i for i, (offset, _, _) in enumerate(chunks)},
+                'received': set(),
+                'received_bytes': 0,
+                'target_folder': data['target_folder'],
+                'touched': time.time()
+            }
+            with dedup_sessions_lock:
+                dedup_sessions[upload_id] = sess
+            _save_dedup_session(sess)
+        else:
+            print(f"[중복 제거] 세션 이어가기: {os.path.basename(full_path)} (청크 {len(sess['received'])}개 받음)")
+        missing = _dedup_missing(sess, index.locate(digest for _, _, digest in chunks))
+    
+    missing_bytes = sum(chunks[i][1] for i in missing)
+    print(f"[중복 제거] {os.path.basename(full_path)}: 청크 {len(chunks)}개 중 {len(missing)}개 요청 "
+          f"({size - missing_bytes:,} / {size:,} bytes 재사용)")
+    return jsonify({'upload_id': upload_id, 'missing': missing, 'chunk_count': len(chunks),
+                    'dedup_bytes': size - missing_bytes})
+
+@app.route('/api/dedup/<upload_id>', methods=['PUT'])
+@login_required
+def dedup_chunk(upload_id):
+    """청크 받기 (?offset=청크 시작 위치, 본문은 그 위치부터 이어지는 청크 하나 이상)
+    
+    청크마다 sha256을 확인한 뒤 부분 파일의 제자리에 기록
+    """
+    sess = _get_dedup_session(upload_id)
+    if not sess:
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    offset = request.args.get('offset', type=int)
+    body, remaining = _request_body()
+    if body is None:
+        return jsonify({'error': '지원하지 않는 압축 방식입니다', 'encodings': wire_codec.available()}), 415
+    index = sess['by_offset'].get(offset)
+    if index is None or not remaining:
+        return jsonify({'error': '청크 시작 위치와 Content-Length가 필요합니다'}), 400
+    
+    done = []
+    with open(sess['part'], 'r+b') as f:
+        f.seek(offset)
+        while remaining > 0:
+            if index >= len(sess['chunks']) or sess['chunks'][index][1] > remaining:
+                return jsonify({'error': '본문이 청크 경계와 맞지 않습니다'}), 400
+            _, length, digest = sess['chunks'][index]
+            data = body.read(length)
+            while len(data) < length:
+                more = body.read(length - len(data))
+                if not more:
+                    return jsonify({'error': '청크가 중간에 끊겼습니다'}), 400
+                data += more
+            if hashlib.sha256(data).hexdigest() != digest:
+                return jsonify({'error': f'청크 {index}의 해시가 다릅니다'}), 400
+            f.write(data)
+            done.append(index)
+            remaining -= length
+            index += 1
+    
+    with _upload_lock(upload_id):
+        new = [i for i in done if i not in sess['received']]
+        for i in new:
+            sess['received'].add(i)
+            sess['received_bytes'] += sess['chunks'][i][1]
+        _record_dedup_chunks(sess, new)
+    return jsonify({'received': len(sess['received'])})
+
+@app.route('/api/dedup/<upload_id>/commit', methods=['POST'])
+@login_required
+def dedup_commit(upload_id):
+    """받지 않은 청크를 색인이 가리키는 파일에서 복사해 채우고 최종 이름으로 교체
+    
+    그 사이 원본 파일이 바뀌어 채우지 못한 청크가 있으면 409와 missing 목록
+    """
+    sess = _get_dedup_session(upload_id)
+    if not sess:
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    index = _ensure_chunk_index()
+    if index is None:
+        return jsonify({'error': '중복 제거를 사용하지 않습니다'}), 404
+    
+    with _upload_lock(upload_id):
+        chunks = sess['chunks']
+        pending = [i for i in range(len(chunks)) if i not in sess['received']]
+        sources = index.locate(chunks[i][2] for i in pending)
+        in_part = {}
+        for i in sess['received']:
+            in_part.setdefault(chunks[i][2], chunks[i][0])
+        
+        # 파일 전체가 이미 있는 파일과 같으면 reflink 시도 (같은 파일 시스템의 btrfs/XFS 등)
+        # 청크가 모두 같은 위치여도 원본이 더 길면(앞부분만 같음) 뒤쪽이 딸려 오므로 크기도 같아야 함
+        whole = {sources.get(digest, (None,))[0] for _, _, digest in chunks}
+        source = whole.pop() if len(whole) == 1 else None
+        try:
+            same_size = source is not None and os.path.getsize(source) == sess['size']
+        except OSError:
+            same_size = False
+        cloned = (not sess['received'] and same_size
+                  and all(sources[digest][1] == offset for offset, _, digest in chunks)
+                  and chunk_store.clone_file(source, sess['part']))
+        
+        missing = []
+        try:
+            with open(sess['part'], 'r+b') as out:
+                for i in (range(len(chunks)) if cloned else pending):
+                    offset, length, digest = chunks[i]
+                    if cloned:
+                        out.seek(offset)
+                        data = out.read(length)
+                    elif digest in in_part:
+                        out.seek(in_part[digest])
+                        data = out.read(length)
+                    elif digest in sources:
+                        path, source_offset, _ = sources[digest]
+                        try:
+                            with open(path, 'rb') as src:
+                                src.seek(source_offset)
+                                data = src.read(length)
+                        except OSError:
+                            data = b''
+                    else:
+                        data = b''
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        missing.append(i)
+                        continue
+                    if not cloned:
+                        out.seek(offset)
+                        out.write(data)
+                        in_part.setdefault(digest, offset)
+                if cloned and missing:
+                    out.truncate(0)
+                if cloned:
+                    out.truncate(sess['size'])  # 확인과 복제 사이에 원본이 늘어났어도 업로드 크기로
+        except OSError as e:
+            print(f"[중복 제거 오류] {e}")
+            return jsonify({'error': str(e)}), 500
+        if missing:
+            if cloned:
+                sess['received'].clear()
+                sess['received_bytes'] = 0
+                _save_dedup_session(sess)
+            # 확인에 실패한 청크는 색인에 남아 있어도 다시 받음
+            failed = {chunks[i][2] for i in missing}
+            known = {digest: source for digest, source in index.locate(chunks[i][2] for i in pending).items()
+                     if digest not in failed}
+            missing = _dedup_missing(sess, known)
+            return jsonify({'error': '일부 청크의 원본이 바뀌었습니다', 'missing': missing}), 409
+        
+        try:
+            part_size = os.path.getsize(sess['part'])
+            if part_size != sess['size']:
+                raise OSError(f"부분 파일 크기가 다릅니다 ({part_size:,} / {sess['size']:,} bytes)")
+            os.replace(sess['part'], sess['path'])
+            if sess.get('mtime'):
+                os.utime(sess['path'], (sess['mtime'], sess['mtime']))
+            index.add_file(sess['path'], chunks)
+            index.record(sess['size'], sess['received_bytes'])
+        except (OSError, sqlite3.Error) as e:
+            print(f"[중복 제거 오류] {e}")
+            return jsonify({'error': str(e)}), 500
+        invalidate_listing(os.path.dirname(sess['path']))
+        _notify_search(sess['path'])
+        _drop_dedup_session(sess)
+    
+    saved = sess['size'] - sess['received_bytes']
+    print(f"[중복 제거] 완료: {os.path.basename(sess['path'])} - 받은 {sess['received_bytes']:,} bytes, "
+          f"재사용 {saved:,} bytes{' (reflink)' if cloned else ''}")
+    log_access(session.get('username', '알 수 없음'), '파일 업로드',
+              f"{os.path.basename(sess['path'])} (중복 제거 {saved:,} bytes) -> {sess.get('target_folder', '')}")
+    return jsonify({'success': True, 'path': sess['path'], 'size': sess['size'],
+                    'received_bytes': sess['received_bytes'], 'dedup_bytes': saved, 'reflink': bool(cloned)})
+
+@app.route('/api/dedup/<upload_id>', methods=['DELETE'])
+@login_required
+def dedup_abort(upload_id):
+    """중복 제거 업로드 취소 (부분 파일 삭제)"""
+    sess = _get_dedup_session(upload_id)
+    if not sess:
+        return jsonify({'error': '업로드 세션이 없습니다'}), 404
+    with _upload_lock(upload_id):
+        _drop_dedup_session(sess, remove_part=True)
+    return jsonify({'success': True})
+
+def file_sha256(path, st):
+    """파일 sha256 (같은 경로/크기/mtime이면 캐시 사용)"""
+    key = (path, st.st_size, st.st_mtime_ns)
+    with file_hash_lock:
+        digest = file_hash_cache.get(key)
+        if digest is not None:
+            file_hash_cache.move_to_end(key)
+            return digest
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(1024 * 1024)
+            if not data:
+                break
+            h.update(data)
+    digest = h.hexdigest()
+    with file_hash_lock:
+        file_hash_cache[key] = digest
+        while len(file_hash_cache) > FILE_HASH_CACHE_MAX:
+            file_hash_cache.popitem(last=False)
+    return digest
+
+def iter_manifest(folder_path, since=None, with_hash=False):
+    """폴더 전체를 훑으며 매니페스트 레코드 생성 (상대 경로는 '/' 구분, 링크 폴더는 따라가지 않음)"""
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        abs_dir = os.path.join(folder_path, rel_dir) if rel_dir else folder_path
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"[매니페스트] 폴더 읽기 실패 {abs_dir}: {e}")
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.name.endswith(UPLOAD_PART_SUFFIX):
+                continue
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                st = entry.stat()
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if not entry.is_symlink():
+                    subdirs.append(rel_path)
+                if since is None or st.st_mtime > since:
+                    yield {'type': 'dir', 'path': rel_path, 'mtime': st.st_mtime}
+                continue
+            if since is not None and st.st_mtime <= since:
+                continue
+            record = {'type': 'file', 'path': rel_path, 'size': st.st_size, 'mtime': st.st_mtime}
+            if with_hash:
+                try:
+                    record['sha256'] = file_sha256(entry.path, st)
+                except OSError:
+                    record['sha256'] = None
+            yield record
+        # 이름순으로 내보내도록 역순으로 쌓음
+        stack.extend(reversed(subdirs))
+
+@app.route('/api/manifest')
+@login_required
+def api_manifest():
+    """폴더 하위 전체 목록을 NDJSON으로 스트리밍 (?path=...&since=mtime&hash=sha256)
+    
+    한 줄에 레코드 하나: {"type": "file"|"dir", "path": 상대 경로, "size", "mtime", "sha256"}
+    마지막 줄 {"type": "end", "count": N, "time": 조회 시작 시각} 이 없으면 중간에 끊긴 것.
+    since는 mtime이 그보다 큰 항목만 (다음 증분 조회에는 end의 time을 사용).
+    Accept-Encoding에 gzip이 있으면 gzip으로 압축해서 보냄
+    """
+    folder_path = os.path.abspath(request.args.get('path', ''))
+    if not is_allowed_path(folder_path):
+        return jsonify({'error': 'Access denied'}), 403
+    if not os.path.isdir(folder_path):
+        return jsonify({'error': 'Folder not found'}), 404
+    since = request.args.get('since', type=float)
+    with_hash = request.args.get('hash', '').lower() == 'sha256'
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+    started = time.time()
+    
+    log_access(session.get('username', '알 수 없음'), '매니페스트 조회', os.path.basename(folder_path))
+    
+    def generate():
+        count = 0
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if use_gzip else None
+        pending = []
+        pending_size = 0
+        records = iter_manifest(folder_path, since, with_hash)
+        end = {'type': 'end', 'count': 0, 'time': started}
+        for record in itertools.chain(records, [end]):
+            if record is end:
+                end['count'] = count
+            else:
+                count += 1
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            pending.append(line)
+            pending_size += len(line)
+            if pending_size >= MANIFEST_FLUSH_BYTES or record is end:
+                data = b''.join(pending)
+                pending, pending_size = [], 0
+                if compressor is not None:
+                    data = compressor.compress(data) + compressor.flush(
+                        zlib.Z_FINISH if record is end else zlib.Z_SYNC_FLUSH)
+                yield data
+    
+    headers = {'Cache-Control': 'no-transform', 'X-Accel-Buffering': 'no'}
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson',
+                              headers=headers)
+
+def _get_zip_deflate_pool():
+    """폴더 ZIP 압축용 공용 스레드 풀 (처음 사용할 때 생성, 작업자 1개면 None)"""
+    global zip_deflate_pool
+    if ZIP_DEFLATE_WORKERS <= 1:
+        return None
+    with zip_deflate_pool_lock:
+        if zip_deflate_pool is None:
+            zip_deflate_pool = ThreadPoolExecutor(max_workers=ZIP_DEFLATE_WORKERS,
+                                                  thread_name_prefix='zip-deflate')
+            print(f"[폴더 다운로드] 압축 스레드 {ZIP_DEFLATE_WORKERS}개")
+        return zip_deflate_pool
+
+def _ensure_archive_cache():
+    """폴더 ZIP 캐시 (꺼져 있거나 캐시 폴더를 만들 수 없으면 None)"""
+    global archive_cache_store
+    if ARCHIVE_CACHE_MAX_BYTES <= 0:
+        return None
+    with archive_cache_lock:
+        if archive_cache_store is None:
+            try:
+                archive_cache_store = archive_cache.ArchiveCache(ARCHIVE_CACHE_DIR, ARCHIVE_CACHE_MAX_BYTES)
+            except OSError as e:
+                print(f"[폴더 다운로드] ZIP 캐시 폴더를 만들 수 없습니다: {e}")
+                return None
+        return archive_cache_store
+
 @app.route('/download_folder')
 @login_required
 def download_folder():
-    """폴더를 ZIP으로 다운로드 (스트리밍 최적화)"""
-    import zipfile
-    import tempfile
-    
+    """폴더를 ZIP으로 다운로드 (임시 파일 없이 스트리밍)"""
     folder_path = os.path.abspath(request.args.get('path', ''))
     comp_q = (request.args.get('comp', '') or request.args.get('compression', '')).strip().lower()
     # 기본: 비압축(가장 빠름). comp=deflate일 때만 압축
     if comp_q in ('deflate', 'zip_deflated', '1', 'true', 'yes'):
-        zip_mode = zipfile.ZIP_DEFLATED
-        z_kwargs = {'compresslevel': 1}
+        zip_mode = zip_stream.ZIP_DEFLATED
     else:
-        zip_mode = zipfile.ZIP_STORED
-        z_kwargs = {}
+        zip_mode = zip_stream.ZIP_STORED
     if not is_allowed_path(folder_path):
         abort(403)
     if not os.path.isdir(folder_path):
@@ -448,66 +1989,107 @@ def download_folder():
     print(f"\n[폴더 다운로드] 시작: {folder_name}")
     print(f"[폴더 다운로드] 경로: {folder_path}")
     
-    # 임시 파일 경로 준비 및 ZIP 생성
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp:
-        tmp_path = tmp.name
+    headers = {}
+    status = 200
+    byte_range = None
+    # 폴더 스냅샷 (stat만 하는 사전 순회): 정렬된 순서라 같은 스냅샷이면 아카이브가 바이트 단위로 동일
+    entries = list(zip_stream.iter_folder_entries(folder_path, skip_suffix=UPLOAD_PART_SUFFIX))
+    etag = f'"{zip_stream.manifest_etag(entries, zip_mode)}"'
+    if zip_mode == zip_stream.ZIP_STORED:
+        # 비압축 모드: 배치를 고정해 최종 크기를 미리 계산 (Content-Length, 이어받기 가능)
+        writer = zip_stream.ZipStreamWriter(zip_mode, fixed_layout=True)
+        total_size = writer.archive_size(entries)
+        size_hint = total_size
+    else:
+        # 블록 압축은 공용 풀에서 병렬로, 기록은 한 스레드에서 순서대로
+        writer = zip_stream.ZipStreamWriter(zip_mode, compresslevel=1, executor=_get_zip_deflate_pool(),
+                                            workers=ZIP_DEFLATE_PER_REQUEST)
+        total_size = None
+        size_hint = sum(entry.size for entry in entries)
     
-    try:
-        file_count = 0
-        print(f"[폴더 다운로드] ZIP 압축 시작...")
-        with zipfile.ZipFile(tmp_path, 'w', zip_mode, allowZip64=True, **z_kwargs) as zf:
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, folder_path)
-                    try:
-                        zf.write(file_path, arcname)
-                        file_count += 1
-                        if file_count % 100 == 0:
-                            print(f"[폴더 다운로드] 압축 중... {file_count}개 파일 처리됨")
-                    except Exception as e:
-                        print(f"[오류] 파일 추가 실패 {file_path}: {e}")
-        
-        total_size = os.path.getsize(tmp_path)
-        print(f"[폴더 다운로드] ZIP 압축 완료: {file_count}개 파일, {total_size:,} bytes")
-        log_access(session.get('username', '알 수 없음'), '폴더 다운로드 준비완료', f"{folder_name} ({file_count}개 파일)")
+    # 캐시: 같은 스냅샷을 누가 이미 받았으면 만든 ZIP을 그대로, 만드는 중이면 따라 읽음
+    # (비압축 ZIP은 원본을 바로 읽는 것과 같으므로 설정으로 켰을 때만)
+    cache = _ensure_archive_cache() if zip_mode == zip_stream.ZIP_DEFLATED or ARCHIVE_CACHE_STORED else None
+    key = archive_cache.archive_key(folder_path, etag)
+    archive = cache.lookup(key) if cache is not None else None
+    if archive is not None and archive.done:
+        total_size = archive.size  # 압축 모드도 완성된 캐시가 있으면 크기/이어받기 제공
+        print(f"[폴더 다운로드] 캐시 사용: {total_size:,} bytes")
+    
+    if total_size is not None:
+        headers['ETag'] = etag
+        headers['Accept-Ranges'] = 'bytes'
+        print(f"[폴더 다운로드] {len(entries)}개 파일, 예상 크기 {total_size:,} bytes")
         
-    except Exception as e:
-        print(f"[오류] ZIP 압축 실패: {e}")
-        log_access(session.get('username', '알 수 없음'), '폴더 다운로드 실패', f"{folder_name} - {str(e)}")
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except:
-            pass
-        raise
-
+        # Range 요청: If-Range가 없거나 현재 ETag와 같을 때만 부분 전송
+        rng = request.range
+        if_range = request.headers.get('If-Range')
+        if rng is not None and len(rng.ranges) == 1 and (if_range is None or if_range.strip() == etag):
+            byte_range = rng.range_for_length(total_size)
+            if byte_range is None:
+                return app.response_class('', status=416,
+                                          headers={'Content-Range': f'bytes */{total_size}'})
+        if byte_range:
+            start, stop = byte_range
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{stop - 1}/{total_size}'
+            headers['Content-Length'] = str(stop - start)
+            print(f"[폴더 다운로드] 이어받기: {start:,} ~ {stop - 1:,} bytes")
+            log_access(session.get('username', '알 수 없음'), '폴더 다운로드 이어받기',
+                       f"{folder_name} ({start:,} bytes부터)")
+        else:
+            start, stop = 0, total_size
+            headers['Content-Length'] = str(total_size)
+    else:
+        # 압축 모드는 최종 크기를 알 수 없으므로 만들면서 전송 (chunked, 이어받기 불가)
+        headers['Accept-Ranges'] = 'none'
+        start, stop = 0, None
+    
+    if archive is not None and not archive.done and start > 0:
+        archive = None  # 이어받기는 만드는 중인 캐시를 기다리지 않고 해당 구간만 바로 생성
+    elif archive is not None:
+        cache.use(archive)
+    elif cache is not None and start == 0:
+        # 처음부터 받는 요청이면 캐시에 저장하면서 전송 (같은 ZIP을 동시에 받는 요청은 이 작업을 따라 읽음)
+        archive = cache.get(key, lambda: writer.stream(entries), size_hint)
+    if archive is not None:
+        chunks = archive.iter_range(start, stop)
+    elif byte_range:
+        chunks = writer.stream_range(entries, start, stop)
+    else:
+        chunks = writer.stream(entries)
+    
     def generate_zip():
+        # 폴더를 순회하면서 로컬 헤더/데이터/디스크립터를 즉시 전송
+        sent = 0
         try:
-            with open(tmp_path, 'rb') as f:
-                while True:
-                    chunk = f.read(4*1024*1024)
-                    if not chunk:
-                        break
-                    yield chunk
-        finally:
-            try:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-            except:
-                pass
+            for chunk in chunks:
+                sent += len(chunk)
+                yield chunk
+            print(f"[폴더 다운로드] 전송 완료: {folder_name}, {sent:,} bytes")
+            log_access(session.get('username', '알 수 없음'), '폴더 다운로드 완료',
+                       f"{folder_name} ({sent:,} bytes)")
+        except GeneratorExit:
+            print(f"[폴더 다운로드] 전송 중단: {folder_name} ({sent:,} bytes 전송됨)")
+            raise
+        except Exception as e:
+            print(f"[오류] ZIP 스트리밍 실패: {e}")
+            log_access(session.get('username', '알 수 없음'), '폴더 다운로드 실패', f"{folder_name} - {str(e)}")
+            raise
 
     safe_name = secure_filename(folder_name) or "folder"
     utf8_name = quote(f"{folder_name}.zip")
     content_disposition = f"attachment; filename=\"{safe_name}.zip\"; filename*=UTF-8''{utf8_name}"
+    headers.update({
+        'Content-Disposition': content_disposition,
+        'Content-Type': 'application/zip',
+        'Cache-Control': 'no-transform'
+    })
     response = app.response_class(
-        generate_zip(),
+        stream_with_context(generate_zip()),
+        status=status,
         mimetype='application/zip',
-        headers={
-            'Content-Disposition': content_disposition,
-            'Content-Type': 'application/zip',
-            'Content-Length': str(total_size)
-        }
+        headers=headers
     )
     return response
 
@@ -624,6 +2206,7 @@ except Exception:
 
 def main():
     """서버 시작"""
+    global SERVER_ENGINE
     import socket
     def _port_in_use(host: str, port: int) -> bool:
         try:
@@ -712,8 +2295,17 @@ def main():
     print("\n종료하려면 Ctrl+C 를 누르세요.")
     print("=" * 60)
     
+    if '--asgi' in sys.argv:
+        SERVER_ENGINE = 'asgi'
+    
     # 서버 실행
     try:
+        if SERVER_ENGINE == 'asgi':
+            import asgi_server
+            print("[INFO] Starting server with uvicorn (ASGI)...")
+            if asgi_server.serve(app, host='0.0.0.0', port=5000):
+                return
+            print('[INFO] Falling back to waitress...')
         if getattr(sys, 'frozen', False):
             # PyInstaller 실행 파일 환경: waitress로 서비스
             try:
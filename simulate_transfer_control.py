@@ -0,0 +1,112 @@
+"""
+전송 제어기(transfer_control.AimdController) 모의 회선 확인
+실제 서버 없이 회선 모델에 연결 수를 넣어 처리량/RTT/오류를 만들고 update()로 조정되는 과정을 봅니다.
+    python simulate_transfer_control.py              # 기본 시나리오 (LAN, 터널, 혼잡한 터널, 대역 감소)
+    python simulate_transfer_control.py --verbose    # 구간별 연결 수/구간 크기 출력
+
+회선 모델
+- 연결 하나는 per_conn bytes/s까지 (TCP 창/RTT 한계), 합계는 capacity를 넘지 못함
+- capacity를 넘게 보내면 넘친 만큼 회선 큐가 쌓여 RTT가 늘어남
+- 큐가 buffer_ratio를 넘으면 그 비율만큼 요청이 실패 (재시도 = observe_error)
+"""
+import argparse
+import random
+import sys
+
+import transfer_control
+
+MB = 1024 * 1024
+
+
+class SimulatedLink:
+    """연결 수 → (처리량, RTT, 실패한 요청 수)"""
+    def __init__(self, capacity, per_conn, base_rtt, buffer_ratio=0.5, seed=1):
+        self.capacity = capacity
+        self.per_conn = per_conn
+        self.base_rtt = base_rtt
+        self.buffer_ratio = buffer_ratio
+        self.random = random.Random(seed)
+
+    def step(self, connections):
+        offered = connections * self.per_conn
+        goodput = min(offered, self.capacity)
+        overload = max(0.0, offered / self.capacity - 1)
+        rtt = self.base_rtt * (1 + 3 * overload) * self.random.uniform(0.95, 1.05)
+        errors = 0
+        if overload > self.buffer_ratio:
+            errors = sum(1 for _ in range(connections) if self.random.random() < overload - self.buffer_ratio)
+        return goodput, rtt, errors
+
+
+def simulate(link, ticks, start=3, max_connections=16, schedule=None, verbose=False):
+    """ticks번 조정 → 구간별 (연결 수, 처리량/용량 비율, 오류 수) 목록
+
+    schedule: {구간 번호: 새 capacity} (중간에 회선 대역이 바뀌는 경우)
+    """
+    controller = transfer_control.AimdController(connections=start, max_connections=max_connections)
+    history = []
+    ratios = []
+    failures = []
+    for tick in range(ticks):
+        if schedule and tick in schedule:
+            link.capacity = schedule[tick]
+        goodput, rtt, errors = link.step(controller.connections)
+        history.append(controller.connections)
+        ratios.append(goodput / link.capacity)
+        failures.append(errors)
+        controller.observe_rtt(rtt)
+        for _ in range(errors):
+            controller.observe_error()
+        # 큰 파일 여러 개를 받는 상황: 연결을 더 쓸 수 있음
+        controller.update(goodput, saturated=True)
+        if verbose:
+            print(f"  {tick:>3} | 연결 {history[-1]:>2} | 구간 {controller.segment_size // MB:>2} MB | "
+                  f"{goodput / MB:>7.1f} MB/s | RTT {rtt * 1000:>6.1f} ms | 오류 {errors}")
+    return history, ratios, failures
+
+
+def check(name, ok, detail):
+    print(f"{'통과' if ok else '실패'} | {name}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전송 제어기 모의 회선 확인")
+    parser.add_argument('--ticks', type=int, default=60, help="시나리오별 조정 횟수")
+    parser.add_argument('--verbose', action='store_true', help="구간별 값 출력")
+    args = parser.parse_args()
+    half = args.ticks // 2
+    results = []
+
+    # LAN: 연결 하나로는 대역을 못 채움 → 용량/연결당 속도(약 9)까지 늘어나야 함
+    history, ratios, _ = simulate(SimulatedLink(110 * MB, 12 * MB, 0.001), args.ticks, verbose=args.verbose)
+    results.append(check("LAN", min(history[half:]) >= 8 and min(ratios[half:]) >= 0.85,
+                         f"연결 {history[0]} → {history[-1]}, 후반 최저 이용률 {min(ratios[half:]):.0%}"))
+
+    # 터널: 연결 두 개면 가득 참 → 시작값 6에서 줄어들어 2~3 근처에 머물러야 함
+    history, ratios, failures = simulate(SimulatedLink(2 * MB, 1 * MB, 0.08), args.ticks, start=6,
+                                         verbose=args.verbose)
+    average = sum(ratios[half:]) / len(ratios[half:])
+    results.append(check("터널", max(history[half:]) <= 4 and average >= 0.8,
+                         f"연결 {history[0]} → {history[-1]}, 후반 최대 {max(history[half:])}, "
+                         f"후반 평균 이용률 {average:.0%}, 오류 {sum(failures)}"))
+
+    # 혼잡한 터널: 큐 여유가 거의 없어 넘치면 바로 실패 → 줄어든 뒤에는 오류가 드물어야 함
+    history, ratios, failures = simulate(SimulatedLink(1 * MB, 0.5 * MB, 0.15, buffer_ratio=0.1), args.ticks,
+                                         start=8, verbose=args.verbose)
+    late = sum(1 for errors in failures[half:] if errors)
+    results.append(check("혼잡한 터널", max(history[half:]) <= 4 and late <= len(failures[half:]) // 4,
+                         f"연결 {history[0]} → {history[-1]}, 후반 최대 {max(history[half:])}, "
+                         f"오류 {sum(failures)} (후반에 오류가 난 구간 {late}/{len(failures[half:])})"))
+
+    # 대역 감소: 중간에 50 MB/s → 5 MB/s 로 줄면 연결 수도 따라 줄어야 함
+    history, ratios, _ = simulate(SimulatedLink(50 * MB, 5 * MB, 0.02), args.ticks,
+                                  schedule={half: 5 * MB}, verbose=args.verbose)
+    results.append(check("대역 감소", history[half - 1] >= 8 and history[-1] <= 3,
+                         f"감소 전 {history[half - 1]}, 마지막 {history[-1]}"))
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+"""
+전송 스케줄러 (업로드/다운로드 공용)
+클라이언트의 모든 전송 작업을 한 곳에서 큐에 넣고 정해진 수만큼만 동시에 시작합니다.
+Qt에 의존하지 않으므로 (시작은 콜백, 시간은 인자로 받음) 단독으로 돌려 볼 수 있습니다.
+
+- 우선순위: 사용자가 고정(pin)한 작업 → 작은 파일 먼저
+  (큰 파일이 계속 밀리지 않도록 FIFO_EVERY번에 한 번은 가장 오래 기다린 작업)
+- 업로드/다운로드 공정 분배: 대기 작업이 있는 쪽 중 진행 중인 작업이 적은 쪽부터
+- 전체 연결 수(예산)와 구간 크기는 AimdController가 처리량/오류/RTT로 조정
+  (tick/observe_rtt/observe_error). 예산은 진행 중인 작업들의 ConnectionGrant로 나눠 줌
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+UPLOAD = 'upload'
+DOWNLOAD = 'download'
+KINDS = (UPLOAD, DOWNLOAD)
+
+FIFO_EVERY = 4  # 이 횟수마다 한 번은 크기와 상관없이 가장 오래 기다린 작업
+
+# AIMD 조정: 혼잡이 없으면 조금씩 늘리고 혼잡 신호(재시도, RTT 증가)가 오면 절반으로
+DECREASE = 0.5
+GAIN_MIN = 0.05  # 연결 수를 올린 뒤 처리량이 이만큼 늘지 않으면 하나 되돌림
+RTT_INFLATION = 2.0  # RTT가 최소 RTT의 이 배수를 넘으면 (회선 큐가 쌓임) 혼잡으로 봄
+HOLD_TICKS = 3  # 줄인 뒤 이 횟수만큼은 그대로 둠 (같은 혼잡으로 여러 번 줄이지 않도록)
+RTT_SMOOTHING = 0.3
+
+# 구간 크기: 분할 다운로드 구간 / 업로드 청크 (재시도할 때 다시 보내는 단위)
+SEGMENT_MIN = 1024 * 1024
+SEGMENT_MAX = 64 * 1024 * 1024
+SEGMENT_STEP = 2 * 1024 * 1024
+SEGMENT_DEFAULT = 8 * 1024 * 1024
+
+
+class AimdController:
+    """전체 연결 수(모든 전송이 함께 쓰는 예산)와 구간 크기 조정 (AIMD)
+    
+    update()를 주기적으로 호출하면 지난 구간의 처리량과 그 사이 들어온
+    오류(observe_error)/RTT(observe_rtt)로 값을 바꿈. 시각이나 회선에 의존하지 않으므로
+    측정값만 넣어 단독으로 돌려 볼 수 있음 (모의 회선: simulate_transfer_control.py)
+    - 혼잡(재시도 발생, RTT가 최소의 RTT_INFLATION배 초과): 둘 다 DECREASE배
+    - 혼잡 없음: 구간 크기 +SEGMENT_STEP, 연결이 더 필요하면 연결 수 +1
+      (올렸는데 처리량이 늘지 않으면 하나 되돌리고 잠시 유지)
+    """
+    def __init__(self, connections=3, min_connections=1, max_connections=8,
+                 segment_size=SEGMENT_DEFAULT, min_segment=SEGMENT_MIN, max_segment=SEGMENT_MAX):
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.min_segment = min_segment
+        self.max_segment = max_segment
+        self.connections = max(min_connections, min(max_connections, connections))
+        self.segment_size = max(min_segment, min(max_segment, segment_size))
+        self._lock = threading.Lock()
+        self._errors = 0
+        self._prev_goodput = None
+        self._raised = False
+        self._hold = 0
+        self.goodput = 0.0  # 최근 구간 처리량 (bytes/s)
+        self.rtt = None
+        self.base_rtt = None
+        self.congestion = 0  # 혼잡으로 줄인 횟수
+    
+    def observe_rtt(self, rtt):
+        """왕복 시간 측정값 반영 (초)"""
+        with self._lock:
+            self.rtt = rtt if self.rtt is None else self.rtt + RTT_SMOOTHING * (rtt - self.rtt)
+            if self.base_rtt is None or rtt < self.base_rtt:
+                self.base_rtt = rtt
+    
+    def observe_error(self):
+        """전송 오류/재시도 한 번 (전송 스레드에서 호출)"""
+        with self._lock:
+            self._errors += 1
+    
+    def update(self, goodput, saturated):
+        """한 구간의 처리량(bytes/s)으로 조정. saturated: 예산을 다 쓰고 있고 연결을 더 쓸 수 있음"""
+        with self._lock:
+            errors, self._errors = self._errors, 0
+            prev, self._prev_goodput = self._prev_goodput, goodput
+            self.goodput = goodput
+            inflated = (self.rtt is not None and self.base_rtt
+                        and self.rtt > self.base_rtt * RTT_INFLATION)
+            if (errors or inflated) and not self._hold:
+                self.connections = max(self.min_connections, int(self.connections * DECREASE))
+                self.segment_size = max(self.min_segment, int(self.segment_size * DECREASE))
+                self.congestion += 1
+                self._raised = False
+                self._hold = HOLD_TICKS
+                return
+            if self._hold:
+                self._hold -= 1
+                return
+            if goodput > 0:
+                self.segment_size = min(self.max_segment, self.segment_size + SEGMENT_STEP)
+            if not saturated:
+                self._raised = False
+                return
+            if self._raised and prev is not None and goodput < prev * (1 + GAIN_MIN):
+                # 올렸는데 처리량이 늘지 않음 → 되돌리고 잠시 유지
+                self.connections = max(self.min_connections, self.connections - 1)
+                self._raised = False
+                self._hold = HOLD_TICKS
+                return
+            raised = min(self.max_connections, self.connections + 1)
+            self._raised = raised != self.connections
+            self.connections = raised
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'connections': self.connections,
+                'segment_size': self.segment_size,
+                'goodput': self.goodput,
+                'rtt': self.rtt,
+                'base_rtt': self.base_rtt,
+                'congestion': self.congestion
+            }
+
+
+class ConnectionGrant:
+    """작업 하나가 동시에 열 수 있는 연결 수
+    
+    전송 스레드의 작업자는 요청마다 acquire/release. 스케줄러가 전체 예산을 나눌 때
+    limit을 바꾸면 진행 중인 요청이 끝나는 대로 반영됨 (구간 크기가 반영 단위)
+    """
+    def __init__(self, limit=1):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._cond = threading.Condition()
+    
+    def set_limit(self, limit):
+        with self._cond:
+            self.limit = max(1, limit)
+            self._cond.notify_all()
+    
+    def acquire(self, stop=None):
+        """연결 하나 확보 (자리가 날 때까지 대기, stop이 설정되면 False)"""
+        with self._cond:
+            while self.active >= self.limit:
+                if stop is not None and stop.is_set():
+                    return False
+                self._cond.wait(0.2)
+            self.active += 1
+            return True
+    
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class TransferJob:
+    """스케줄러에 넣은 작업 하나 (task는 UploadTask/DownloadTask 등 호출한 쪽 객체)"""
+    def __init__(self, kind, task, size, seq, pinned=False, max_connections=1):
+        self.kind = kind
+        self.task = task
+        self.size = size  # 모르면 None (알려진 크기 뒤로)
+        self.seq = seq
+        self.pinned = pinned
+        self.max_connections = max(1, max_connections)  # 이 작업이 나눠 쓸 수 있는 최대 연결 수
+        self.grant = ConnectionGrant(1)
+        self.state = 'queued'  # queued → running → done / cancelled
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        self.counted = 0  # 처리량에 반영한 전송 바이트
+
+    def sort_key(self):
+        return (self.size is None, self.size or 0, self.seq)
+
+
+class TransferScheduler:
+    """전체 연결 예산 안에서 우선순위대로 작업을 시작하고 연결을 나눠 줌
+
+    작업마다 연결이 최소 하나 필요하므로 동시 작업 수도 예산 이하.
+    남는 연결은 여러 연결을 쓸 수 있는 작업(큰 파일)에 고르게 나눔 (job.grant)
+    start(job): 작업을 실제로 시작하는 콜백 (pump를 호출한 스레드에서 호출, 잠금 밖)
+    progress_of(job): 지금까지 전송한 바이트 (처리량 측정용, 없으면 측정하지 않음)
+    controller: 예산을 정하는 AimdController (없으면 기본값으로 생성)
+    """
+    def __init__(self, start, progress_of=None, controller=None):
+        self._start = start
+        self._progress_of = progress_of
+        self.controller = controller or AimdController()
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+        self._jobs = {}  # id(task) → TransferJob (대기/진행 중)
+        self._pinned = deque()
+        self._by_size = {kind: [] for kind in KINDS}  # (정렬 키, job) 힙
+        self._by_age = {kind: deque() for kind in KINDS}
+        self._picks = {kind: 0 for kind in KINDS}
+        self._running = {kind: 0 for kind in KINDS}
+        # 처리량 측정
+        self._bytes = 0
+        self._tick_at = None
+    
+    @property
+    def limit(self):
+        """전체 연결 수 예산"""
+        return self.controller.connections
+
+    # 작업 관리
+
+    def submit(self, kind, task, size=None, pinned=False, max_connections=1):
+        """작업 등록 후 자리가 있으면 바로 시작 (max_connections: 작업 하나가 쓸 수 있는 최대 연결 수)"""
+        with self._lock:
+            job = TransferJob(kind, task, size, next(self._seq), pinned, max_connections)
+            self._jobs[id(task)] = job
+            if pinned:
+                self._pinned.append(job)
+            heapq.heappush(self._by_size[kind], (job.sort_key(), job))
+            self._by_age[kind].append(job)
+        self.pump()
+        return job
+
+    def pin(self, task):
+        """대기 중인 작업을 맨 앞으로 (이미 시작했으면 False)"""
+        with self._lock:
+            job = self._jobs.get(id(task))
+            if job is None or job.state != 'queued':
+                return False
+            if not job.pinned:
+                job.pinned = True
+                self._pinned.append(job)
+        self.pump()
+        return True
+
+    def cancel(self, task):
+        """대기 중인 작업을 큐에서 뺌 (이미 시작한 작업이면 False → 호출한 쪽에서 중단)"""
+        with self._lock:
+            job = self._jobs.get(id(task))
+            if job is None or job.state != 'queued':
+                return False
+            job.state = 'cancelled'
+            del self._jobs[id(task)]
+            return True
+
+    def done(self, task):
+        """진행 중이던 작업이 끝남 (성공/실패/취소 모두) → 다음 작업 시작"""
+        with self._lock:
+            job = self._jobs.pop(id(task), None)
+            if job is None:
+                return
+            if job.state == 'running':
+                self._count_progress(job)
+                self._running[job.kind] -= 1
+                job.state = 'done'
+            else:
+                job.state = 'cancelled'
+        self.pump()
+
+    def is_queued(self, task):
+        with self._lock:
+            job = self._jobs.get(id(task))
+            return job is not None and job.state == 'queued'
+
+    def pump(self):
+        """상한까지 대기 작업 시작"""
+        started = []
+        with self._lock:
+            while sum(self._running.values()) < self.limit:
+                job = self._next_job()
+                if job is None:
+                    break
+                job.state = 'running'
+                job.started_at = time.monotonic()
+                if self._progress_of is not None:
+                    job.counted = self._progress_of(job)
+                self._running[job.kind] += 1
+                started.append(job)
+            self._rebalance()
+        for job in started:
+            self._start(job)
+
+    def _rebalance(self):
+        """예산을 진행 중인 작업에 나눔: 하나씩 준 뒤 남는 연결을 더 쓸 수 있는 작업에 차례로
+        
+        예산이 줄어 작업 수보다 작아지면 작업마다 하나씩만 (끝나는 대로 예산 안으로 돌아옴)
+        """
+        running = [job for job in self._jobs.values() if job.state == 'running']
+        shares = {id(job): 1 for job in running}
+        left = self.limit - len(running)
+        while left > 0:
+            hungry = [job for job in running if shares[id(job)] < job.max_connections]
+            if not hungry:
+                break
+            for job in hungry[:left]:
+                shares[id(job)] += 1
+            left -= min(left, len(hungry))
+        for job in running:
+            job.grant.set_limit(shares[id(job)])
+
+    def _demand(self):
+        """진행 중인 작업이 쓸 수 있는 연결 수 + 대기 작업 수"""
+        return sum(job.max_connections if job.state == 'running' else 1
+                   for job in self._jobs.values())
+
+    def _next_job(self):
+        while self._pinned:
+            job = self._pinned.popleft()
+            if job.state == 'queued':
+                return job
+        kinds = [kind for kind in KINDS if self._has_queued(kind)]
+        if not kinds:
+            return None
+        # 진행 중인 작업이 적은 쪽 (같으면 대기 작업이 먼저 들어온 쪽)
+        kind = min(kinds, key=lambda k: (self._running[k], self._oldest(k).seq))
+        self._picks[kind] += 1
+        if self._picks[kind] % FIFO_EVERY == 0:
+            return self._oldest(kind)
+        return heapq.heappop(self._by_size[kind])[1]
+
+    def _has_queued(self, kind):
+        heap = self._by_size[kind]
+        while heap and heap[0][1].state != 'queued':
+            heapq.heappop(heap)
+        return bool(heap)
+
+    def _oldest(self, kind):
+        ages = self._by_age[kind]
+        while ages and ages[0].state != 'queued':
+            ages.popleft()
+        return ages[0]
+
+    # 처리량 측정과 상한 조정
+
+    def _count_progress(self, job):
+        if self._progress_of is None:
+            return
+        current = self._progress_of(job)
+        self._bytes += max(0, current - job.counted)
+        job.counted = current
+
+    def tick(self, now=None):
+        """주기적으로 호출: 지난 구간의 처리량을 재고 상한 조정 → 처리량 (bytes/s)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state == 'running':
+                    self._count_progress(job)
+            if self._tick_at is None or now <= self._tick_at:
+                self._tick_at = now
+                self._bytes = 0
+                return self.controller.goodput
+            goodput = self._bytes / (now - self._tick_at)
+            self._tick_at = now
+            self._bytes = 0
+            saturated = self._demand() > self.limit
+            self.controller.update(goodput, saturated)
+        self.pump()
+        return goodput
+
+    def stats(self):
+        with self._lock:
+            queued = {kind: 0 for kind in KINDS}
+            for job in self._jobs.values():
+                if job.state == 'queued':
+                    queued[job.kind] += 1
+            stats = {'running': dict(self._running), 'queued': queued,
+                     'active_connections': sum(job.grant.active for job in self._jobs.values())}
+        stats.update(self.controller.stats())
+        return stats
@@ -125,11 +125,12 @@ class ServerThread(QThread):
     tunnel_created = pyqtSignal(str)  # 터널 URL
     error_occurred = pyqtSignal(str)  # 에러 메시지
     
-    def __init__(self, users, shared_folders, tunnel_manager):
+    def __init__(self, users, shared_folders, tunnel_manager, engine='waitress'):
         super().__init__()
         self.users = users
         self.shared_folders = shared_folders
         self.tunnel_manager = tunnel_manager
+        self.engine = engine  # 'waitress' 또는 'asgi'(uvicorn 필요)
     
     def run(self):
         try:
@@ -154,6 +155,10 @@ class ServerThread(QThread):
             # Flask 서버를 별도 스레드에서 시작
             def run_flask():
                 try:
+                    if self.engine == 'asgi':
+                        import asgi_server
+                        if asgi_server.serve(server_module.app, host='127.0.0.1', port=5000):
+                            return
                     if getattr(sys, 'frozen', False):
                         try:
                             from waitress import serve
@@ -244,6 +249,7 @@ class UnifiedFileShareServer(QMainWindow):
         
         self.shared_folders = []
         self.users = {}
+        self.engine = 'waitress'
         self.server_thread = None
         self.server_running = False
         
@@ -275,6 +281,7 @@ class UnifiedFileShareServer(QMainWindow):
                     config = json.load(f)
                     self.users = config.get('users', {})
                     self.shared_folders = config.get('shared_folders', [])
+                    self.engine = config.get('engine', 'waitress')
         except Exception as e:
             print(f"설정 불러오기 실패: {e}")
     
@@ -283,7 +290,8 @@ class UnifiedFileShareServer(QMainWindow):
         try:
             config = {
                 'users': self.users,
-                'shared_folders': self.shared_folders
+                'shared_folders': self.shared_folders,
+                'engine': self.engine
             }
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
@@ -482,7 +490,7 @@ class UnifiedFileShareServer(QMainWindow):
         self.status_label.setStyleSheet("color: orange;")
         
         # 서버 시작 스레드
-        self.server_thread = ServerThread(self.users, self.shared_folders, self.tunnel_manager)
+        self.server_thread = ServerThread(self.users, self.shared_folders, self.tunnel_manager, self.engine)
         self.server_thread.status_update.connect(self.on_status_update)
         self.server_thread.tunnel_created.connect(self.on_tunnel_created)
         self.server_thread.error_occurred.connect(self.on_error)
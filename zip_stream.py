@@ -0,0 +1,526 @@
+"""
+스트리밍 ZIP64 생성기
+임시 파일 없이 폴더를 순회하면서 ZIP 바이트를 바로 내보냅니다.
+(로컬 헤더 → 파일 데이터 → 데이터 디스크립터 → 중앙 디렉터리)
+"""
+import contextlib
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+# DEFLATE는 압축 후 크기를 미리 알 수 없으므로 여유를 두고 ZIP64로 기록
+ZIP64_DEFLATE_THRESHOLD = 0xFF000000
+
+CHUNK_SIZE = 1024 * 1024  # 1MB 단위로 읽고 내보냄
+
+# 병렬 DEFLATE (pigz 방식): 파일을 블록으로 나눠 스레드 풀에서 따로 압축하고 순서대로 이어 붙임
+# 블록마다 앞 블록의 마지막 32KB를 사전으로 주므로 압축률 손해는 거의 없음
+DEFLATE_DICT_SIZE = 32 * 1024
+PARALLEL_PENDING_PER_WORKER = 2  # 작업자당 미리 읽어 두는 블록 수 (메모리 상한)
+
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+SIG_LOCAL_HEADER = 0x04034b50
+SIG_DATA_DESCRIPTOR = 0x08074b50
+SIG_CENTRAL_DIR = 0x02014b50
+SIG_ZIP64_END = 0x06064b50
+SIG_ZIP64_LOCATOR = 0x07064b50
+SIG_END = 0x06054b50
+
+
+def dos_datetime(mtime):
+    """수정 시각을 ZIP(DOS) 날짜/시간 필드로 변환"""
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1  # 1980-01-01 00:00
+    dostime = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dosdate = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dostime, dosdate
+
+
+class ZipEntry:
+    """아카이브에 들어갈 파일 하나"""
+    def __init__(self, path, arcname, size, mtime):
+        self.path = path
+        self.arcname = arcname.replace(os.sep, '/')
+        self.name_bytes = self.arcname.encode('utf-8', 'replace')
+        self.size = size
+        self.mtime = mtime
+        self.crc = 0
+        self.compress_size = 0
+        self.header_offset = 0
+        self.method = ZIP_STORED
+        self.zip64 = False
+
+
+def iter_folder_entries(folder_path, skip_suffix=None):
+    """os.walk로 폴더를 순회하며 ZipEntry를 하나씩 생성 (stat만 수행)
+
+    같은 폴더 상태면 항상 같은 순서가 되도록 디렉터리/파일 이름을 정렬합니다.
+    skip_suffix로 끝나는 파일(업로드 중인 부분 파일)은 넣지 않습니다.
+    """
+    for root, dirs, files in os.walk(folder_path):
+        dirs.sort()
+        for file in sorted(files):
+            if skip_suffix and file.endswith(skip_suffix):
+                continue
+            file_path = os.path.join(root, file)
+            try:
+                st = os.stat(file_path)
+            except OSError as e:
+                print(f"[오류] 파일 정보 확인 실패 {file_path}: {e}")
+                continue
+            arcname = os.path.relpath(file_path, folder_path)
+            yield ZipEntry(file_path, arcname, st.st_size, st.st_mtime)
+
+
+def manifest_etag(entries, compression):
+    """폴더 스냅샷(경로, 크기, 수정 시각)과 압축 방식으로 ETag 생성
+
+    배치가 결정적이므로 같은 ETag면 아카이브의 모든 바이트가 같습니다.
+    """
+    h = hashlib.sha1()
+    h.update(f"zip-stream-v1:{compression}\n".encode())
+    for entry in entries:
+        h.update(entry.name_bytes)
+        h.update(f"\0{entry.size}\0{entry.mtime!r}\n".encode())
+    return h.hexdigest()
+
+
+# 이어받기 시 이미 보낸 파일의 CRC를 다시 읽지 않도록 (경로, 크기, 수정 시각)별로 보관
+CRC_CACHE_MAX = 200000
+_crc_cache = OrderedDict()
+_crc_lock = threading.Lock()
+
+
+def _crc_key(entry):
+    return (entry.path, entry.size, entry.mtime)
+
+
+def _remember_crc(entry, crc):
+    with _crc_lock:
+        _crc_cache[_crc_key(entry)] = crc
+        _crc_cache.move_to_end(_crc_key(entry))
+        while len(_crc_cache) > CRC_CACHE_MAX:
+            _crc_cache.popitem(last=False)
+
+
+def _cached_crc(entry):
+    with _crc_lock:
+        crc = _crc_cache.get(_crc_key(entry))
+        if crc is not None:
+            _crc_cache.move_to_end(_crc_key(entry))
+        return crc
+
+
+def _deflate_block(data, level, zdict, last):
+    """블록 하나를 raw DEFLATE로 압축
+
+    마지막 블록이 아니면 Z_SYNC_FLUSH로 바이트 경계에서 끝내므로 결과를 그대로 이어 붙이면
+    하나의 DEFLATE 스트림이 됨. zlib은 압축 중 GIL을 놓으므로 스레드로도 코어를 나눠 씀
+    """
+    if zdict:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    out = c.compress(data)
+    return out + c.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ZipStreamWriter:
+    """ZIP64 스트리밍 작성기
+
+    파일마다 로컬 헤더(데이터 디스크립터 플래그)를 먼저 내보내고,
+    데이터를 CHUNK_SIZE 단위로 흘려보낸 뒤 CRC/크기를 디스크립터에 기록합니다.
+    메모리 사용량은 청크 크기 정도로 일정합니다.
+    """
+    def __init__(self, compression=ZIP_STORED, compresslevel=1, chunk_size=CHUNK_SIZE,
+                 fixed_layout=False, executor=None, workers=1):
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self.chunk_size = chunk_size
+        # DEFLATE 블록을 압축할 스레드 풀 (None이면 요청 스레드에서 순차 압축)
+        # workers는 이 아카이브가 동시에 맡기는 블록 수 (여러 요청이 풀을 나눠 쓰도록)
+        self.executor = executor
+        self.workers = max(1, workers)
+        # True면 읽기 실패 파일도 0으로 채워 미리 계산한 크기/배치를 그대로 유지
+        self.fixed_layout = fixed_layout
+        self.offset = 0
+        self.entries = []
+        self.file_count = 0
+
+    def _prepare(self, entry):
+        entry.method = self.compression
+        if self.compression == ZIP_STORED:
+            entry.zip64 = entry.size >= ZIP64_LIMIT
+        else:
+            entry.zip64 = entry.size >= ZIP64_DEFLATE_THRESHOLD
+
+    def local_header(self, entry):
+        """로컬 파일 헤더 (CRC는 디스크립터에서 기록)"""
+        dostime, dosdate = dos_datetime(entry.mtime)
+        if entry.method == ZIP_STORED:
+            # 비압축은 크기를 미리 알 수 있으므로 헤더에 기록 (스트리밍 해제용)
+            known = entry.size
+        else:
+            known = 0
+        extra = b''
+        if entry.zip64:
+            extra = struct.pack('<HHQQ', 0x0001, 16, known, known)
+            size_field = ZIP64_LIMIT
+        else:
+            size_field = known
+        version = 45 if entry.zip64 else 20
+        header = struct.pack('<IHHHHHIIIHH', SIG_LOCAL_HEADER, version,
+                             FLAG_DATA_DESCRIPTOR | FLAG_UTF8, entry.method,
+                             dostime, dosdate, 0, size_field, size_field,
+                             len(entry.name_bytes), len(extra))
+        return header + entry.name_bytes + extra
+
+    def data_descriptor(self, entry):
+        """데이터 디스크립터 (CRC, 압축 크기, 원본 크기)"""
+        if entry.zip64:
+            return struct.pack('<IIQQ', SIG_DATA_DESCRIPTOR, entry.crc,
+                               entry.compress_size, entry.size)
+        return struct.pack('<IIII', SIG_DATA_DESCRIPTOR, entry.crc,
+                           entry.compress_size, entry.size)
+
+    def central_directory_record(self, entry):
+        """중앙 디렉터리 항목"""
+        dostime, dosdate = dos_datetime(entry.mtime)
+        extra_fields = []
+        if entry.zip64:
+            usize = csize = ZIP64_LIMIT
+            extra_fields += [entry.size, entry.compress_size]
+        else:
+            usize, csize = entry.size, entry.compress_size
+        if entry.header_offset >= ZIP64_LIMIT:
+            offset = ZIP64_LIMIT
+            extra_fields.append(entry.header_offset)
+        else:
+            offset = entry.header_offset
+        extra = b''
+        if extra_fields:
+            extra = struct.pack('<HH', 0x0001, 8 * len(extra_fields))
+            extra += struct.pack('<' + 'Q' * len(extra_fields), *extra_fields)
+        version = 45 if extra_fields else 20
+        record = struct.pack('<IHHHHHHIIIHHHHHII', SIG_CENTRAL_DIR, version, version,
+                             FLAG_DATA_DESCRIPTOR | FLAG_UTF8, entry.method,
+                             dostime, dosdate, entry.crc, csize, usize,
+                             len(entry.name_bytes), len(extra), 0, 0, 0, 0, offset)
+        return record + entry.name_bytes + extra
+
+    def end_records(self, cd_offset, cd_size, count):
+        """ZIP64 종료 레코드(필요 시) + 종료 레코드"""
+        out = b''
+        if count >= ZIP64_COUNT_LIMIT or cd_offset >= ZIP64_LIMIT or cd_size >= ZIP64_LIMIT:
+            zip64_end_offset = cd_offset + cd_size
+            out += struct.pack('<IQHHIIQQQQ', SIG_ZIP64_END, 44, 45, 45, 0, 0,
+                               count, count, cd_size, cd_offset)
+            out += struct.pack('<IIQI', SIG_ZIP64_LOCATOR, 0, zip64_end_offset, 1)
+        out += struct.pack('<IHHHHIIH', SIG_END, 0, 0,
+                           min(count, ZIP64_COUNT_LIMIT), min(count, ZIP64_COUNT_LIMIT),
+                           min(cd_size, ZIP64_LIMIT), min(cd_offset, ZIP64_LIMIT), 0)
+        return out
+
+    def plan_layout(self, entries):
+        """ZIP_STORED 배치 계산: 항목별 오프셋을 채우고 (중앙 디렉터리 오프셋, 전체 크기) 반환
+
+        STORED 모드에서는 헤더/데이터/디스크립터/중앙 디렉터리 길이가
+        파일 이름과 크기만으로 결정되므로 실제 데이터를 읽지 않아도 됩니다.
+        """
+        if self.compression != ZIP_STORED:
+            raise ValueError("ZIP_STORED 모드에서만 크기를 미리 계산할 수 있습니다")
+        offset = 0
+        for entry in entries:
+            self._prepare(entry)
+            entry.header_offset = offset
+            entry.compress_size = entry.size
+            offset += len(self.local_header(entry)) + entry.size + len(self.data_descriptor(entry))
+        cd_size = sum(len(self.central_directory_record(e)) for e in entries)
+        return offset, offset + cd_size + len(self.end_records(offset, cd_size, len(entries)))
+
+    def archive_size(self, entries):
+        """ZIP_STORED 아카이브의 최종 크기를 stat 정보만으로 계산"""
+        return self.plan_layout(entries)[1]
+
+    def iter_file_data(self, entry, f):
+        """파일에서 정확히 entry.size 바이트를 읽음 (전송 중 크기가 바뀌어도 헤더와 일치)"""
+        remaining = entry.size
+        while remaining > 0:
+            try:
+                chunk = f.read(min(self.chunk_size, remaining)) if f is not None else b''
+            except OSError as e:
+                print(f"[오류] 파일 읽기 실패 {entry.path}: {e}")
+                chunk = b''
+            if not chunk:
+                if f is not None:
+                    print(f"[경고] 전송 중 파일 크기 감소, 0으로 채움: {entry.path}")
+                while remaining > 0:
+                    pad = min(self.chunk_size, remaining)
+                    remaining -= pad
+                    yield bytes(pad)
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    def _open(self, entry):
+        """파일 열기 (배치 고정 모드에서는 실패 시 None → 0으로 채움)"""
+        try:
+            return open(entry.path, 'rb')
+        except OSError as e:
+            print(f"[오류] 파일 추가 실패 {entry.path}: {e}")
+            if not self.fixed_layout:
+                raise
+            return None
+
+    def entry_crc(self, entry):
+        """항목의 CRC (캐시에 없으면 파일을 읽어 계산)"""
+        crc = _cached_crc(entry)
+        if crc is None:
+            f = self._open(entry)
+            with f if f is not None else contextlib.nullcontext():
+                crc = 0
+                for chunk in self.iter_file_data(entry, f):
+                    crc = zlib.crc32(chunk, crc)
+            crc &= 0xFFFFFFFF
+            _remember_crc(entry, crc)
+        entry.crc = crc
+        return crc
+
+    def _iter_data_range(self, entry, lo, hi):
+        """파일 데이터 중 [lo, hi) 구간만 읽음 (0부터 끝까지 읽으면 CRC도 기록)"""
+        f = self._open(entry)
+        with f if f is not None else contextlib.nullcontext():
+            if lo == 0 and hi == entry.size:
+                crc = 0
+                for chunk in self.iter_file_data(entry, f):
+                    crc = zlib.crc32(chunk, crc)
+                    yield chunk
+                entry.crc = crc & 0xFFFFFFFF
+                _remember_crc(entry, entry.crc)
+                return
+            if f is not None:
+                try:
+                    f.seek(lo)
+                except OSError:
+                    f = None
+            remaining = hi - lo
+            while remaining > 0:
+                try:
+                    chunk = f.read(min(self.chunk_size, remaining)) if f is not None else b''
+                except OSError as e:
+                    print(f"[오류] 파일 읽기 실패 {entry.path}: {e}")
+                    chunk = b''
+                    f = None
+                if not chunk:
+                    chunk = bytes(min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                yield chunk
+
+    def iter_range(self, entries, start, end):
+        """ZIP_STORED 아카이브의 [start, end) 바이트만 생성 (이어받기용)
+
+        배치가 이름/크기만으로 결정되므로 앞부분 파일은 건너뛰고,
+        디스크립터/중앙 디렉터리에 필요한 CRC는 캐시 또는 파일 재계산으로 채웁니다.
+        """
+        cd_offset, total = self.plan_layout(entries)
+        end = min(end, total)
+        for entry in entries:
+            header = self.local_header(entry)
+            h0 = entry.header_offset
+            d0 = h0 + len(header)
+            dd0 = d0 + entry.size
+            dd_end = dd0 + len(self.data_descriptor(entry))
+            if h0 >= end:
+                break
+            if dd_end <= start:
+                continue
+            if start < d0:
+                yield header[max(0, start - h0):min(end, d0) - h0]
+            if start < dd0 and end > d0:
+                lo = max(start, d0) - d0
+                hi = min(end, dd0) - d0
+                yield from self._iter_data_range(entry, lo, hi)
+            if end > dd0:
+                self.entry_crc(entry)
+                descriptor = self.data_descriptor(entry)
+                yield descriptor[max(0, start - dd0):min(end, dd_end) - dd0]
+        if end > cd_offset:
+            for entry in entries:
+                self.entry_crc(entry)
+            cd = b''.join(self.central_directory_record(e) for e in entries)
+            tail = cd + self.end_records(cd_offset, len(cd), len(entries))
+            yield tail[max(0, start - cd_offset):end - cd_offset]
+
+    def iter_member(self, entry):
+        """파일 하나를 (헤더, 데이터, 디스크립터) 순서로 내보냄"""
+        try:
+            f = self._open(entry)
+        except OSError:
+            return
+        with f if f is not None else contextlib.nullcontext():
+            self._prepare(entry)
+            entry.header_offset = self.offset
+            header = self.local_header(entry)
+            self.offset += len(header)
+            yield header
+
+            crc = 0
+            compress_size = 0
+            if entry.method == ZIP_DEFLATED:
+                compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+            else:
+                compressor = None
+            for chunk in self.iter_file_data(entry, f):
+                crc = zlib.crc32(chunk, crc)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                compress_size += len(chunk)
+                self.offset += len(chunk)
+                yield chunk
+            if compressor is not None:
+                tail = compressor.flush()
+                compress_size += len(tail)
+                self.offset += len(tail)
+                yield tail
+
+            entry.crc = crc & 0xFFFFFFFF
+            entry.compress_size = compress_size
+            _remember_crc(entry, entry.crc)
+            descriptor = self.data_descriptor(entry)
+            self.offset += len(descriptor)
+            yield descriptor
+        self.entries.append(entry)
+        self.file_count += 1
+
+    def iter_central_directory(self):
+        """중앙 디렉터리와 종료 레코드"""
+        cd_offset = self.offset
+        cd = b''.join(self.central_directory_record(e) for e in self.entries)
+        self.offset += len(cd)
+        yield cd
+        end = self.end_records(cd_offset, len(cd), len(self.entries))
+        self.offset += len(end)
+        yield end
+
+    def _iter_parts(self, entries):
+        if self.compression == ZIP_DEFLATED and self.executor is not None and self.workers > 1:
+            yield from self._iter_parts_parallel(entries)
+            return
+        for entry in entries:
+            yield from self.iter_member(entry)
+        yield from self.iter_central_directory()
+
+    def _iter_deflate_jobs(self, entries):
+        """병렬 압축용 작업 순서: ('begin', 항목) → ('data', 블록, 마지막 여부, 사전)... → ('end', 항목, CRC)
+
+        파일 읽기와 CRC 계산은 요청 스레드에서 순서대로 하고 압축만 풀에 맡김
+        """
+        for entry in entries:
+            try:
+                f = self._open(entry)
+            except OSError:
+                continue
+            with f if f is not None else contextlib.nullcontext():
+                self._prepare(entry)
+                yield ('begin', entry)
+                crc = 0
+                held = None
+                zdict = b''
+                for chunk in self.iter_file_data(entry, f):
+                    crc = zlib.crc32(chunk, crc)
+                    if held is not None:
+                        yield ('data', held, False, zdict)
+                        zdict = held[-DEFLATE_DICT_SIZE:]
+                    held = chunk
+                yield ('data', held or b'', True, zdict)
+                yield ('end', entry, crc & 0xFFFFFFFF)
+
+    def _iter_parts_parallel(self, entries):
+        """DEFLATE 블록을 풀에서 동시에 압축하고 결과는 순서대로 기록"""
+        max_pending = self.workers * PARALLEL_PENDING_PER_WORKER
+        jobs = self._iter_deflate_jobs(entries)
+        queue = deque()
+        pending = 0
+        try:
+            while True:
+                # 앞쪽 블록을 기다리는 동안 뒤쪽 블록을 미리 맡겨 둠
+                while pending < max_pending:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    if job[0] == 'data':
+                        _, data, last, zdict = job
+                        job = ('data', self.executor.submit(_deflate_block, data, self.compresslevel,
+                                                            zdict, last))
+                        pending += 1
+                    queue.append(job)
+                if not queue:
+                    break
+                job = queue.popleft()
+                if job[0] == 'begin':
+                    entry = job[1]
+                    entry.header_offset = self.offset
+                    entry.compress_size = 0
+                    header = self.local_header(entry)
+                    self.offset += len(header)
+                    yield header
+                elif job[0] == 'data':
+                    pending -= 1
+                    chunk = job[1].result()
+                    entry.compress_size += len(chunk)
+                    self.offset += len(chunk)
+                    if chunk:
+                        yield chunk
+                else:
+                    _, entry, crc = job
+                    entry.crc = crc
+                    _remember_crc(entry, crc)
+                    descriptor = self.data_descriptor(entry)
+                    self.offset += len(descriptor)
+                    yield descriptor
+                    self.entries.append(entry)
+                    self.file_count += 1
+        finally:
+            # 중간에 끊기면 아직 시작하지 않은 블록은 취소 (열린 파일은 jobs를 닫으며 정리)
+            for job in queue:
+                if job[0] == 'data':
+                    job[1].cancel()
+            jobs.close()
+        yield from self.iter_central_directory()
+
+    def stream(self, entries):
+        """전체 아카이브를 청크 단위로 생성 (작은 조각은 묶어서 내보냄)"""
+        return self._coalesce(self._iter_parts(entries))
+
+    def stream_range(self, entries, start, end):
+        """[start, end) 구간을 청크 단위로 생성"""
+        return self._coalesce(self.iter_range(entries, start, end))
+
+    def _coalesce(self, parts):
+        buf = bytearray()
+        for part in parts:
+            if not part:
+                continue
+            if len(part) >= self.chunk_size and not buf:
+                yield part
+                continue
+            buf += part
+            if len(buf) >= self.chunk_size:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)